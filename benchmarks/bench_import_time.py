@@ -0,0 +1,98 @@
+"""Cold-start import cost of each entry point, checked against a budget.
+
+Imports each entry module in a fresh interpreter under `-X importtime`,
+parses the cumulative time of the module itself from stderr (the best of
+`--runs` runs, to ride out disk-cache noise) and fails when it exceeds its
+budget or when it loads a package it must not:
+
+* source.health: the container health probe; stdlib only.
+* source.core.Headless: `main.py --jobs`; Telethon loads once an account
+  connects, and the prompt stack never.
+* web.app: the dashboard; FastAPI, but Telethon loads at startup instead.
+* source.core.Bot: the interactive menu; Telethon and InquirerPy load with
+  the account prompt, each service with the menu action that uses it.
+
+Budgets are generous multiples of what a laptop measures, so a failure
+means an eager import crept back in rather than a slow machine.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import_time [--runs N] [--scale X]
+
+Exits 1 if any entry point is over budget.
+"""
+
+import argparse
+import subprocess
+import sys
+
+# module: (budget in milliseconds, top-level packages it must not import)
+ENTRY_POINTS = {
+    "source.health": (30, ("telethon", "InquirerPy", "rich", "fastapi")),
+    "source.core.Headless": (
+        300,
+        ("telethon", "InquirerPy", "prompt_toolkit", "fastapi"),
+    ),
+    "web.app": (1000, ("telethon", "InquirerPy", "prompt_toolkit")),
+    "source.core.Bot": (300, ("telethon", "InquirerPy", "prompt_toolkit", "fastapi")),
+}
+
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """Milliseconds spent importing `module`, and every module it loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = None
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        if not cumulative.strip().isdigit():
+            continue  # The column header line
+        loaded.add(name)
+        if name == module:
+            total_us = int(cumulative)
+    if total_us is None:
+        # Already imported by the interpreter itself; nothing to measure.
+        total_us = 0
+    return total_us / 1000, loaded
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply every budget (slow CI)"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'entry point':<24}{'import ms':>10}{'budget ms':>11}  status")
+    for module, (budget, forbidden) in ENTRY_POINTS.items():
+        runs = [measure(module) for _ in range(args.runs)]
+        best = min(ms for ms, _ in runs)
+        loaded = runs[0][1]
+        leaked = sorted(
+            package
+            for package in forbidden
+            if any(name == package or name.startswith(package + ".") for name in loaded)
+        )
+        limit = budget * args.scale
+        status = "ok"
+        if leaked:
+            status = f"FAIL: imports {', '.join(leaked)}"
+        elif best > limit:
+            status = "FAIL: over budget"
+        failed = failed or status != "ok"
+        print(f"{module:<24}{best:>10.1f}{limit:>11.0f}  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Per-update cost of live-forward dispatch as the routed chat list grows.
+
+Replays synthetic `UpdateNewChannelMessage` updates through two paths:
+
+* events: what `events.NewMessage(chats=...)` + `events.Album(chats=...)`
+  cost per update — build both events, bind them to the client, then run
+  the chat filter.
+* raw: `RawUpdateRouter.handle`, which checks the raw peer id against a
+  frozenset and only builds a Message for routed chats.
+
+Half the replayed updates come from routed chats and half from chats the
+account is in but does not forward, which is typical for a busy account.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_live_dispatch [--updates N]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from telethon import events
+from telethon.tl import types
+
+from source.service.RawUpdateRouter import RawUpdateRouter
+
+CHAT_COUNTS = (10, 1_000, 10_000)
+CHANNEL_MARK = 1000000000000
+
+
+def make_updates(chat_count: int, update_count: int) -> list:
+    """Synthetic channel updates, half from routed and half from other chats."""
+    rng = random.Random(chat_count)
+    date = datetime.now(timezone.utc)
+    updates = []
+    for i in range(update_count):
+        channel_id = rng.randrange(1, chat_count * 2 + 1)
+        message = types.Message(
+            id=i + 1,
+            peer_id=types.PeerChannel(channel_id),
+            date=date,
+            message=f"message {i}",
+        )
+        update = types.UpdateNewChannelMessage(message=message, pts=i, pts_count=1)
+        update._entities = {}
+        updates.append(update)
+    return updates
+
+
+def routed_ids(chat_count: int) -> frozenset:
+    return frozenset(-(CHANNEL_MARK + i) for i in range(1, chat_count + 1))
+
+
+async def bench_events(client, source_ids: frozenset, updates: list) -> float:
+    new_message = events.NewMessage(chats=list(source_ids))
+    album = events.Album(chats=list(source_ids))
+    for builder in (new_message, album):
+        builder.chats = set(source_ids)
+        builder.resolved = True
+
+    async def callback(event) -> None:
+        pass
+
+    start = time.perf_counter()
+    for update in updates:
+        for builder in (new_message, album):
+            event = builder.build(update, None, client._self_id)
+            if not event:
+                continue
+            event._entities = update._entities
+            event._set_client(client)
+            if builder.filter(event):
+                await callback(event)
+    return time.perf_counter() - start
+
+
+async def bench_raw(client, source_ids: frozenset, updates: list) -> float:
+    async def on_message(chat_id, message) -> None:
+        pass
+
+    router = RawUpdateRouter(client, on_message, on_message, source_ids)
+    start = time.perf_counter()
+    for update in updates:
+        await router.handle(update)
+    return time.perf_counter() - start
+
+
+async def main(update_count: int) -> None:
+    # A plain dict stands in for Telethon's entity cache: lookups miss and
+    # the message keeps no input chat, as for an entity-less raw update.
+    client = SimpleNamespace(_self_id=1, _mb_entity_cache={})
+    print(f"{'chats':>8} {'events µs/update':>18} {'raw µs/update':>15} {'speedup':>8}")
+    for chat_count in CHAT_COUNTS:
+        source_ids = routed_ids(chat_count)
+        # Each path gets freshly built updates so cached attributes from one
+        # run can't leak into the other.
+        events_time = await bench_events(
+            client, source_ids, make_updates(chat_count, update_count)
+        )
+        raw_time = await bench_raw(
+            client, source_ids, make_updates(chat_count, update_count)
+        )
+        print(
+            f"{chat_count:>8} "
+            f"{events_time / update_count * 1e6:>18.2f} "
+            f"{raw_time / update_count * 1e6:>15.2f} "
+            f"{events_time / raw_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=50_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.updates))
@@ -0,0 +1,88 @@
+"""Cost of the metrics instrumentation on the send hot path.
+
+Times three ways of forwarding one message through a client whose
+`forward_messages` returns immediately, so only Python overhead is
+measured:
+
+* bare: awaiting `client.forward_messages` directly, as before metrics.
+* instrumented: `MessageForwardService._send_message`, which adds the
+  latency histogram and forwarded counter around the same call.
+* primitives: a lone `Counter.inc` and `Histogram.observe`.
+
+It also times `render()` of the whole registry, which is what a scrape
+costs. A real Telegram send takes tens of milliseconds, so the overhead
+per message should stay in the low microseconds.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_metrics [--calls N]
+"""
+
+import argparse
+import asyncio
+import time
+
+from source.service.MessageForwardService import MessageForwardService
+from source.utils.Metrics import REGISTRY, Counter, Histogram
+
+
+class NullClient:
+    async def forward_messages(self, destination_id, payload):
+        return payload
+
+
+async def bench_bare(client, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        await client.forward_messages(1, i)
+    return time.perf_counter() - start
+
+
+async def bench_instrumented(service, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        await service._send_message(1, i)
+    return time.perf_counter() - start
+
+
+def bench_primitives(calls: int) -> tuple[float, float]:
+    counter = Counter("bench_total", "Benchmark counter.")
+    histogram = Histogram("bench_seconds", "Benchmark histogram.")
+    start = time.perf_counter()
+    for _ in range(calls):
+        counter.inc()
+    inc_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(calls):
+        histogram.observe(i % 100 / 10)
+    return inc_time, time.perf_counter() - start
+
+
+def bench_render(repeats: int = 1_000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        REGISTRY.render()
+    return (time.perf_counter() - start) / repeats
+
+
+async def main(calls: int) -> None:
+    client = NullClient()
+    service = MessageForwardService(client)
+    bare = await bench_bare(client, calls)
+    instrumented = await bench_instrumented(service, calls)
+    inc_time, observe_time = bench_primitives(calls)
+
+    print(f"{'path':<24} {'µs/call':>10}")
+    print(f"{'bare forward_messages':<24} {bare / calls * 1e6:>10.3f}")
+    print(f"{'instrumented send':<24} {instrumented / calls * 1e6:>10.3f}")
+    print(f"{'  overhead':<24} {(instrumented - bare) / calls * 1e6:>10.3f}")
+    print(f"{'Counter.inc':<24} {inc_time / calls * 1e6:>10.3f}")
+    print(f"{'Histogram.observe':<24} {observe_time / calls * 1e6:>10.3f}")
+    print(f"{'REGISTRY.render':<24} {bench_render() * 1e6:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls))
@@ -1,10 +1,11 @@
+import argparse
 import asyncio
 import os
 import signal
 import sys
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from source.core.Bot import Bot
+from source.service.MetricsServer import MetricsServer
 from source.utils.Console import Terminal
 from source.utils.Constants import (
     SESSION_FOLDER_PATH,
@@ -12,6 +13,9 @@ from source.utils.Constants import (
     MEDIA_FOLDER_PATH,
 )
 
+if TYPE_CHECKING:
+    from source.core.Bot import Bot
+
 console = Terminal.console
 
 
@@ -32,11 +36,53 @@ async def shutdown(
     loop.stop()
 
 
+async def run(bot: "Bot") -> None:
+    # Opt-in Prometheus endpoint for CLI runs; the web dashboard serves
+    # /metrics from its own app.
+    metrics_server = None
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        metrics_server = MetricsServer(
+            int(metrics_port), host=os.getenv("METRICS_HOST", "127.0.0.1")
+        )
+        await metrics_server.start()
+    try:
+        await bot.start()
+    finally:
+        if metrics_server:
+            await metrics_server.stop()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Telegram Forwarder Bot")
+    parser.add_argument(
+        "--jobs",
+        metavar="FILE",
+        help="run the forwards in this JSON job file without prompts, then exit",
+    )
+    parser.add_argument(
+        "--progress",
+        metavar="FILE",
+        default="-",
+        help="append --jobs progress as JSON lines to FILE (default: stdout)",
+    )
+    return parser.parse_args(argv)
+
+
 def main() -> None:
+    args = parse_args()
     os.makedirs(RESOURCE_FILE_PATH, exist_ok=True)
     os.makedirs(MEDIA_FOLDER_PATH, exist_ok=True)
     os.makedirs(SESSION_FOLDER_PATH, exist_ok=True)
 
+    if args.jobs:
+        # Imported here so the headless path never loads the menu stack.
+        from source.core import Headless
+
+        sys.exit(Headless.main(args.jobs, args.progress))
+
+    from source.core.Bot import Bot
+
     bot = Bot()
     loop = None
     try:
@@ -50,7 +96,7 @@ def main() -> None:
                     sig, lambda s=sig: asyncio.create_task(shutdown(loop, signal=s))
                 )
 
-        loop.run_until_complete(bot.start())
+        loop.run_until_complete(run(bot))
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
     finally:
@@ -0,0 +1,461 @@
+"""Several stored accounts connected at once, sharing history forwards.
+
+Telegram's flood limits are per account, so one account caps how fast a
+backfill can go no matter how it is scheduled. The pool connects every
+stored session concurrently, each with its own `Telegram` and therefore
+its own rate-limited `MessageQueue`, and spreads work across them:
+
+* Whole jobs go to the account a consistent-hash ring picks for the
+  destination, so a destination keeps its account (and its posting order)
+  and losing an account only moves that account's destinations.
+* With `split=True`, a channel's history is cut into disjoint message-id
+  windows, one per account, each resumable on its own. The windows are
+  saved with the job's progress and reused by every later run of the same
+  source and date range. Channel message ids are the same for every
+  member, which is what makes this safe; ids in basic groups and private
+  chats are per account, so those never split.
+
+An account whose job fails is drained (its queued sends get a grace
+period), marked failed, and its job resumes on the next account on the
+ring from the job's saved progress. Sends still queued after the grace
+period are kept as dead letters and re-queued on a healthy account, since
+the job's progress already counts them."""
+
+import asyncio
+import bisect
+import hashlib
+
+from telethon import errors
+
+from source.core.Telegram import Telegram
+from source.service.ContentDedup import ContentDedup
+from source.service.DeadLetterQueue import DeadLetterQueue
+from source.service.Forward import Forward
+from source.service.ForwardProgress import ForwardProgress
+from source.service.HistoryService import HistoryService
+from source.service.MessageForwardService import MessageForwardService
+from source.utils.Console import Terminal
+from source.utils.Constants import (
+    POOL_DRAIN_TIMEOUT,
+    POOL_HASH_REPLICAS,
+    POOL_MIN_SLICE_IDS,
+)
+
+CHANNEL_ID_PREFIX = "-100"
+
+# The account itself is unusable: drain it and move all of its work.
+ACCOUNT_ERRORS = (
+    ConnectionError,
+    OSError,
+    errors.UnauthorizedError,
+    errors.AuthKeyError,
+)
+# Only this job can't run on this account; try it on another one.
+JOB_ERRORS = (ValueError, errors.RPCError)
+
+
+class HashRing:
+    def __init__(self, nodes, replicas: int = POOL_HASH_REPLICAS):
+        """
+        Args:
+            nodes: Hashable node names (account phone numbers)
+            replicas: Virtual points per node; more spreads keys more evenly
+        """
+        self._points: list[tuple[int, str]] = sorted(
+            (self._hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas)
+        )
+        self._keys = [point for point, _ in self._points]
+
+    @staticmethod
+    def _hash(key) -> int:
+        return int.from_bytes(hashlib.md5(str(key).encode()).digest()[:8], "big")
+
+    def node_for(self, key, exclude=frozenset()) -> str | None:
+        """First node clockwise from `key` that isn't excluded."""
+        if not self._points:
+            return None
+        start = bisect.bisect(self._keys, self._hash(key))
+        for offset in range(len(self._points)):
+            node = self._points[(start + offset) % len(self._points)][1]
+            if node not in exclude:
+                return node
+        return None
+
+
+class PoolAccount:
+    HEALTHY = "healthy"
+    DRAINING = "draining"
+    FAILED = "failed"
+
+    def __init__(self, credentials, telegram: Telegram | None = None):
+        self.credentials = credentials
+        self.name = str(credentials.phone_number)
+        self.telegram = telegram
+        # Accounts handed in already connected belong to the caller.
+        self.owned = telegram is None
+        self.state = self.FAILED if telegram is None else self.HEALTHY
+        self.last_error: str | None = None
+        self.jobs_done = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "account": self.name,
+            "state": self.state,
+            "jobs_done": self.jobs_done,
+            "queue_size": self.telegram.queue.qsize() if self.telegram else 0,
+            "last_error": self.last_error,
+        }
+
+
+class AccountPool:
+    def __init__(
+        self,
+        credentials_list,
+        shared=(),
+        console=None,
+        drain_timeout: float = POOL_DRAIN_TIMEOUT,
+        min_slice_ids: int = POOL_MIN_SLICE_IDS,
+    ):
+        """
+        Args:
+            credentials_list: Stored accounts to pool (`Credentials.get_all()`)
+            shared: Already-connected `Telegram` instances to reuse instead of
+                opening their session file a second time; the pool never
+                disconnects them
+            drain_timeout: Seconds a failed account's queue gets to flush
+            min_slice_ids: Smallest id window worth splitting off
+        """
+        self.console = console or Terminal.console
+        self.drain_timeout = drain_timeout
+        self.min_slice_ids = min_slice_ids
+        shared_by_phone = {str(t.credentials.phone_number): t for t in shared}
+        # One fingerprint filter for every account: split windows of a chat,
+        # or two sources on different accounts, may share a destination.
+        self.dedup = next((t.dedup for t in shared), None) or ContentDedup()
+        # Likewise one message mapping store, whose saves rewrite the file.
+        self.history = next((t.history for t in shared), None) or HistoryService()
+        # And one dead letter store, so any account can retry another's sends.
+        self.dead_letters = (
+            next((t.dead_letters for t in shared), None) or DeadLetterQueue()
+        )
+        self.accounts: dict[str, PoolAccount] = {}
+        for credentials in credentials_list:
+            account = PoolAccount(
+                credentials, shared_by_phone.get(str(credentials.phone_number))
+            )
+            self.accounts.setdefault(account.name, account)
+        self.ring = HashRing(self.accounts)
+
+    @property
+    def healthy(self) -> list[PoolAccount]:
+        return [a for a in self.accounts.values() if a.state == PoolAccount.HEALTHY]
+
+    async def connect(self) -> int:
+        """Connect every stored account concurrently.
+
+        Accounts that can't connect, or whose session isn't logged in, are
+        marked failed and left out; nothing prompts for a login code.
+
+        Returns:
+            Number of healthy accounts.
+        """
+        await asyncio.gather(
+            *(
+                self._connect_account(account)
+                for account in self.accounts.values()
+                if account.telegram is None
+            )
+        )
+        self.console.print(
+            f"[bold green]Account pool: {len(self.healthy)}/{len(self.accounts)} "
+            f"accounts connected[/bold green]"
+        )
+        return len(self.healthy)
+
+    async def _connect_account(self, account: PoolAccount) -> None:
+        try:
+            account.telegram = await Telegram.create(
+                account.credentials, interactive=False
+            )
+            account.telegram.dedup = self.dedup
+            account.telegram.history = self.history
+            account.telegram.dead_letters = self.dead_letters
+            # Entities are cached per session; without a dialog sweep this
+            # account couldn't resolve sources and destinations by id.
+            await account.telegram.client.get_dialogs()
+            account.state = PoolAccount.HEALTHY
+        except Exception as e:
+            account.state = PoolAccount.FAILED
+            account.last_error = str(e)
+            self.console.print(
+                f"[bold red]Account {account.name} unavailable:[/bold red] {e}"
+            )
+
+    def account_for(self, key, exclude=frozenset()) -> PoolAccount | None:
+        """The healthy account the hash ring assigns to `key`."""
+        unavailable = set(exclude) | {
+            a.name for a in self.accounts.values() if a.state != PoolAccount.HEALTHY
+        }
+        name = self.ring.node_for(key, unavailable)
+        return self.accounts[name] if name else None
+
+    async def past_forward(
+        self, forward_config_map: dict, split: bool = False, on_progress=None
+    ) -> int:
+        """Forward the history of every configured source concurrently.
+
+        Args:
+            forward_config_map: `{source id: config or [configs]}` as used by
+                `Telegram.past_forward`; every route of a source is a job
+            split: Also split each channel's history across accounts; faster,
+                but the destination receives the windows interleaved
+            on_progress: Optional `(done, total)` callback summed over jobs
+
+        Returns:
+            Messages forwarded, or matched in dry-run.
+        """
+        jobs: list[dict] = []
+        for source, configs in forward_config_map.items():
+            if not isinstance(configs, (list, tuple)):
+                configs = [configs]
+            jobs.extend(
+                {
+                    "source_id": source,
+                    "destination_id": config.destinationID,
+                    "start_date": getattr(config, "start_date", None),
+                    "end_date": getattr(config, "end_date", None),
+                    "timezone_name": getattr(config, "timezone_name", "UTC"),
+                    "dry_run": bool(getattr(config, "dry_run", False)),
+                    "media_only": bool(getattr(config, "media_only", False)),
+                    "keyword": getattr(config, "keyword", None) or None,
+                    "dedup": getattr(config, "dedup", False) is True,
+                }
+                for config in configs
+            )
+        progress = _ProgressSum(on_progress) if on_progress else None
+        return await self._gather(
+            self.forward_history(job, split, progress) for job in jobs
+        )
+
+    async def forward_history(
+        self, config: dict, split: bool = False, on_progress=None
+    ) -> int:
+        """Forward one source's history (see `Telegram.forward_history`),
+        on one ring-assigned account or split across all of them."""
+        if on_progress is not None and not isinstance(on_progress, _ProgressSum):
+            on_progress = _ProgressSum(on_progress)
+        windows: list[tuple[int, int | None] | None] = [None]
+        if split and self._splittable(config["source_id"]):
+            windows = list(await self._plan_windows(config) or windows)
+
+        async def run(index, window):
+            if window is None:
+                key, preferred = config["destination_id"], None
+            else:
+                # Windows start on distinct accounts; the ring only picks
+                # replacements after a failure.
+                key = f"{config['source_id']}:{window[0]}"
+                healthy = self.healthy
+                preferred = healthy[index % len(healthy)] if healthy else None
+            return await self._run_job(
+                dict(config, id_range=window), key, preferred, on_progress
+            )
+
+        return await self._gather(
+            run(index, window) for index, window in enumerate(windows)
+        )
+
+    @staticmethod
+    async def _gather(jobs) -> int:
+        """Run `jobs` concurrently and sum their counts. A failing job
+        doesn't cut the others short: they run to completion, and the first
+        error is raised once all are done."""
+        counts = []
+        for result in await asyncio.gather(*jobs, return_exceptions=True):
+            if isinstance(result, BaseException):
+                raise result
+            counts.append(result)
+        return sum(counts)
+
+    @staticmethod
+    def _splittable(source_id: int) -> bool:
+        return str(source_id).startswith(CHANNEL_ID_PREFIX)
+
+    async def _plan_windows(self, config: dict) -> list[tuple[int, int | None]] | None:
+        """The id windows to split the source's history into: the job's
+        saved plan if it has one, else its id range (narrowed to the date
+        range) cut into one window per healthy account, each at least
+        `min_slice_ids` wide, and saved. Without an end date, the last
+        window is left open so messages posted later still belong to one.
+        None if the history isn't worth splitting."""
+        source = config["source_id"]
+        start_date, end_date = config.get("start_date"), config.get("end_date")
+        saved = ForwardProgress.load_plan(source, start_date, end_date)
+        if saved:
+            return saved
+        telegram = self.healthy[0].telegram if len(self.healthy) >= 2 else None
+        if telegram is None:
+            return None
+        client = telegram.client
+        start_datetime, end_datetime = Forward.build_date_bounds(
+            config.get("start_date"),
+            config.get("end_date"),
+            config.get("timezone_name", "UTC"),
+        )
+        if end_datetime:
+            last = await client.get_messages(source, limit=1, offset_date=end_datetime)
+        else:
+            last = await client.get_messages(source, limit=1)
+        if not last:
+            return None
+        high = last[0].id + 1
+        low = 1
+        if start_datetime:
+            first = await client.get_messages(
+                source, limit=1, offset_date=start_datetime, reverse=True
+            )
+            if not first:
+                return None
+            low = first[0].id
+        parts = min(len(self.healthy), max(1, (high - low) // self.min_slice_ids))
+        if parts == 1:
+            return None
+        windows: list[tuple[int, int | None]] = list(self.split_range(low, high, parts))
+        if not end_date:
+            windows[-1] = (windows[-1][0], None)
+        if not config.get("dry_run"):
+            ForwardProgress.save_plan(source, windows, start_date, end_date)
+        return windows
+
+    @staticmethod
+    def split_range(low: int, high: int, parts: int) -> list[tuple[int, int]]:
+        """Split [low, high) into `parts` contiguous, disjoint windows."""
+        step, extra = divmod(high - low, parts)
+        windows = []
+        start = low
+        for i in range(parts):
+            end = start + step + (1 if i < extra else 0)
+            windows.append((start, end))
+            start = end
+        return windows
+
+    async def _run_job(self, job: dict, key, account, on_progress) -> int:
+        """Run `job` on `account` (or the ring's pick for `key`), moving it
+        to the next healthy account each time one fails."""
+        reporter = (
+            on_progress.reporter((job["source_id"], job.get("id_range")))
+            if on_progress
+            else None
+        )
+        tried: set[str] = set()
+        while True:
+            if account is None or account.state != PoolAccount.HEALTHY:
+                account = self.account_for(key, exclude=tried)
+            if account is None:
+                raise RuntimeError(
+                    f"No healthy account left to forward chat {job['source_id']}"
+                )
+            tried.add(account.name)
+            try:
+                count = await account.telegram.forward_history(
+                    dict(job, on_progress=reporter)
+                )
+                account.jobs_done += 1
+                return count
+            except ACCOUNT_ERRORS as e:
+                await self._fail(account, e)
+            except JOB_ERRORS as e:
+                # This account can't reach the chat (not a member, entity
+                # unknown, flood-limited); others may, and it stays healthy.
+                self.console.print(
+                    f"[bold yellow]Account {account.name} can't forward chat "
+                    f"{job['source_id']}:[/bold yellow] {e}"
+                )
+            self.console.print(
+                f"[bold yellow]Moving chat {job['source_id']} "
+                f"{job.get('id_range') or ''} off account {account.name}; "
+                f"it resumes from saved progress[/bold yellow]"
+            )
+            account = None
+
+    async def _fail(self, account: PoolAccount, error: Exception) -> None:
+        if account.state != PoolAccount.HEALTHY:
+            return
+        account.state = PoolAccount.DRAINING
+        account.last_error = str(error)
+        self.console.print(
+            f"[bold red]Account {account.name} failed:[/bold red] {error}"
+        )
+        telegram = account.telegram
+        if telegram is None:
+            account.state = PoolAccount.FAILED
+            return
+        queue = telegram.queue
+        try:
+            await asyncio.wait_for(queue.queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            pass
+        pending = queue.take_pending()
+        await queue.stop()
+        account.state = PoolAccount.FAILED
+        # A send cut off mid-call may have gone through; sending it again
+        # risks a duplicate rather than a gap.
+        entry_ids = []
+        for func, args in queue.interrupted + pending:
+            sender = getattr(func, "__self__", None)
+            if isinstance(sender, MessageForwardService):
+                entry = sender.abandon(args, error)
+                if entry:
+                    entry_ids.append(entry["id"])
+        if entry_ids:
+            await self._requeue(account, entry_ids)
+
+    async def _requeue(self, account: PoolAccount, entry_ids: list[int]) -> None:
+        """Send a failed account's undrained forwards from a healthy one."""
+        survivor = self.account_for(account.name)
+        if survivor is None or survivor.telegram is None:
+            self.console.print(
+                f"[bold yellow]{len(entry_ids)} forwards queued on account "
+                f"{account.name} are kept as dead letters for a later "
+                f"retry[/bold yellow]"
+            )
+            return
+        requeued = await survivor.telegram.retry_dead_letters(entry_ids)
+        self.console.print(
+            f"[bold yellow]Moved {requeued} queued forwards from account "
+            f"{account.name} to {survivor.name}[/bold yellow]"
+        )
+
+    async def disconnect(self) -> None:
+        """Disconnect the accounts the pool opened itself."""
+        await asyncio.gather(
+            *(
+                account.telegram.disconnect()
+                for account in self.accounts.values()
+                if account.owned and account.telegram
+            ),
+            return_exceptions=True,
+        )
+
+    def status(self) -> list[dict]:
+        return [account.to_dict() for account in self.accounts.values()]
+
+
+class _ProgressSum:
+    """Adds up `(done, total)` reports from concurrent jobs into one."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self._jobs: dict = {}
+
+    def reporter(self, key):
+        def report(done, total=None):
+            previous_total = self._jobs.get(key, (0, 0))[1]
+            self._jobs[key] = (done, total if total is not None else previous_total)
+            if self.callback:
+                self.callback(
+                    sum(d for d, _ in self._jobs.values()),
+                    sum(t for _, t in self._jobs.values()),
+                )
+
+        return report
@@ -0,0 +1,348 @@
+"""Run history, keyword and media forwards from a job file, without prompts.
+
+`python main.py --jobs jobs.json` connects a stored account that is already
+logged in, runs every job in the file through the same `Telegram` methods
+the menu and web API use, and exits. Progress is written as JSON lines (one
+object per event) so cron, Kubernetes Jobs or a wrapper script can follow a
+run; console output goes to stderr to keep that stream clean. Nothing here
+imports the menu or dialog modules, so no InquirerPy or TTY is needed.
+
+Job file format::
+
+    {
+      "account": "+15551234567",      # optional, defaults to the first
+      "concurrency": 2,               # optional, jobs running at once
+      "jobs": [
+        {
+          "name": "june-files",        # optional, echoed in progress
+          "sources": [-1001234],       # or "source_id": -1001234
+          "destinations": [-1005678],  # or "destination_id": -1005678
+          "start_date": "2026-06-01",
+          "end_date": "2026-06-30",
+          "timezone_name": "UTC",
+          "keyword": "invoice",
+          "full_text": false,          # keyword is an FTS5 query
+          "media_only": true,
+          "dedup": false,              # skip content already forwarded
+          "dry_run": false
+        }
+      ]
+    }
+
+Each source/destination pair of a job runs as its own resumable forward."""
+
+import asyncio
+import json
+import signal
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from source.model.Credentials import Credentials
+from source.service.JobManager import Job, JobManager
+from source.service.MessageArchive import MessageArchive
+from source.utils.Console import Terminal
+from source.utils.Constants import HEADLESS_PROGRESS_INTERVAL, JOB_CONCURRENCY
+from source.utils.DateUtils import DateUtils
+
+if TYPE_CHECKING:
+    from source.core.Telegram import Telegram
+
+EXIT_OK = 0
+EXIT_JOBS_FAILED = 1  # At least one job failed; the others ran
+EXIT_INVALID_JOB_FILE = 2
+EXIT_NO_ACCOUNT = 3  # No usable, logged-in account
+EXIT_INTERRUPTED = 130
+
+JOB_FIELDS = {
+    "name",
+    "source_id",
+    "sources",
+    "destination_id",
+    "destinations",
+    "start_date",
+    "end_date",
+    "timezone_name",
+    "keyword",
+    "full_text",
+    "limit",
+    "media_only",
+    "dedup",
+    "dry_run",
+}
+
+
+class JobFileError(ValueError):
+    """The job file is missing, unreadable or describes invalid jobs."""
+
+
+class JobFile:
+    def __init__(self, jobs: list[dict], account=None, concurrency=JOB_CONCURRENCY):
+        self.jobs = jobs
+        self.account = account
+        self.concurrency = concurrency
+
+    @staticmethod
+    def load(path: str) -> "JobFile":
+        try:
+            with open(path) as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            raise JobFileError(f"Cannot read job file {path}: {e}") from e
+        return JobFile.parse(data)
+
+    @staticmethod
+    def parse(data) -> "JobFile":
+        """Validate a decoded job file and expand it into one job per
+        source/destination pair.
+
+        Raises:
+            JobFileError: Describing the first problem found.
+        """
+        if isinstance(data, list):
+            data = {"jobs": data}
+        if not isinstance(data, dict) or not isinstance(data.get("jobs"), list):
+            raise JobFileError('Job file must be an object with a "jobs" list')
+        concurrency = data.get("concurrency", JOB_CONCURRENCY)
+        if not isinstance(concurrency, int) or concurrency < 1:
+            raise JobFileError("concurrency must be a positive integer")
+
+        jobs = []
+        for index, spec in enumerate(data["jobs"]):
+            if not isinstance(spec, dict):
+                raise JobFileError(f"Job {index} must be an object")
+            name = spec.get("name") or f"job-{index + 1}"
+            unknown = set(spec) - JOB_FIELDS
+            if unknown:
+                raise JobFileError(f"{name}: unknown fields {sorted(unknown)}")
+            sources = JobFile._ids(spec, "source_id", "sources", name)
+            destinations = JobFile._ids(spec, "destination_id", "destinations", name)
+            start_date, end_date = spec.get("start_date"), spec.get("end_date")
+            for value in (start_date, end_date):
+                if value is not None and not DateUtils.parse_date(str(value)):
+                    raise JobFileError(f"{name}: invalid date {value!r}")
+            if not DateUtils.validate_date_range(start_date, end_date):
+                raise JobFileError(f"{name}: start_date is after end_date")
+            timezone_name = spec.get("timezone_name", "UTC")
+            if not DateUtils.is_valid_timezone(timezone_name):
+                raise JobFileError(f"{name}: unknown timezone {timezone_name!r}")
+            full_text = bool(spec.get("full_text", False))
+            if full_text:
+                if not spec.get("keyword") or spec.get("media_only"):
+                    raise JobFileError(
+                        f"{name}: full_text needs a keyword and no media_only"
+                    )
+                try:
+                    MessageArchive.validate_query(spec["keyword"])
+                except ValueError as e:
+                    raise JobFileError(f"{name}: {e}") from None
+
+            for source in sources:
+                for destination in destinations:
+                    jobs.append(
+                        {
+                            "name": name,
+                            "source_id": source,
+                            "destination_id": destination,
+                            "start_date": start_date,
+                            "end_date": end_date,
+                            "timezone_name": timezone_name,
+                            "keyword": spec.get("keyword") or None,
+                            "full_text": full_text,
+                            "limit": spec.get("limit"),
+                            "media_only": bool(spec.get("media_only", False)),
+                            "dedup": bool(spec.get("dedup", False)),
+                            "dry_run": bool(spec.get("dry_run", False)),
+                        }
+                    )
+        if not jobs:
+            raise JobFileError("Job file contains no jobs")
+        return JobFile(jobs, data.get("account"), concurrency)
+
+    @staticmethod
+    def _ids(spec: dict, single: str, plural: str, name: str) -> list[int]:
+        values = spec[plural] if plural in spec else [spec.get(single)]
+        if not isinstance(values, list) or not values:
+            raise JobFileError(f"{name}: {plural} must be a non-empty list")
+        for value in values:
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise JobFileError(f"{name}: {single} must be a chat id, got {value!r}")
+        return values
+
+    @staticmethod
+    def kind(job: dict) -> str:
+        """Which forward runs the job, named as the web API names them."""
+        if job["media_only"]:
+            return "media"
+        if job["keyword"]:
+            return "keyword"
+        return "history"
+
+
+class ProgressWriter:
+    """Writes run events as JSON lines, throttling per-job progress."""
+
+    def __init__(self, stream, interval: float = HEADLESS_PROGRESS_INTERVAL):
+        self.stream = stream
+        self.interval = interval
+        self._last_progress: dict[str, float] = {}
+
+    def emit(self, event: str, **fields) -> None:
+        record = {"time": datetime.now().astimezone().isoformat(), "event": event}
+        record.update(fields)
+        self.stream.write(json.dumps(record, default=str) + "\n")
+        self.stream.flush()
+
+    def progress(self, job: Job) -> None:
+        now = time.monotonic()
+        if now - self._last_progress.get(job.id, float("-inf")) < self.interval:
+            return
+        self._last_progress[job.id] = now
+        self.emit("progress", job=job.id, done=job.done, total=job.total)
+
+
+class HeadlessRunner:
+    def __init__(self, job_file: JobFile, writer: ProgressWriter, telegram=None):
+        """
+        Args:
+            job_file: Parsed jobs to run
+            writer: Destination for progress events
+            telegram: Connected `Telegram` to use; by default the job file's
+                account is connected without prompting
+        """
+        self.job_file = job_file
+        self.writer = writer
+        self.telegram = telegram
+        self.job_manager = JobManager(
+            max_concurrent=job_file.concurrency,
+            history_size=len(job_file.jobs),
+        )
+        self.interrupted = False
+
+    async def run(self) -> int:
+        """Run every job to completion and return the process exit code."""
+        owned = self.telegram is None
+        if owned:
+            try:
+                self.telegram = await self._connect()
+            except (RuntimeError, ConnectionError, OSError) as e:
+                self.writer.emit("error", message=str(e))
+                return EXIT_NO_ACCOUNT
+
+        jobs = []
+        try:
+            if not self.interrupted:
+                jobs = [self._submit(job) for job in self.job_file.jobs]
+            await asyncio.gather(
+                *(job.task for job in jobs if job.task), return_exceptions=True
+            )
+            # Sends the jobs queued are still going out; wait for them
+            # unless the run is being stopped.
+            if not self.interrupted:
+                await self.telegram.queue.queue.join()
+        finally:
+            await self.telegram.queue.stop()
+            if owned:
+                await self.telegram.disconnect()
+
+        failed = [job for job in jobs if job.state == Job.FAILED]
+        self.writer.emit(
+            "summary",
+            jobs=len(jobs),
+            completed=sum(job.state == Job.COMPLETED for job in jobs),
+            failed=len(failed),
+            cancelled=sum(job.state == Job.CANCELLED for job in jobs),
+            messages=sum(job.result or 0 for job in jobs),
+        )
+        if self.interrupted:
+            return EXIT_INTERRUPTED
+        return EXIT_JOBS_FAILED if failed else EXIT_OK
+
+    async def _connect(self) -> "Telegram":
+        # Telethon loads only once the job file is valid and an account is
+        # about to connect.
+        from source.core.Telegram import Telegram
+
+        accounts = Credentials.get_all()
+        wanted = self.job_file.account
+        if wanted is not None:
+            accounts = [a for a in accounts if str(a.phone_number) == str(wanted)]
+        if not accounts:
+            raise RuntimeError(
+                f"No stored account {wanted}" if wanted else "No stored accounts"
+            )
+        return await Telegram.create(accounts[0], interactive=False)
+
+    def _submit(self, spec: dict) -> Job:
+        kind = JobFile.kind(spec)
+        writer = self.writer
+        telegram = self.telegram
+
+        async def operation(job: Job):
+            writer.emit("started", job=job.id, **job.params)
+
+            def report(done, total=None):
+                job.report(done, total)
+                writer.progress(job)
+
+            config = dict(job.params, on_progress=report)
+            if kind == "keyword":
+                return await telegram.forward_by_keyword(config)
+            if kind == "media":
+                return await telegram.forward_media_files(config)
+            return await telegram.forward_history(config)
+
+        job = self.job_manager.submit(kind, operation, spec)
+        if job.task is not None:
+            job.task.add_done_callback(lambda _: self._finished(job))
+        return job
+
+    def _finished(self, job: Job) -> None:
+        if job.task is not None and job.task.cancelled():
+            # Cancelled before it started, so `JobManager` never saw it run.
+            job.state = Job.CANCELLED
+        self.writer.emit(
+            job.state,
+            job=job.id,
+            name=job.params["name"],
+            done=job.done,
+            total=job.total,
+            result=job.result,
+            error=job.error,
+        )
+
+    def cancel(self) -> None:
+        """Stop the run: queued and running jobs are cancelled."""
+        self.interrupted = True
+        for job in self.job_manager.list():
+            if job.task and not job.finished:
+                job.task.cancel()
+
+
+def main(jobs_path: str, progress_path: str = "-") -> int:
+    """Entry point for `main.py --jobs`; returns the process exit code."""
+    # stdout carries the JSON progress stream when no file is given, and
+    # progress bars would only interleave with it.
+    Terminal.console.stderr = True
+    Terminal.live_progress = False
+    try:
+        job_file = JobFile.load(jobs_path)
+    except JobFileError as e:
+        Terminal.console.print(f"[bold red]Invalid job file:[/bold red] {e}")
+        return EXIT_INVALID_JOB_FILE
+
+    with (
+        nullcontext(sys.stdout) if progress_path == "-" else open(progress_path, "a")
+    ) as stream:
+        runner = HeadlessRunner(job_file, ProgressWriter(stream))
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        if sys.platform != "win32":
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(sig, runner.cancel)
+        try:
+            return loop.run_until_complete(runner.run())
+        finally:
+            loop.close()
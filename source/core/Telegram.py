@@ -1,13 +1,20 @@
 import os
+from functools import cached_property
 from types import SimpleNamespace
 
-from telethon import TelegramClient
+from telethon import TelegramClient, errors
 
-from source.model.Chat import Chat
 from source.service.ChatService import ChatService
+from source.service.ContentDedup import ContentDedup
+from source.service.DeadLetterQueue import DeadLetterQueue
+from source.service.DialogCache import DialogCache
 from source.service.Forward import Forward
+from source.service.HistoryService import HistoryService
+from source.service.LiveSupervisor import LiveSupervisor
+from source.service.MessageArchive import MessageArchive
 from source.service.MessageQueue import MessageQueue
 from source.service.MessageService import MessageService
+from source.service.SyncScheduler import SyncScheduler
 from source.utils.Console import Terminal
 from source.utils.Constants import MEDIA_FOLDER_PATH, SESSION_PREFIX_PATH
 
@@ -26,80 +33,189 @@ class Telegram:
         # Initialize services
         self.queue = MessageQueue()
         self.chat_service = ChatService(self.console)
+        # History runs and dry runs plan from a local mirror of each source
+        # chat, fetching only what is new since the last run; full-text
+        # keyword searches query its index.
+        self.archive = MessageArchive(self.client)
         self.message_service = MessageService(
-            self.client, self.console, queue=self.queue
+            self.client, self.console, queue=self.queue, archive=self.archive
         )
 
+        self.dialog_cache = DialogCache(self.client)
+        # Shared by live and history forwards so a repost is caught whichever
+        # path delivered the original.
+        self.dedup = ContentDedup()
+        # Failed sends of every forward path, kept for retry.
+        self.dead_letters = DeadLetterQueue()
+        # One message mapping store for every forward: each save rewrites
+        # the history file from memory, so separate stores would drop each
+        # other's mappings.
+        self.history = HistoryService()
+        # Scheduled history syncs run alongside live forwarding and share
+        # its queue, so the two draw on one rate budget.
+        self.sync_scheduler = SyncScheduler(self.forward_history, self.console)
+        self.live_supervisor = LiveSupervisor(
+            self.client,
+            self.queue,
+            self.console,
+            scheduler=self.sync_scheduler,
+            dedup=self.dedup,
+            dead_letters=self.dead_letters,
+            history=self.history,
+        )
         self.status = "Idle"
 
+    @cached_property
+    def dialog_scanner(self):
+        # Only Delete and Find User sweep dialogs; the scanner pulls in
+        # rich's progress widgets, so it loads on first use.
+        from source.service.DialogScanner import DialogScanner
+
+        return DialogScanner(self.console)
+
     @classmethod
-    async def create(cls, credentials):
+    async def create(cls, credentials, interactive=True):
         instance = cls(credentials)
-        await instance.connect()
+        await instance.connect(interactive)
         return instance
 
-    async def connect(self):
+    async def connect(self, interactive=True):
+        """Connect, prompting for a login code if the session isn't
+        authorized yet; with `interactive=False` that raises instead."""
         if not self._is_connected:
             if not self.client.is_connected():
                 await self.client.connect()
             if not await self.client.is_user_authorized():
+                if not interactive:
+                    await self.client.disconnect()
+                    raise RuntimeError(
+                        f"Account {self.credentials.phone_number} is not logged "
+                        "in; select it once from the account menu first"
+                    )
                 await self.client.start(self.credentials.phone_number)
             self._is_connected = True
 
     async def disconnect(self):
+        # Stop live forwarding first, or its supervisor would treat the
+        # disconnect as a dropped connection and reconnect.
+        await self.live_supervisor.stop()
         if self._is_connected:
             await self.client.disconnect()
             self._is_connected = False
 
     async def list_chats(self):
-        chats = await self.client.get_dialogs()
-        chat_list = Chat.write(chats)
+        chats = await self.dialog_cache.get(refresh=True)
         self.console.print("\n[bold blue]Available Chats:[/]")
-        result = []
-        for chat_dict in chat_list:
-            chat = Chat(**chat_dict)
+        for chat in chats:
             self.console.print(chat.get_display_name())
-            result.append(chat)
-        return result
+        return chats
 
     async def delete(self, ignore_chats):
         me = await self.client.get_me()
-        ignored_ids = [chat.id for chat in ignore_chats]
-        async for dialog in self.client.iter_dialogs():
-            if dialog.id == me.id or dialog.id in ignored_ids or not dialog.is_group:
-                continue
-            await self.message_service.delete_messages_from_dialog(dialog, me.id)
+        ignored_ids = {chat.id for chat in ignore_chats}
+        dialogs = [
+            dialog
+            async for dialog in self.client.iter_dialogs()
+            if dialog.id != me.id and dialog.id not in ignored_ids and dialog.is_group
+        ]
+
+        total = 0
+        # Per-dialog delete state, so a retry after a flood wait picks up
+        # where the failed attempt stopped.
+        states = {}
+
+        async def delete_from(dialog):
+            nonlocal total
+            total += await self.message_service.delete_messages_from_dialog(
+                dialog, states.setdefault(dialog.id, {})
+            )
+
+        await self.dialog_scanner.scan("delete", dialogs, delete_from)
+        self.console.print(f"[bold green]Deleted {total} messages[/bold green]")
+        return total
 
     async def find_user(self, config):
         wanted_user, message_limit = config
         if not wanted_user:
             return
+
+        # Fast path: a single global search filtered by sender server-side.
+        try:
+            per_chat = await self.message_service.process_user_messages_global(
+                wanted_user, message_limit
+            )
+            self.console.print(
+                f"[bold green]Found {sum(per_chat.values())} messages in "
+                f"{len(per_chat)} chats[/bold green]"
+            )
+            return
+        except errors.RPCError as e:
+            self.console.print(
+                f"[bold yellow]Global search unavailable ({e}); "
+                f"scanning dialogs instead[/bold yellow]"
+            )
+
         me = await self.client.get_me()
-        async for dialog in self.client.iter_dialogs():
-            chat = dialog.entity
-            try:
-                if chat.id == me.id or isinstance(chat, type(me)):
-                    continue
-                await self.message_service.process_user_messages(
-                    chat, wanted_user, message_limit
-                )
-            except Exception as e:
-                self.console.print(f"[bold red]Error processing dialog:[/bold red] {e}")
+        chats = [
+            dialog.entity
+            async for dialog in self.client.iter_dialogs()
+            if dialog.entity.id != me.id and not isinstance(dialog.entity, type(me))
+        ]
+
+        async def search(chat):
+            await self.message_service.process_user_messages(
+                chat, wanted_user, message_limit
+            )
+
+        await self.dialog_scanner.scan(f"find_user:{wanted_user.id}", chats, search)
 
     async def start_forward_live(self, forward_config):
-        forward = Forward(self.client, forward_config, self.queue)
-        forward.add_events()
-        await self.client.run_until_disconnected()
+        await self.live_supervisor.run(forward_config)
+
+    @property
+    def live_forward(self):
+        """The running live `Forward`, if any."""
+        return self.live_supervisor.forward
 
-    async def past_forward(self, forward_config):
-        forward = Forward(self.client, forward_config, self.queue)
-        await forward.history_handler()
+    def reload_forward_config(self) -> None:
+        """Ask a running live forward to pick up forwardConfig.json now."""
+        self.live_supervisor.reload()
+
+    def get_route_stats(self):
+        """Per-route delivery counters of the running live forward, if any."""
+        return self.live_supervisor.route_stats()
+
+    async def past_forward(self, forward_config, on_progress=None):
+        forward = Forward(
+            self.client,
+            forward_config,
+            self.queue,
+            on_progress,
+            archive=self.archive,
+            dedup=self.dedup,
+            dead_letters=self.dead_letters,
+            history=self.history,
+        )
+        return await forward.history_handler()
 
     async def clear_forward_progress(self) -> bool:
-        forward = Forward(self.client, {}, self.queue)
+        forward = Forward(self.client, {}, self.queue, history=self.history)
         return await forward.clear_progress()
 
     async def forward_by_keyword(self, config):
+        if config.get("global_search"):
+            return await self.message_service.forward_messages_by_global_keyword(
+                keyword=config["keyword"],
+                destination_id=config.get("destination_id"),
+                routes=config.get("routes"),
+                limit=config.get("limit"),
+                start_date=config.get("start_date"),
+                end_date=config.get("end_date"),
+                timezone_name=config.get("timezone_name", "UTC"),
+                dry_run=config.get("dry_run", False),
+                channels_only=config.get("channels_only", False),
+                on_progress=config.get("on_progress"),
+            )
         return await self.message_service.forward_messages_by_keyword(
             source_id=config["source_id"],
             destination_id=config["destination_id"],
@@ -109,6 +225,8 @@ class Telegram:
             end_date=config.get("end_date"),
             timezone_name=config.get("timezone_name", "UTC"),
             dry_run=config.get("dry_run", False),
+            on_progress=config.get("on_progress"),
+            full_text=config.get("full_text", False),
         )
 
     async def forward_media_files(self, config):
@@ -118,6 +236,20 @@ class Telegram:
         Resumable and dry-run-aware via the same progress-tracking
         machinery as `past_forward`, but scoped to media messages only.
         """
+        return await self.forward_history(dict(config, media_only=True))
+
+    async def forward_history(self, config):
+        """Forward one source chat's history to one destination, as
+        `past_forward` does for saved configurations. `config` holds
+        source_id/destination_id plus the optional date range, timezone,
+        dry_run, media_only, keyword, `on_progress(done, total)`, an
+        `id_range` (low, high) window when an `AccountPool` splits the job,
+        `max_backlog` to hold back while that many sends are queued, and
+        `dedup` to skip content the destination already has.
+
+        Returns:
+            Messages forwarded, or matched in dry-run.
+        """
         forward_config_map = {
             config["source_id"]: SimpleNamespace(
                 destinationID=config["destination_id"],
@@ -125,12 +257,41 @@ class Telegram:
                 end_date=config.get("end_date"),
                 timezone_name=config.get("timezone_name", "UTC"),
                 dry_run=config.get("dry_run", False),
-                media_only=True,
+                media_only=config.get("media_only", False),
                 keyword=config.get("keyword") or None,
+                id_range=config.get("id_range"),
+                dedup=config.get("dedup", False),
             )
         }
-        forward = Forward(self.client, forward_config_map, self.queue)
-        await forward.history_handler()
+        forward = Forward(
+            self.client,
+            forward_config_map,
+            self.queue,
+            config.get("on_progress"),
+            max_backlog=config.get("max_backlog"),
+            archive=self.archive,
+            dedup=self.dedup,
+            dead_letters=self.dead_letters,
+            history=self.history,
+        )
+        return await forward.history_handler()
+
+    async def retry_dead_letters(self, entry_ids=None) -> int:
+        """Retry failed forwards now: all of them, or `entry_ids`,
+        including ones that ran out of attempts.
+
+        Returns:
+            Failed forwards queued again
+        """
+        self.dead_letters.retry(entry_ids)
+        forward = Forward(
+            self.client,
+            {},
+            self.queue,
+            dead_letters=self.dead_letters,
+            history=self.history,
+        )
+        return await forward.retry_dead_letters()
 
     async def download_media(self, message):
         os.makedirs(MEDIA_FOLDER_PATH, exist_ok=True)
@@ -7,7 +7,7 @@ class ForwardDialog(DateRangeDialog):
         """Get forward configuration from user.
 
         Returns:
-            Dict mapping source chat IDs to their forward configurations
+            Dict mapping source chat IDs to the list of their forward configurations
         """
         self.clear()
         return await self._get_forward_config()
@@ -16,7 +16,7 @@ class ForwardDialog(DateRangeDialog):
         """Get forward configuration settings.
 
         Returns:
-            Dict mapping source chat IDs to their forward configurations
+            Dict mapping source chat IDs to the list of their forward configurations
         """
         forward_config_list = await ForwardConfig.get_all(True)
         config_string = "\n   ".join(str(config) for config in forward_config_list)
@@ -61,4 +61,4 @@ class ForwardDialog(DateRangeDialog):
                 config.timezone_name = "UTC"
                 config.dry_run = False
 
-        return {item.sourceID: item for item in forward_config_list}
+        return ForwardConfig.group_by_source(forward_config_list)
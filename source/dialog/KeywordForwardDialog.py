@@ -2,6 +2,8 @@ from InquirerPy import inquirer
 
 from source.dialog.DateRangeDialog import DateRangeDialog
 from source.model.Chat import Chat
+from source.model.ForwardConfig import ForwardConfig
+from source.service.MessageArchive import MessageArchive
 from source.utils.DateUtils import DateUtils
 
 
@@ -11,19 +13,91 @@ class KeywordForwardDialog(DateRangeDialog):
         self.clear()
         chats = Chat.read()
 
-        source_idx = await self.list_chats_terminal(chats, "source")
-        if source_idx == -1:
-            return None
+        scope = await self.show_options(
+            "Search scope:",
+            [
+                {"name": "One source chat", "value": "source"},
+                {"name": "All chats (global search)", "value": "global"},
+            ],
+        )
+        global_search = scope == "global"
 
-        destination_idx = await self.list_chats_terminal(chats, "destination")
-        if destination_idx == -1:
-            return None
+        source_id = None
+        if not global_search:
+            source_idx = await self.list_chats_terminal(chats, "source")
+            if source_idx == -1:
+                return None
+            source_id = chats[source_idx].id
 
-        keyword_value = await inquirer.text(
-            message="Enter keyword to search for (leave blank to forward all messages):",
-        ).execute_async()
-        keyword = keyword_value.strip() if isinstance(keyword_value, str) else ""
-        keyword = keyword or None
+        destination_id = None
+        routes = None
+        routing = "single"
+        if global_search:
+            routing = await self.show_options(
+                "Where should matches go?",
+                [
+                    {"name": "Everything to one destination", "value": "single"},
+                    {
+                        "name": "Route by saved forward configurations "
+                        "(configured sources only)",
+                        "value": "saved",
+                    },
+                ],
+            )
+        if routing == "saved":
+            routes = {
+                config.sourceID: config.destinationID for config in ForwardConfig.read()
+            }
+        else:
+            destination_idx = await self.list_chats_terminal(chats, "destination")
+            if destination_idx == -1:
+                return None
+            destination_id = chats[destination_idx].id
+
+        keyword_prompt = (
+            "Enter keyword to search for across all chats:"
+            if global_search
+            else "Enter keyword to search for (leave blank to forward all messages):"
+        )
+        keyword = None
+        while keyword is None:
+            keyword_value = await inquirer.text(message=keyword_prompt).execute_async()
+            keyword = keyword_value.strip() if isinstance(keyword_value, str) else ""
+            keyword = keyword or None
+            if keyword is None and not global_search:
+                break
+            if keyword is None:
+                self.console.print(
+                    "[bold red]Error:[/bold red] Global search needs a keyword."
+                )
+
+        full_text = False
+        if keyword and not global_search:
+            full_text = (
+                await self.show_options(
+                    "How should the keyword match?",
+                    [
+                        {"name": "Telegram search (single term)", "value": "telegram"},
+                        {
+                            "name": 'Local full-text index ("phrase", prefix*, '
+                            "AND / OR / NOT)",
+                            "value": "fts",
+                        },
+                    ],
+                )
+                == "fts"
+            )
+            while full_text:
+                try:
+                    MessageArchive.validate_query(keyword)
+                    break
+                except ValueError as e:
+                    self.console.print(f"[bold red]Error:[/bold red] {e}")
+                    keyword = (
+                        await inquirer.text(
+                            message="Enter full-text query:"
+                        ).execute_async()
+                    ).strip()
 
         limit_value = await inquirer.text(
             message="Max messages to scan (1-5000, default 500):",
@@ -68,9 +142,12 @@ class KeywordForwardDialog(DateRangeDialog):
         )
 
         return {
-            "source_id": chats[source_idx].id,
-            "destination_id": chats[destination_idx].id,
+            "global_search": global_search,
+            "routes": routes,
+            "source_id": source_id,
+            "destination_id": destination_id,
             "keyword": keyword,
+            "full_text": full_text,
             "limit": limit,
             "start_date": start_date,
             "end_date": end_date,
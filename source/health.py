@@ -0,0 +1,85 @@
+"""Cheap container health probe.
+
+`python -m source.health` checks that the data directories the bot writes
+to are usable and that its JSON state files parse, and with `--url` that
+the web dashboard answers. It imports only the standard library and the
+constants module, so a probe every few seconds costs a few milliseconds
+instead of loading Telethon and the menu stack.
+
+Exit code 0 means healthy; 1 means at least one check failed, with one
+line per problem on stderr."""
+
+import argparse
+import json
+import os
+import sys
+
+from source.utils.Constants import (
+    CREDENTIALS_FILE_PATH,
+    FORWARD_CONFIG_FILE_PATH,
+    FORWARD_PROGRESS_FILE_PATH,
+    RESOURCE_FILE_PATH,
+    SESSION_FOLDER_PATH,
+)
+
+WRITABLE_DIRECTORIES = (RESOURCE_FILE_PATH, SESSION_FOLDER_PATH)
+JSON_FILES = (
+    CREDENTIALS_FILE_PATH,
+    FORWARD_CONFIG_FILE_PATH,
+    FORWARD_PROGRESS_FILE_PATH,
+)
+
+
+def check_files() -> list[str]:
+    """Problems with the directories and state files, if any."""
+    problems = []
+    for directory in WRITABLE_DIRECTORIES:
+        if not os.path.isdir(directory):
+            problems.append(f"{directory}/ is missing")
+        elif not os.access(directory, os.W_OK | os.X_OK):
+            problems.append(f"{directory}/ is not writable")
+    for path in JSON_FILES:
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path) as file:
+                json.load(file)
+        except (OSError, ValueError) as e:
+            problems.append(f"{path} is unreadable: {e}")
+    return problems
+
+
+def check_url(url: str, timeout: float) -> list[str]:
+    """Problems reaching `url`, if any; anything but a 2xx is one."""
+    # urllib pulls in http.client and ssl; only pay for it when asked to.
+    import urllib.error
+    import urllib.request
+
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            if 200 <= response.status < 300:
+                return []
+            return [f"{url} answered {response.status}"]
+    except (urllib.error.URLError, OSError) as e:
+        return [f"{url} is unreachable: {e}"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Health probe for the bot")
+    parser.add_argument(
+        "--url",
+        help="also require this URL to answer 2xx, e.g. http://127.0.0.1:8000/health",
+    )
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    problems = check_files()
+    if args.url:
+        problems += check_url(args.url, args.timeout)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
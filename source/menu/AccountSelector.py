@@ -1,6 +1,3 @@
-from InquirerPy import inquirer
-
-from source.core.Telegram import Telegram
 from source.model.Credentials import Credentials
 from source.utils.Console import Terminal
 
@@ -10,6 +7,12 @@ class AccountSelector:
         self.console = Terminal.console
 
     async def select_account(self):
+        # Telethon and the prompt stack load here, once the menu starts,
+        # rather than when the module is imported.
+        from InquirerPy import inquirer
+
+        from source.core.Telegram import Telegram
+
         credentials_list = Credentials.get_all()
 
         if not credentials_list:
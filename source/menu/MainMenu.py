@@ -1,14 +1,7 @@
 import asyncio
+from datetime import datetime
+from functools import cached_property
 
-from InquirerPy import inquirer
-
-from source.core.Telegram import Telegram
-from source.dialog.DeleteDialog import DeleteDialog
-from source.dialog.FindUserDialog import FindUserDialog
-from source.dialog.ForwardDialog import ForwardDialog
-from source.dialog.KeywordForwardDialog import KeywordForwardDialog
-from source.dialog.MediaForwardDialog import MediaForwardDialog
-from source.menu.AccountSelector import AccountSelector
 from source.model.Credentials import Credentials
 from source.utils.Console import Terminal
 
@@ -18,14 +11,42 @@ class MainMenu:
         self.console = Terminal.console
         self.telegram = telegram
         self.menu_options = self._init_menu_options()
-        self.forward_dialog = ForwardDialog()
-        self.delete_dialog = DeleteDialog()
-        self.find_user_dialog = FindUserDialog()
-        self.keyword_forward_dialog = KeywordForwardDialog()
-        self.media_forward_dialog = MediaForwardDialog()
         self._status_task = None
         self.status = "Idle"
 
+    # Each dialog module (like InquirerPy and the services below) is imported
+    # the first time its menu action runs, so starting the menu doesn't pay
+    # for actions that are never used.
+    @cached_property
+    def forward_dialog(self):
+        from source.dialog.ForwardDialog import ForwardDialog
+
+        return ForwardDialog()
+
+    @cached_property
+    def delete_dialog(self):
+        from source.dialog.DeleteDialog import DeleteDialog
+
+        return DeleteDialog()
+
+    @cached_property
+    def find_user_dialog(self):
+        from source.dialog.FindUserDialog import FindUserDialog
+
+        return FindUserDialog()
+
+    @cached_property
+    def keyword_forward_dialog(self):
+        from source.dialog.KeywordForwardDialog import KeywordForwardDialog
+
+        return KeywordForwardDialog()
+
+    @cached_property
+    def media_forward_dialog(self):
+        from source.dialog.MediaForwardDialog import MediaForwardDialog
+
+        return MediaForwardDialog()
+
     def _init_menu_options(self):
         return [
             {
@@ -66,6 +87,16 @@ class MainMenu:
                 "value": "10",
                 "handler": self.clear_forward_progress,
             },
+            {
+                "name": "Past Forward with All Accounts",
+                "value": "11",
+                "handler": self.pool_forward,
+            },
+            {
+                "name": "Failed Forwards (Retry/Purge)",
+                "value": "12",
+                "handler": self.failed_forwards,
+            },
             {"name": "Exit", "value": "0", "handler": None},
         ]
 
@@ -78,6 +109,8 @@ class MainMenu:
         choices = [
             {"name": opt["name"], "value": opt["value"]} for opt in self.menu_options
         ]
+        from InquirerPy import inquirer
+
         return await inquirer.select(message="Menu:", choices=choices).execute_async()
 
     def _get_queue_status(self):
@@ -132,6 +165,8 @@ class MainMenu:
             await self.telegram.disconnect()
 
     async def update_credentials(self):
+        from source.core.Telegram import Telegram
+
         self.console.clear()
         await self.telegram.disconnect()
         credentials = await Credentials.get(False)
@@ -166,6 +201,8 @@ class MainMenu:
         self.status = "Idle"
 
     async def switch_account(self):
+        from source.menu.AccountSelector import AccountSelector
+
         await self._cleanup()
         selector = AccountSelector()
         self.telegram = await selector.select_account()
@@ -190,9 +227,48 @@ class MainMenu:
         await self.telegram.forward_media_files(config)
         self.status = "Idle"
 
+    async def pool_forward(self):
+        from InquirerPy import inquirer
+
+        from source.core.AccountPool import AccountPool
+
+        credentials_list = Credentials.get_all()
+        if len(credentials_list) < 2:
+            self.console.print(
+                "[bold yellow]Add at least two accounts to forward with a pool.[/bold yellow]"
+            )
+            return
+
+        config = await self.forward_dialog.get_config()
+        split = await inquirer.confirm(
+            message="Also split each channel's history across accounts? "
+            "(faster, but messages arrive out of order)",
+            default=False,
+        ).execute_async()
+
+        pool = AccountPool(credentials_list, shared=[self.telegram])
+        try:
+            if not await pool.connect():
+                return
+            self.status = f"Forwarding past messages with {len(pool.healthy)} accounts"
+            total = await pool.past_forward(config, split=split)
+            self.console.print(
+                f"[bold green]Account pool forwarded {total} messages[/bold green]"
+            )
+            for account in pool.status():
+                self.console.print(
+                    f"[dim]{account['account']}: {account['state']}, "
+                    f"{account['jobs_done']} jobs[/dim]"
+                )
+        finally:
+            await pool.disconnect()
+            self.status = "Idle"
+
     async def clear_forward_progress(self):
+        from InquirerPy import inquirer
+
         confirmed = await inquirer.confirm(
-            message="Clear all saved forward progress state?",
+            message="Clear saved history, media and keyword forward progress?",
             default=False,
         ).execute_async()
         if not confirmed:
@@ -206,5 +282,50 @@ class MainMenu:
             )
         else:
             self.console.print(
-                "[bold yellow]No progress cache file found.[/bold yellow]"
+                "[bold yellow]No saved forward progress found.[/bold yellow]"
+            )
+
+    async def failed_forwards(self):
+        from InquirerPy import inquirer
+
+        dead_letters = self.telegram.dead_letters
+        entries = dead_letters.entries()
+        if not entries:
+            self.console.print("[bold green]No failed forwards.[/bold green]")
+            return
+
+        for entry in entries:
+            ids = entry["message_ids"]
+            label = (
+                f"message {ids[0]}" if len(ids) == 1 else f"album {ids[0]}-{ids[-1]}"
+            )
+            if entry["state"] == dead_letters.EXHAUSTED:
+                when = "[red]gave up[/red]"
+            else:
+                retry_at = datetime.fromtimestamp(entry["next_attempt"])
+                when = f"retry at {retry_at:%Y-%m-%d %H:%M:%S}"
+            self.console.print(
+                f"#{entry['id']} {entry['source_id']} -> {entry['destination_id']} "
+                f"{label}: {entry['error']}, {entry['attempts']} attempts, {when}"
+            )
+
+        action = await inquirer.select(
+            message=f"{len(entries)} failed forwards:",
+            choices=[
+                {"name": "Retry all now", "value": "retry"},
+                {"name": "Purge those that gave up", "value": "purge_exhausted"},
+                {"name": "Purge all", "value": "purge"},
+                {"name": "Back", "value": "back"},
+            ],
+        ).execute_async()
+        if action == "retry":
+            requeued = await self.telegram.retry_dead_letters()
+            self.console.print(
+                f"[bold green]Queued {requeued} failed forwards again.[/bold green]"
+            )
+        elif action in ("purge", "purge_exhausted"):
+            state = dead_letters.EXHAUSTED if action == "purge_exhausted" else None
+            removed = dead_letters.purge(state=state)
+            self.console.print(
+                f"[bold green]Purged {removed} failed forwards.[/bold green]"
             )
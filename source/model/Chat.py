@@ -1,7 +1,6 @@
 import json
 import os
 
-from source.dialog.BaseDialog import BaseDialog
 from source.utils.Constants import (
     CHAT_FILE_PATH,
     IGNORE_CHATS_FILE_PATH,
@@ -67,10 +66,8 @@ class Chat:
                 "access_hash": access_hash,
             }
             chats_list.append(chat_dict)
-        # To get older channels first
-        chats_list = sorted(chats_list, key=lambda x: x["id"])
-        # Sort by title for better readability
-        chats_list = sorted(chats_list, key=lambda x: x["title"])
+        # By title for readability; older chats (lower ids) first within a title
+        chats_list.sort(key=lambda x: (x["title"], x["id"]))
         with open(CHAT_FILE_PATH, "w") as chats_file:
             json.dump(chats_list, chats_file, indent=4)
         return chats_list
@@ -130,6 +127,9 @@ class Chat:
         """
         chats = Chat.read()
         ignore_list = []
+        # Prompting helpers load InquirerPy; headless runs never need them.
+        from source.dialog.BaseDialog import BaseDialog
+
         dialog = BaseDialog()
 
         while True:
@@ -148,6 +148,8 @@ class Chat:
             Chat: The selected wanted user Chat object, or None if cancelled
         """
         chats = Chat.read()
+        from source.dialog.BaseDialog import BaseDialog
+
         dialog = BaseDialog()
         choice = await dialog.list_chats_terminal(chats, "target")
         if choice == -1:
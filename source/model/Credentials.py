@@ -1,8 +1,6 @@
 import json
 import os
 
-from InquirerPy import inquirer
-
 from source.utils.Constants import CREDENTIALS_FILE_PATH
 
 
@@ -49,6 +47,9 @@ class Credentials:
 
     @staticmethod
     async def _get_credentials_from_user():
+        # Imported here so headless runs, which never prompt, don't load it.
+        from InquirerPy import inquirer
+
         api_id = await inquirer.text(message="Enter API ID:").execute_async()
         api_hash = await inquirer.text(message="Enter API Hash:").execute_async()
         phone_number = await inquirer.text(
@@ -1,7 +1,6 @@
 import json
 import os.path
 
-from source.dialog.BaseDialog import BaseDialog
 from source.model.Chat import Chat
 from source.utils.Constants import FORWARD_CONFIG_FILE_PATH
 
@@ -17,6 +16,11 @@ class ForwardConfig:
         end_date=None,
         timezone_name="UTC",
         dry_run=False,
+        enabled=True,
+        media_only=False,
+        keyword=None,
+        schedule=None,
+        dedup=False,
         **kwargs,
     ):
         self.sourceID = sourceID
@@ -27,6 +31,17 @@ class ForwardConfig:
         self.end_date = end_date  # ISO format date string (YYYY-MM-DD)
         self.timezone_name = timezone_name or "UTC"
         self.dry_run = bool(dry_run)
+        # Per-route live forwarding filters. Several configs may share a
+        # sourceID to fan one source out to multiple destinations.
+        self.enabled = bool(enabled)
+        self.media_only = bool(media_only)
+        self.keyword = keyword or None
+        # Cron expression for recurring incremental history syncs of this
+        # route (see SyncScheduler), evaluated in `timezone_name`.
+        self.schedule = schedule or None
+        # Skip messages whose content this destination already received
+        # from any source (see ContentDedup).
+        self.dedup = bool(dedup)
 
     @staticmethod
     def write(forward_config_list):
@@ -42,11 +57,23 @@ class ForwardConfig:
             data = json.load(file)
             return [ForwardConfig(**forwardConfig) for forwardConfig in data]
 
+    @staticmethod
+    def group_by_source(forward_config_list):
+        """Map each source id to the list of its configs. A source may appear
+        in several configs, one per destination."""
+        config_map = {}
+        for config in forward_config_list:
+            config_map.setdefault(config.sourceID, []).append(config)
+        return config_map
+
     @staticmethod
     async def scan():
         chat = Chat()
         chats = chat.read()
         forwardConfigList = []
+        # Prompting helpers load InquirerPy; headless runs never need them.
+        from source.dialog.BaseDialog import BaseDialog
+
         dialog = BaseDialog()
 
         while True:
@@ -1,11 +1,13 @@
 import json
 
 from source.utils.Constants import HISTORY_FILE_PATH
+from source.utils.Metrics import HISTORY_FLUSH_SECONDS, HISTORY_MAPPINGS
 
 
 class History:
     def __init__(self):
         self.message_map = self.load_data()
+        HISTORY_MAPPINGS.set(len(self.message_map))
 
     def convert_to_json_format(self, data):
         return [
@@ -27,9 +29,10 @@ class History:
         }
 
     def save_data(self, data):
-        json_data = self.convert_to_json_format(data)
-        with open(HISTORY_FILE_PATH, "w") as file:
-            json.dump(json_data, file, indent=4)
+        with HISTORY_FLUSH_SECONDS.time():
+            json_data = self.convert_to_json_format(data)
+            with open(HISTORY_FILE_PATH, "w") as file:
+                json.dump(json_data, file, indent=4)
 
     def load_data(self):
         try:
@@ -41,7 +44,16 @@ class History:
 
     def add_mapping(self, source_id, source_msg_id, dest_id, dest_msg_id):
         self.message_map[(source_id, source_msg_id, dest_id)] = dest_msg_id
+        HISTORY_MAPPINGS.set(len(self.message_map))
         self.save_data(self.message_map)
 
     def get_mapping(self, source_id, source_msg_id, dest_id):
         return self.message_map.get((source_id, source_msg_id, dest_id))
+
+    def forwarded_ids(self, source_id, source_msg_ids, dest_id):
+        message_map = self.message_map
+        return {
+            msg_id
+            for msg_id in source_msg_ids
+            if (source_id, msg_id, dest_id) in message_map
+        }
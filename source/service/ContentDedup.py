@@ -0,0 +1,232 @@
+"""Cross-source duplicate detection for routes that opt in with `dedup`.
+
+Several sources often repost the same photo, file or announcement into one
+destination. Each message gets a content fingerprint (the Telegram photo
+or document id plus file size, and its text with case and whitespace
+normalized) and is skipped when its destination has already received the
+same fingerprint from any source. A fingerprint is stored only once the
+send has gone through; until then it is held in memory as in flight, so a
+repost arriving meanwhile is still caught, while a failed or interrupted
+send leaves nothing behind that would skip the content next time.
+
+Lookups go through a per-destination Bloom filter held in memory: a miss,
+the common case, is answered without touching disk; a hit is confirmed
+against the exact fingerprints in `resources/dedup.sqlite3`, so a false
+positive costs one indexed lookup, never a wrongly skipped message. The
+store keeps at most `capacity` fingerprints per destination and
+persists across restarts; each filter is rebuilt from it on first use and
+sized from `capacity` and the configured false-positive rate, which bounds
+memory per destination."""
+
+import hashlib
+import math
+import os
+import sqlite3
+import time
+
+from source.utils.Constants import (
+    DEDUP_CAPACITY,
+    DEDUP_FALSE_POSITIVE_RATE,
+    DEDUP_FILE_PATH,
+    DEDUP_MIN_TEXT_LENGTH,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    destination INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    seen_at REAL NOT NULL,
+    UNIQUE (destination, digest)
+);
+"""
+
+
+class BloomFilter:
+    """Fixed-size set of digests with no false negatives."""
+
+    def __init__(self, capacity: int, error_rate: float):
+        """
+        Args:
+            capacity: Digests it holds at `error_rate`; more raise the rate
+            error_rate: False-positive probability at `capacity`, 0 < p < 1
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError(f"error_rate must be between 0 and 1, got {error_rate}")
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: bytes):
+        # Double hashing: k positions from two 64-bit halves of one digest.
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:16], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, digest: bytes) -> None:
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(digest)
+        )
+
+
+class ContentDedup:
+    def __init__(
+        self,
+        path: str = DEDUP_FILE_PATH,
+        capacity: int = DEDUP_CAPACITY,
+        error_rate: float = DEDUP_FALSE_POSITIVE_RATE,
+    ):
+        """
+        Args:
+            path: SQLite file holding the exact fingerprints
+            capacity: Fingerprints remembered per destination
+            error_rate: Bloom filter false-positive rate; lower costs more
+                memory and saves store lookups
+        """
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.checks = 0
+        self.duplicates = 0
+        self.store_lookups = 0
+        self._filters: dict[int, BloomFilter] = {}
+        # (destination, digest) of content claimed by a send in progress.
+        self._in_flight: set[tuple[int, bytes]] = set()
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        self._filters.clear()
+
+    @staticmethod
+    def fingerprint(message) -> str | None:
+        """Content key of one message, or None when it has too little
+        content to tell a repost from a coincidence (e.g. a short "ok")."""
+        parts = []
+        file = getattr(message, "photo", None) or getattr(message, "document", None)
+        file_id = getattr(file, "id", None) if message.media else None
+        if file_id is not None:
+            size = getattr(getattr(message, "file", None), "size", None)
+            parts.append(f"file:{file_id}:{size}")
+        text = getattr(message, "message", None) or message.text or ""
+        text = " ".join(text.casefold().split())
+        if not parts and len(text) < DEDUP_MIN_TEXT_LENGTH:
+            return None
+        parts.append(f"text:{text}")
+        return "|".join(parts)
+
+    @staticmethod
+    def digest(messages: list) -> bytes | None:
+        """16-byte digest of a message or album; an album is keyed by all
+        its items, so the same set reposted in another order still matches."""
+        fingerprints = [ContentDedup.fingerprint(message) for message in messages]
+        if not any(fingerprints):
+            return None
+        key = "\n".join(sorted(fingerprint or "" for fingerprint in fingerprints))
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+    def _filter(self, destination_id: int) -> BloomFilter:
+        bloom = self._filters.get(destination_id)
+        if bloom is None:
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            for (digest,) in self.db.execute(
+                "SELECT digest FROM fingerprints WHERE destination = ?",
+                (destination_id,),
+            ):
+                bloom.add(digest)
+            self._filters[destination_id] = bloom
+        return bloom
+
+    def seen(self, destination_id: int, messages: list) -> bool:
+        """True if `destination_id` already received this content, or a send
+        of it is in flight; if not, claim it as in flight. The caller then
+        `record`s the content once its send succeeds, or `release`s it if
+        the send fails. Content without a fingerprint is never a
+        duplicate."""
+        digest = self.digest(messages)
+        if digest is None:
+            return False
+        self.checks += 1
+        key = (destination_id, digest)
+        if key in self._in_flight or self._stored(destination_id, digest):
+            self.duplicates += 1
+            return True
+        self._in_flight.add(key)
+        return False
+
+    def _stored(self, destination_id: int, digest: bytes) -> bool:
+        if digest not in self._filter(destination_id):
+            return False
+        self.store_lookups += 1
+        return (
+            self.db.execute(
+                "SELECT 1 FROM fingerprints WHERE destination = ? AND digest = ?",
+                (destination_id, digest),
+            ).fetchone()
+            is not None
+        )
+
+    def record(self, destination_id: int, messages: list) -> None:
+        """Store the fingerprint of content `destination_id` has now received."""
+        digest = self.digest(messages)
+        if digest is None:
+            return
+        self._in_flight.discard((destination_id, digest))
+        bloom = self._filter(destination_id)
+        self.db.execute(
+            "INSERT OR IGNORE INTO fingerprints VALUES (?, ?, ?)",
+            (destination_id, digest, time.time()),
+        )
+        self.db.commit()
+        bloom.add(digest)
+        if bloom.count >= self.capacity:
+            self._compact(destination_id)
+
+    def release(self, destination_id: int, messages: list) -> None:
+        """Drop the in-flight claim of content whose send failed."""
+        digest = self.digest(messages)
+        if digest is not None:
+            self._in_flight.discard((destination_id, digest))
+
+    def _compact(self, destination_id: int) -> None:
+        """Forget the older half of a full destination's fingerprints and
+        rebuild its filter, keeping both memory and the store bounded."""
+        self.db.execute(
+            "DELETE FROM fingerprints WHERE destination = ? AND rowid NOT IN "
+            "(SELECT rowid FROM fingerprints WHERE destination = ? "
+            "ORDER BY seen_at DESC, rowid DESC LIMIT ?)",
+            (destination_id, destination_id, self.capacity // 2),
+        )
+        self.db.commit()
+        del self._filters[destination_id]
+
+    def stats(self) -> dict:
+        return {
+            "checks": self.checks,
+            "duplicates": self.duplicates,
+            "store_lookups": self.store_lookups,
+            "in_flight": len(self._in_flight),
+            "destinations": len(self._filters),
+        }
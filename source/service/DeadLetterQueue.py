@@ -0,0 +1,269 @@
+"""Failed forwards kept for retry instead of being dropped.
+
+A send that raises — a dropped connection, a flood wait, an expired file
+reference — is recorded here by source chat, message ids and destination
+together with the error class. Each entry is retried after an exponential
+back-off (at least as long as a flood wait asked for) until it succeeds or
+reaches `max_attempts`, after which it stays in the store as `exhausted`
+until it is retried by hand or purged. Only ids are stored: a retry
+re-fetches the messages, so file references are fresh again.
+
+Entries live in `resources/dead_letters.sqlite3` and survive restarts."""
+
+import os
+import sqlite3
+import time
+
+from source.utils.Constants import (
+    DEAD_LETTER_FILE_PATH,
+    DEAD_LETTER_MAX_ATTEMPTS,
+    DEAD_LETTER_RETRY_BASE_DELAY,
+    DEAD_LETTER_RETRY_MAX_DELAY,
+)
+from source.utils.Metrics import DEAD_LETTERS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_letters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id INTEGER NOT NULL,
+    message_ids TEXT NOT NULL,
+    destination_id INTEGER NOT NULL,
+    error TEXT NOT NULL,
+    detail TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    failed_at REAL NOT NULL,
+    next_attempt REAL NOT NULL,
+    UNIQUE (source_id, message_ids, destination_id)
+);
+CREATE INDEX IF NOT EXISTS dead_letters_due ON dead_letters (state, next_attempt);
+"""
+
+COLUMNS = (
+    "id",
+    "source_id",
+    "message_ids",
+    "destination_id",
+    "error",
+    "detail",
+    "attempts",
+    "state",
+    "failed_at",
+    "next_attempt",
+)
+
+
+class DeadLetterQueue:
+    PENDING = "pending"
+    EXHAUSTED = "exhausted"
+    STATES = (PENDING, EXHAUSTED)
+
+    def __init__(
+        self,
+        path: str = DEAD_LETTER_FILE_PATH,
+        max_attempts: int = DEAD_LETTER_MAX_ATTEMPTS,
+        base_delay: float = DEAD_LETTER_RETRY_BASE_DELAY,
+        max_delay: float = DEAD_LETTER_RETRY_MAX_DELAY,
+    ):
+        """
+        Args:
+            path: SQLite file holding the entries
+            max_attempts: Failed sends after which an entry is `exhausted`
+                and no longer retried on its own
+            base_delay: Seconds before the first retry, doubled per attempt
+            max_delay: Upper bound for the retry back-off
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._db: sqlite3.Connection | None = None
+        # Keys of stored entries, so a successful send costs a set lookup
+        # rather than a query.
+        self._keys: set[tuple[int, str, int]] | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("PRAGMA synchronous = NORMAL")
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    @property
+    def keys(self) -> set[tuple[int, str, int]]:
+        if self._keys is None:
+            self._keys = set(
+                self.db.execute(
+                    "SELECT source_id, message_ids, destination_id FROM dead_letters"
+                )
+            )
+        return self._keys
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        self._keys = None
+
+    @staticmethod
+    def _key(source_id: int, message_ids: list[int], destination_id: int) -> tuple:
+        return source_id, ",".join(map(str, message_ids)), destination_id
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds to wait after the `attempts`-th failure."""
+        return min(self.max_delay, self.base_delay * 2 ** max(0, attempts - 1))
+
+    def record(
+        self,
+        source_id: int,
+        message_ids: list[int],
+        destination_id: int,
+        error: BaseException,
+    ) -> dict:
+        """Record a failed send of `message_ids` (one message, or an album),
+        or count another failed attempt if it is already recorded.
+
+        Returns:
+            The stored entry
+        """
+        key = self._key(source_id, message_ids, destination_id)
+        row = self.db.execute(
+            "SELECT attempts FROM dead_letters "
+            "WHERE source_id = ? AND message_ids = ? AND destination_id = ?",
+            key,
+        ).fetchone()
+        attempts = (row[0] if row else 0) + 1
+        now = time.time()
+        delay = max(self.backoff(attempts), getattr(error, "seconds", 0) or 0)
+        state = self.EXHAUSTED if attempts >= self.max_attempts else self.PENDING
+        self.db.execute(
+            "INSERT INTO dead_letters (source_id, message_ids, destination_id, "
+            "error, detail, attempts, state, failed_at, next_attempt) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (source_id, message_ids, destination_id) DO UPDATE SET "
+            "error = excluded.error, detail = excluded.detail, "
+            "attempts = excluded.attempts, state = excluded.state, "
+            "failed_at = excluded.failed_at, next_attempt = excluded.next_attempt",
+            (*key, type(error).__name__, str(error), attempts, state, now, now + delay),
+        )
+        self.db.commit()
+        self.keys.add(key)
+        DEAD_LETTERS.labels(state).inc()
+        return self._entries(
+            "WHERE source_id = ? AND message_ids = ? AND destination_id = ?", key
+        )[0]
+
+    def resolve(
+        self, source_id: int, message_ids: list[int], destination_id: int
+    ) -> bool:
+        """Drop the entry for a send that has now gone through, if any."""
+        key = self._key(source_id, message_ids, destination_id)
+        if key not in self.keys:
+            return False
+        self.db.execute(
+            "DELETE FROM dead_letters "
+            "WHERE source_id = ? AND message_ids = ? AND destination_id = ?",
+            key,
+        )
+        self.db.commit()
+        self.keys.discard(key)
+        DEAD_LETTERS.labels("resolved").inc()
+        return True
+
+    def narrow(self, entry_id: int, message_ids: list[int]) -> None:
+        """Shrink an entry to the messages still present in the source (an
+        album some of whose items were deleted since it failed)."""
+        self.db.execute(
+            "UPDATE OR REPLACE dead_letters SET message_ids = ? WHERE id = ?",
+            (",".join(map(str, message_ids)), entry_id),
+        )
+        self.db.commit()
+        self._keys = None
+
+    def claim_due(self, now: float | None = None) -> list[dict]:
+        """Pending entries whose retry time has come. Each is pushed back by
+        its back-off first, so an attempt that never reports back (the
+        process stopped with it queued) is picked up again later rather
+        than twice now."""
+        now = time.time() if now is None else now
+        entries = self._entries(
+            "WHERE state = ? AND next_attempt <= ? ORDER BY next_attempt, id",
+            (self.PENDING, now),
+        )
+        self.db.executemany(
+            "UPDATE dead_letters SET next_attempt = ? WHERE id = ?",
+            [(now + self.backoff(entry["attempts"]), entry["id"]) for entry in entries],
+        )
+        self.db.commit()
+        return entries
+
+    def retry(self, entry_ids: list[int] | None = None) -> int:
+        """Make entries (all, or `entry_ids`) due now. Exhausted entries go
+        back to pending for one more attempt.
+
+        Returns:
+            Entries made due
+        """
+        where, params = self._filter(entry_ids)
+        cursor = self.db.execute(
+            f"UPDATE dead_letters SET state = ?, next_attempt = ?{where}",
+            (self.PENDING, time.time(), *params),
+        )
+        self.db.commit()
+        return cursor.rowcount
+
+    def purge(
+        self, entry_ids: list[int] | None = None, state: str | None = None
+    ) -> int:
+        """Delete entries: all of them, `entry_ids`, and/or those in `state`.
+
+        Returns:
+            Entries deleted
+        """
+        where, params = self._filter(entry_ids, state)
+        cursor = self.db.execute(f"DELETE FROM dead_letters{where}", params)
+        self.db.commit()
+        self._keys = None
+        return cursor.rowcount
+
+    def entries(self, state: str | None = None) -> list[dict]:
+        """Stored entries, oldest failure first."""
+        where, params = self._filter(state=state)
+        return self._entries(f"{where} ORDER BY failed_at, id", params)
+
+    def stats(self) -> dict:
+        counts = dict(
+            self.db.execute("SELECT state, COUNT(*) FROM dead_letters GROUP BY state")
+        )
+        return {state: counts.get(state, 0) for state in self.STATES}
+
+    @staticmethod
+    def _filter(
+        entry_ids: list[int] | None = None, state: str | None = None
+    ) -> tuple[str, tuple]:
+        clauses: list[str] = []
+        params: list[int | str] = []
+        if entry_ids is not None:
+            clauses.append(f"id IN ({','.join('?' * len(entry_ids))})")
+            params.extend(entry_ids)
+        if state is not None:
+            clauses.append("state = ?")
+            params.append(state)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    def _entries(self, clause: str, params: tuple) -> list[dict]:
+        rows = self.db.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM dead_letters {clause}", params
+        )
+        entries = []
+        for row in rows:
+            entry = dict(zip(COLUMNS, row))
+            entry["message_ids"] = [int(i) for i in entry["message_ids"].split(",")]
+            entries.append(entry)
+        return entries
@@ -0,0 +1,79 @@
+"""In-memory cache of the account's dialogs for the web API.
+
+Fetching every dialog from Telegram takes seconds on a large account and
+costs API quota, yet the chat list rarely changes between dashboard loads.
+The cache keeps the last fetch for `ttl` seconds, lets concurrent callers
+share one in-flight fetch, and exposes a content digest as an ETag so
+clients can revalidate without downloading the list again."""
+
+import asyncio
+import hashlib
+import json
+import time
+
+from source.model.Chat import Chat
+from source.utils.Constants import DIALOG_CACHE_TTL
+
+
+class DialogCache:
+    def __init__(self, client, ttl: float = DIALOG_CACHE_TTL):
+        """
+        Args:
+            client: Connected Telegram client
+            ttl: Seconds a fetched dialog list is served before refetching
+        """
+        self.client = client
+        self.ttl = ttl
+        self.etag: str | None = None
+        self._chats: list[Chat] | None = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_fresh(self) -> bool:
+        return (
+            self._chats is not None and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    def invalidate(self) -> None:
+        """Make the next `get` fetch from Telegram."""
+        self._fetched_at = 0.0
+
+    async def get(self, refresh: bool = False) -> list[Chat]:
+        """Return the cached dialogs, fetching them if stale or `refresh`."""
+        chats = self._chats
+        if not refresh and chats is not None and self.is_fresh:
+            return chats
+        fetched_at = self._fetched_at
+        async with self._lock:
+            # Another caller may have fetched while this one waited.
+            if self._fetched_at != fetched_at and self._chats is not None:
+                return self._chats
+            dialogs = await self.client.get_dialogs()
+            # chats.json stays in sync for the CLI dialogs that read it.
+            chat_list = Chat.write(dialogs)
+            digest = hashlib.sha1(
+                json.dumps(chat_list, sort_keys=True).encode()
+            ).hexdigest()
+            self._chats = [Chat(**chat) for chat in chat_list]
+            self.etag = f'"{digest[:16]}"'
+            self._fetched_at = time.monotonic()
+            return self._chats
+
+    @staticmethod
+    def select(
+        chats: list[Chat], chat_type: str | None = None, query: str | None = None
+    ) -> list[Chat]:
+        """Filter by type (case-insensitive) and by a title/username substring."""
+        if chat_type:
+            chat_type = chat_type.lower()
+            chats = [chat for chat in chats if (chat.type or "").lower() == chat_type]
+        if query:
+            query = query.lower()
+            chats = [
+                chat
+                for chat in chats
+                if query in (chat.title or "").lower()
+                or query in (chat.username or "").lower()
+            ]
+        return chats
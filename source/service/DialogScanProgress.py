@@ -0,0 +1,41 @@
+"""Resumable cursor for dialog sweeps (Delete My Messages, Find User
+Messages): remembers which dialogs a sweep has already finished so an
+interrupted run continues with the remaining ones instead of starting over."""
+
+from datetime import datetime
+
+from source.utils.Constants import DIALOG_SCAN_PROGRESS_FILE_PATH
+from source.utils.JsonFile import JsonFile
+
+
+class DialogScanProgress:
+    @staticmethod
+    def _read_all() -> dict:
+        return JsonFile.read(DIALOG_SCAN_PROGRESS_FILE_PATH)
+
+    @staticmethod
+    def _write_all(data: dict) -> bool:
+        return JsonFile.write(DIALOG_SCAN_PROGRESS_FILE_PATH, data)
+
+    @staticmethod
+    def load(operation: str) -> set[int]:
+        """Return the ids of dialogs `operation` already finished."""
+        entry = DialogScanProgress._read_all().get(operation) or {}
+        return set(entry.get("done", []))
+
+    @staticmethod
+    def save(operation: str, done: set[int]) -> bool:
+        """Persist the finished dialog ids for `operation`. Returns True on success."""
+        data = DialogScanProgress._read_all()
+        data[operation] = {
+            "done": sorted(done),
+            "timestamp": datetime.now().isoformat(),
+        }
+        return DialogScanProgress._write_all(data)
+
+    @staticmethod
+    def clear(operation: str) -> None:
+        """Forget `operation`'s cursor once a sweep has covered every dialog."""
+        data = DialogScanProgress._read_all()
+        if data.pop(operation, None) is not None:
+            DialogScanProgress._write_all(data)
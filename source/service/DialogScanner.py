@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from rich.progress import (
+    BarColumn,
+    MofNCompleteColumn,
+    Progress,
+    TextColumn,
+    TimeElapsedColumn,
+)
+
+from source.service.DialogScanProgress import DialogScanProgress
+from source.service.FloodWaitGovernor import FloodWaitGovernor
+from source.utils.Console import Terminal
+from source.utils.Constants import DIALOG_SCAN_CONCURRENCY
+
+
+class DialogScanner:
+    """Runs a per-dialog coroutine over many dialogs with bounded parallelism.
+
+    A semaphore caps how many dialogs are processed at once, a shared
+    `FloodWaitGovernor` pauses every worker when Telegram asks for a flood
+    wait, and finished dialogs are checkpointed through `DialogScanProgress`
+    so an interrupted sweep resumes with only the dialogs still pending.
+    """
+
+    def __init__(
+        self,
+        console=None,
+        max_concurrent: int = DIALOG_SCAN_CONCURRENCY,
+        governor: FloodWaitGovernor | None = None,
+    ):
+        self.console = console or Terminal.console
+        self.max_concurrent = max(1, max_concurrent)
+        self.governor = governor or FloodWaitGovernor(console=self.console)
+
+    async def scan(self, operation: str, dialogs: list, handler) -> dict:
+        """Await `handler(dialog)` for every dialog `operation` hasn't finished.
+
+        Args:
+            operation: Cursor key, e.g. "delete" or "find_user:<user id>"
+            dialogs: Dialogs (anything with an `id`) to sweep
+            handler: Async callable run once per dialog, and again after a
+                flood wait. A dialog is saved as done when it returns, so a
+                handler that queues work must wait for it first.
+
+        Returns:
+            dict with done/failed/skipped dialog counts for this run.
+        """
+        done = DialogScanProgress.load(operation)
+        pending = [dialog for dialog in dialogs if dialog.id not in done]
+        skipped = len(dialogs) - len(pending)
+        if skipped:
+            self.console.print(
+                f"[bold yellow]Resuming: {skipped} dialogs already processed, "
+                f"{len(pending)} pending[/bold yellow]"
+            )
+
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        failed = 0
+
+        with Progress(
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TextColumn("[dim]{task.fields[active]} active"),
+            TimeElapsedColumn(),
+            console=self.console,
+            disable=not getattr(self.console, "is_terminal", False),
+            transient=True,
+            get_time=time.monotonic,
+        ) as progress:
+            task_id = progress.add_task("Dialogs", total=len(pending), active=0)
+            active = 0
+
+            async def process(dialog) -> None:
+                nonlocal active, failed
+                async with semaphore:
+                    active += 1
+                    progress.update(task_id, active=active)
+                    try:
+                        await self.governor.run(handler, dialog)
+                        done.add(dialog.id)
+                        DialogScanProgress.save(operation, done)
+                    except Exception as e:
+                        failed += 1
+                        name = getattr(dialog, "title", None) or dialog.id
+                        self.console.print(
+                            f"[bold red]Error processing dialog {name}:[/bold red] {e}"
+                        )
+                    finally:
+                        active -= 1
+                        progress.update(task_id, advance=1, active=active)
+
+            await asyncio.gather(*(process(dialog) for dialog in pending))
+
+        # Only forget the cursor once every dialog has gone through cleanly;
+        # otherwise the next run retries just the ones that failed.
+        if not failed:
+            DialogScanProgress.clear(operation)
+
+        return {"done": len(pending) - failed, "failed": failed, "skipped": skipped}
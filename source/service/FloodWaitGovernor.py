@@ -0,0 +1,62 @@
+"""Shared flood-wait back-off for concurrent Telegram workers.
+
+Telegram flood limits are per account, not per request, so when one worker
+is told to wait every other worker on the same account has to wait too —
+otherwise the rest keep hammering the API and extend the penalty."""
+
+import asyncio
+
+from telethon import errors
+
+from source.utils.Console import Terminal
+from source.utils.Metrics import FLOOD_WAITS
+
+FLOOD_ERRORS = (errors.FloodWaitError, errors.FloodPremiumWaitError)
+
+
+class FloodWaitGovernor:
+    def __init__(self, max_retries: int = 3, console=None):
+        """
+        Args:
+            max_retries: How many flood waits a single call may sit out before
+                the error is re-raised to the caller.
+        """
+        self.max_retries = max_retries
+        self.console = console or Terminal.console
+        self._resume_at = 0.0
+
+    @property
+    def paused_for(self) -> float:
+        """Seconds left before workers are allowed to call Telegram again."""
+        return max(0.0, self._resume_at - asyncio.get_running_loop().time())
+
+    def penalize(self, seconds: float) -> None:
+        """Hold every worker back for at least `seconds` from now."""
+        resume_at = asyncio.get_running_loop().time() + seconds
+        self._resume_at = max(self._resume_at, resume_at)
+
+    async def wait(self) -> None:
+        """Sleep until any active flood penalty has expired."""
+        while True:
+            delay = self.paused_for
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def run(self, func, *args, **kwargs):
+        """Await `func(*args, **kwargs)`, sitting out flood waits for all workers."""
+        attempt = 0
+        while True:
+            await self.wait()
+            try:
+                return await func(*args, **kwargs)
+            except FLOOD_ERRORS as e:
+                FLOOD_WAITS.labels("dialog_scan").inc()
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                self.console.print(
+                    f"[bold yellow]Flood wait: pausing all workers for "
+                    f"{e.seconds}s[/bold yellow]"
+                )
+                self.penalize(e.seconds)
@@ -1,96 +1,413 @@
 import asyncio
+import sqlite3
+import time
 from datetime import datetime, timezone
 
 from telethon import TelegramClient, events
 from telethon.tl.custom import Message
 
+from source.service.ContentDedup import ContentDedup
+from source.service.DeadLetterQueue import DeadLetterQueue
 from source.service.ForwardProgress import ForwardProgress
 from source.service.HistoryService import HistoryService
+from source.service.MessageArchive import MessageArchive
 from source.service.MessageForwardService import MessageForwardService
 from source.service.MessageQueue import MessageQueue
+from source.service.RawUpdateRouter import MESSAGE_UPDATE_TYPES, RawUpdateRouter
+from source.service.RoutingTable import Route, RoutingTable
 from source.utils.Console import Terminal
-from source.utils.Constants import DEFAULT_CHUNK_SIZE, DEFAULT_BATCH_SIZE
+from source.utils.Constants import (
+    DEAD_LETTER_FETCH_BATCH_SIZE,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    LIVE_HIGH_WATER_SAVE_INTERVAL,
+)
 from source.utils.DateUtils import DateUtils
+from source.utils.Metrics import DUPLICATES_SKIPPED, FETCH_LATENCY
+from source.utils.ProgressDisplay import ProgressDisplay
 
 console = Terminal.console
 
 
 class Forward:
     def __init__(
-        self, client: TelegramClient, forward_config_map: dict, queue: MessageQueue
+        self,
+        client: TelegramClient,
+        forward_config_map: dict,
+        queue: MessageQueue,
+        on_progress=None,
+        max_backlog: int | None = None,
+        archive: MessageArchive | None = None,
+        dedup: ContentDedup | None = None,
+        dead_letters: DeadLetterQueue | None = None,
+        history: HistoryService | None = None,
     ):
+        """
+        Args:
+            on_progress: Optional `(done, total)` callback for history runs;
+                `total` is the same estimate the console progress line shows
+            max_backlog: If set, history runs pause while this many sends
+                are already queued, leaving the queue's rate to live messages
+            archive: If set, history runs and dry-run counts sync it and
+                plan from it instead of scanning the chat from Telegram
+            dedup: Fingerprint store consulted for routes (and history
+                runs) whose config sets `dedup`
+            dead_letters: Store failed sends are recorded in; see
+                `retry_dead_letters`
+            history: Message mapping store; pass the process's shared one,
+                since each store rewrites the whole history file on save
+        """
         self.client = client
         self.forward_config_map = forward_config_map
         self.queue = queue
-        self.history = HistoryService()
-        self.message_forward = MessageForwardService(client, queue=self.queue)
+        self.history = history or HistoryService()
+        self.message_forward = MessageForwardService(
+            client, queue=self.queue, dead_letters=dead_letters
+        )
+        self.routing_table = RoutingTable()
+        self.on_progress = on_progress
+        self.max_backlog = max_backlog
+        self.archive = archive
+        self.dedup = dedup
+        self.dead_letters = dead_letters
+        self.raw_router = RawUpdateRouter(
+            client, self._on_live_message, self._on_live_album
+        )
+        # Live gap catch-up state: the highest id handled per (source,
+        # destination) (saved to ForwardProgress at most every
+        # LIVE_HIGH_WATER_SAVE_INTERVAL), the highest id dispatched per
+        # source this session, and live updates held back while a catch-up
+        # pass is running.
+        self._high_water: dict[tuple[int, int], int] = {}
+        self._high_water_saved_at = 0.0
+        self._dispatched: dict[int, int] = {}
+        self._catching_up = False
+        self._held_back: list[tuple] = []
 
     def add_events(self) -> None:
-        source_chats = list(self.forward_config_map.keys())
-        self.client.add_event_handler(
-            self.message_handler, events.NewMessage(chats=source_chats)
-        )
+        # One raw handler filtered by a frozenset of source ids replaces the
+        # NewMessage/Album pair, which built a full event for every update
+        # before checking its chat.
+        self.routing_table = RoutingTable.compile(self.forward_config_map)
+        self.raw_router.source_ids = self.routing_table.source_ids
         self.client.add_event_handler(
-            self.album_handler, events.Album(chats=source_chats)
+            self.raw_router.handle, events.Raw(types=MESSAGE_UPDATE_TYPES)
         )
 
-    async def message_handler(self, event: events.NewMessage.Event) -> None:
-        try:
-            if event.grouped_id:
-                return
-            destination_id = self._get_destination_id(event.chat_id)
-            if not destination_id:
-                return
-            reply_message = await self._handle_reply(event.message, destination_id)
-            await self._forward_message(destination_id, event.message, reply_message)
-        except Exception as e:
-            console.print(f"[bold red]Error handling message:[/bold red] {e}")
+    def apply_config(self, forward_config_map: dict) -> None:
+        """Swap in a new forward configuration without re-registering
+        handlers. The table is compiled first and then replaced with single
+        assignments, so an event being dispatched keeps the routes it already
+        looked up and the next one sees the new table."""
+        routing_table = RoutingTable.compile(forward_config_map)
+        routing_table.carry_counters_from(self.routing_table)
+        self.forward_config_map = forward_config_map
+        self.routing_table = routing_table
+        self.raw_router.source_ids = routing_table.source_ids
 
-    async def album_handler(self, event: events.Album.Event) -> None:
-        try:
-            destination_id = self._get_destination_id(event.chat_id)
-            if not destination_id:
-                return
-            reply_message = await self._get_album_reply(event.messages, destination_id)
-            await self._forward_album(destination_id, event, reply_message)
-        except Exception as e:
-            console.print(f"[bold red]Error handling album:[/bold red] {e}")
+    def remove_events(self) -> None:
+        """Unregister the live handler, leaving the client connected."""
+        self.client.remove_event_handler(self.raw_router.handle)
 
-    async def history_handler(self) -> None:
-        for source in self.forward_config_map:
-            config = self.forward_config_map[source]
-            start_date = getattr(config, "start_date", None)
-            end_date = getattr(config, "end_date", None)
-            timezone_name = getattr(config, "timezone_name", "UTC")
-            dry_run = bool(getattr(config, "dry_run", False))
-            media_only = bool(getattr(config, "media_only", False))
-            keyword = getattr(config, "keyword", None) or None
-
-            # Check if there's existing progress to resume
-            last_message_id = await self._load_progress(
-                source, start_date, end_date, media_only, keyword
-            )
-            if last_message_id > 0:
+    async def start_live(self) -> int:
+        """Register live handlers, then forward whatever each source posted
+        since live forwarding last ran (see `resume`).
+
+        Returns:
+            Number of messages found in the gap.
+        """
+        self.add_events()
+        return await self.resume()
+
+    async def resume(self) -> int:
+        """Forward the gap since each source's high-water mark before
+        releasing live messages; used at start and after a reconnect.
+
+        Handlers stay registered so nothing posted during the catch-up is
+        lost: live messages arriving meanwhile are held back and dispatched
+        after it, skipping any the catch-up already covered.
+
+        Returns:
+            Number of messages found in the gap.
+        """
+        self._catching_up = True
+        try:
+            return await self.catch_up()
+        finally:
+            self._catching_up = False
+            held_back, self._held_back = self._held_back, []
+            for chat_id, messages, is_album in held_back:
+                newest_dispatched = self._dispatched.get(chat_id, 0)
+                messages = [m for m in messages if m.id > newest_dispatched]
+                if not messages:
+                    continue
+                if is_album:
+                    await self._route_album(chat_id, messages)
+                else:
+                    await self._route_message(chat_id, messages[0])
+
+    async def catch_up(self) -> int:
+        """Backfill every routed source from its persisted live high-water
+        marks, starting at the route furthest behind; routes already past a
+        message skip it through History. Sources live forwarding hasn't seen
+        before only get marks at their newest message, so the first run
+        never replays old history."""
+        total = 0
+        for source in self.routing_table.source_ids:
+            try:
+                total += await self._catch_up_source(source)
+            except Exception as e:
                 console.print(
-                    f"[bold yellow]Resuming from message {last_message_id} for chat {source}[/bold yellow]"
+                    f"[bold red]Error catching up chat {source}:[/bold red] {e}"
                 )
+        self._save_high_water(force=True)
+        return total
 
-            await self._forward_chat_history(
-                source,
-                last_message_id,
-                start_date,
-                end_date,
-                timezone_name,
-                dry_run,
-                media_only,
-                keyword,
+    async def _catch_up_source(self, source: int) -> int:
+        routes = self.routing_table.routes_for(source)
+        cursor_id = ForwardProgress.load_live(
+            source, {route.destination_id for route in routes}
+        )
+        if not cursor_id:
+            latest = await self.client.get_messages(source, limit=1)
+            if latest:
+                for route in routes:
+                    self._advance_high_water(source, route.destination_id, latest[0].id)
+            return 0
+
+        count = 0
+        pending_album: list[Message] = []
+        while True:
+            chunk_messages = await self._fetch_ascending_chunk(
+                source, cursor_id, None, DEFAULT_CHUNK_SIZE, operation="catch_up"
+            )
+            if not chunk_messages:
+                break
+            cursor_id = chunk_messages[-1].id
+
+            for message in chunk_messages:
+                if getattr(message, "action", None):
+                    continue  # Service messages (joins, pins) can't be forwarded
+                count += 1
+                grouped_id = message.grouped_id
+                if pending_album and grouped_id != pending_album[0].grouped_id:
+                    await self._route_album(source, pending_album)
+                    pending_album = []
+                if grouped_id:
+                    pending_album.append(message)
+                else:
+                    await self._route_message(source, message)
+
+            if len(chunk_messages) < DEFAULT_CHUNK_SIZE:
+                break
+
+        if pending_album:
+            await self._route_album(source, pending_album)
+        if count:
+            console.print(
+                f"[bold yellow]Caught up {count} missed messages from chat {source}[/bold yellow]"
+            )
+        return count
+
+    async def _on_live_message(self, chat_id: int, message: Message) -> None:
+        # Live updates that arrive during a catch-up pass wait for it to
+        # finish so the gap is forwarded in order before them.
+        if self._catching_up:
+            self._held_back.append((chat_id, [message], False))
+            return
+        await self._route_message(chat_id, message)
+
+    async def _on_live_album(
+        self, chat_id: int, messages: list[Message], text: str | None = None
+    ) -> None:
+        if self._catching_up:
+            self._held_back.append((chat_id, messages, True))
+            return
+        await self._route_album(chat_id, messages, text)
+
+    async def _route_message(self, chat_id: int, message: Message) -> None:
+        routes = self.routing_table.routes_for(chat_id)
+        if routes:
+            self._mark_dispatched(chat_id, message.id)
+            await asyncio.gather(
+                *(self._deliver_message(route, message) for route in routes)
             )
 
-            # Mark progress as completed
-            if not dry_run:
-                await self._mark_progress_completed(
-                    source, start_date, end_date, media_only, keyword
+    async def _route_album(
+        self, chat_id: int, messages: list[Message], text: str | None = None
+    ) -> None:
+        routes = self.routing_table.routes_for(chat_id)
+        if not routes:
+            return
+        self._mark_dispatched(chat_id, max(m.id for m in messages))
+        if text is None:
+            text = next((m.text for m in messages if m.text), "")
+        await asyncio.gather(
+            *(self._deliver_album(route, messages, text) for route in routes)
+        )
+
+    def _mark_dispatched(self, chat_id: int, message_id: int) -> None:
+        if message_id > self._dispatched.get(chat_id, 0):
+            self._dispatched[chat_id] = message_id
+
+    def _already_forwarded(self, route: Route, messages: list[Message]) -> bool:
+        forwarded = self.history.forwarded_ids(
+            messages[0].chat_id, [m.id for m in messages], route.destination_id
+        )
+        return len(forwarded) == len(messages)
+
+    async def _deliver_message(self, route: Route, message: Message) -> None:
+        # History dedup covers a catch-up pass overlapping messages live
+        # forwarding (or Telethon's own reconnect replay) already sent.
+        if not route.accepts(message) or self._already_forwarded(route, [message]):
+            route.skipped += 1
+            self._advance_high_water(message.chat_id, route.destination_id, message.id)
+            return
+        if self._is_duplicate(route, [message]):
+            self._advance_high_water(message.chat_id, route.destination_id, message.id)
+            return
+        reply_message = await self._handle_reply(message, route.destination_id)
+        await self._forward_message(
+            route.destination_id, message, reply_message, route=route, dedup=route.dedup
+        )
+
+    async def _deliver_album(
+        self, route: Route, messages: list[Message], text: str | None = None
+    ) -> None:
+        # An album's caption usually sits on one item only, so an album
+        # passes the route's filters if any of its items does.
+        if not any(
+            route.accepts(message) for message in messages
+        ) or self._already_forwarded(route, messages):
+            route.skipped += 1
+            self._advance_high_water(
+                messages[0].chat_id, route.destination_id, messages[-1].id
+            )
+            return
+        if self._is_duplicate(route, messages):
+            self._advance_high_water(
+                messages[0].chat_id, route.destination_id, messages[-1].id
+            )
+            return
+        reply_message = await self._get_album_reply(messages, route.destination_id)
+        await self._forward_album(
+            route.destination_id,
+            messages,
+            reply_message,
+            text,
+            route=route,
+            dedup=route.dedup,
+        )
+
+    def _is_duplicate(self, route: Route, messages: list[Message]) -> bool:
+        """Content dedup for live routes that opted in. The content is
+        claimed when a message is queued, so two sources reposting it at
+        once still forward it only once; its fingerprint is stored when
+        the send succeeds."""
+        if not (route.dedup and self.dedup):
+            return False
+        if not self.dedup.seen(route.destination_id, messages):
+            return False
+        route.duplicates += 1
+        DUPLICATES_SKIPPED.labels("live").inc()
+        return True
+
+    def route_stats(self) -> list[dict]:
+        """Per-route delivery counters for the live routing table."""
+        return self.routing_table.stats()
+
+    def _advance_high_water(
+        self, source: int, destination_id: int, message_id: int
+    ) -> None:
+        # One mark per route: a message one route has handled may still be
+        # queued (or have failed) for another.
+        key = (source, destination_id)
+        if message_id <= self._high_water.get(key, 0):
+            return
+        self._high_water[key] = message_id
+        self._save_high_water()
+
+    def _save_high_water(self, force: bool = False) -> None:
+        # Saves are throttled: after a crash, catch-up re-fetches at most
+        # the last interval's worth of messages and History drops them.
+        now = time.monotonic()
+        if not self._high_water:
+            return
+        if (
+            not force
+            and now - self._high_water_saved_at < LIVE_HIGH_WATER_SAVE_INTERVAL
+        ):
+            return
+        if ForwardProgress.save_live(self._high_water):
+            self._high_water_saved_at = now
+
+    async def history_handler(self) -> int:
+        """Forward (or dry-run count) each source's history.
+
+        Returns:
+            Messages forwarded, or matched in dry-run, across all sources.
+        """
+        total = 0
+        for source in self.forward_config_map:
+            # Each route (destination) of a source is forwarded in turn from
+            # its own resume cursor.
+            for config in self._route_configs(source):
+                destination_id = getattr(config, "destinationID", None)
+                start_date = getattr(config, "start_date", None)
+                end_date = getattr(config, "end_date", None)
+                timezone_name = getattr(config, "timezone_name", "UTC")
+                dry_run = bool(getattr(config, "dry_run", False))
+                media_only = bool(getattr(config, "media_only", False))
+                keyword = getattr(config, "keyword", None) or None
+                # Only slices handed out by an AccountPool carry a (low, high)
+                # window.
+                id_range = getattr(config, "id_range", None)
+                id_range = (
+                    tuple(id_range) if isinstance(id_range, (tuple, list)) else None
+                )
+                dedup = getattr(config, "dedup", False) is True
+
+                # Check if there's existing progress to resume
+                last_message_id = await self._load_progress(
+                    source,
+                    start_date,
+                    end_date,
+                    media_only,
+                    keyword,
+                    id_range,
+                    destination_id,
                 )
+                if last_message_id > 0:
+                    console.print(
+                        f"[bold yellow]Resuming from message {last_message_id} for chat {source}[/bold yellow]"
+                    )
+
+                total += await self._forward_chat_history(
+                    source,
+                    last_message_id,
+                    start_date,
+                    end_date,
+                    timezone_name,
+                    dry_run,
+                    media_only,
+                    keyword,
+                    id_range,
+                    dedup,
+                    destination_id,
+                )
+
+                # Mark progress as completed
+                if not dry_run:
+                    await self._mark_progress_completed(
+                        source,
+                        start_date,
+                        end_date,
+                        media_only,
+                        keyword,
+                        id_range,
+                        destination_id,
+                    )
+        return total
 
     async def _forward_chat_history(
         self,
@@ -102,7 +419,10 @@ class Forward:
         dry_run: bool = False,
         media_only: bool = False,
         keyword: str | None = None,
-    ) -> None:
+        id_range: tuple[int, int] | None = None,
+        dedup: bool = False,
+        destination_id: int | None = None,
+    ) -> int:
         """Forward chat history with optional date/media/keyword filtering and
         chunked processing.
 
@@ -113,9 +433,16 @@ class Forward:
             end_date: End date filter (YYYY-MM-DD) or None
             media_only: Only forward messages carrying a file/photo/video
             keyword: Only forward messages whose text/caption contains this
+            id_range: Only forward ids in [low, high); set when an
+                `AccountPool` splits one chat's history across accounts
+            dedup: Skip content the destination already received from any
+                source (needs a `ContentDedup`)
+            destination_id: Route to forward to; defaults to the source's
+                first route
+
+        Returns:
+            Messages forwarded, or matched in dry-run.
         """
-        # Configuration for chunked processing
-        CHUNK_SIZE = DEFAULT_CHUNK_SIZE  # Number of messages to retrieve per chunk
         BATCH_SIZE = (
             DEFAULT_BATCH_SIZE  # Number of messages to process before saving progress
         )
@@ -133,6 +460,7 @@ class Forward:
                 end_datetime,
                 media_only,
                 keyword,
+                id_range,
             )
             item_label = "files" if media_only else "messages"
             keyword_label = f" matching keyword '{keyword}'" if keyword else ""
@@ -142,84 +470,115 @@ class Forward:
                 f"{start_date or 'beginning'} to {end_date or 'latest'} "
                 f"in timezone {timezone_name}"
             )
-            return
+            return match_count
 
-        console.print("[bold blue]Retrieving messages from chat...[/bold blue]")
-
-        # Get total message count first (for progress tracking)
-        total_messages = await self._get_total_message_count(
-            source, start_datetime, end_datetime
-        )
-        console.print(
-            f"[bold green]Found approximately {total_messages} messages to forward[/bold green]"
-        )
-
-        destination_id = self._get_destination_id(source)
+        destination_id = destination_id or self._get_destination_id(source)
         if not destination_id:
             console.print(
                 "[bold red]No destination configured for this chat[/bold red]"
             )
-            return
+            return 0
 
-        # Process messages in chunks, oldest-to-newest, so files/messages are
-        # forwarded in the order they were originally posted.
-        processed_count = 0
-        cursor_id = last_message_id
-        reached_end = False
-
-        # Start background status updater for queue monitoring
-        status_task = asyncio.create_task(self._periodic_status_update())
+        console.print("[bold blue]Retrieving messages from chat...[/bold blue]")
 
-        try:
-            while not reached_end:
-                chunk_messages = await self._fetch_ascending_chunk(
-                    source, cursor_id, start_datetime, CHUNK_SIZE
-                )
+        archive = self._archive_for(id_range)
+        if archive is not None and await self._sync_archive(
+            archive, source, start_datetime, end_datetime
+        ):
+            planned = archive.plan(
+                source,
+                last_message_id,
+                start_datetime,
+                end_datetime,
+                media_only,
+                keyword,
+            )
+            total_messages = len(planned)
+            console.print(
+                f"[bold green]Found {total_messages} messages to forward in the "
+                f"local archive[/bold green]"
+            )
+            batches = archive.fetch(source, planned)
+        else:
+            # Get total message count first (for progress tracking)
+            total_messages = await self._get_total_message_count(
+                source, start_datetime, end_datetime
+            )
+            console.print(
+                f"[bold green]Found approximately {total_messages} messages to forward[/bold green]"
+            )
+            cursor_id, high_id = self._id_window(last_message_id, id_range)
+            batches = self._scan_history(
+                source,
+                cursor_id,
+                high_id,
+                start_datetime,
+                end_datetime,
+                media_only,
+                keyword,
+            )
 
-                if not chunk_messages:
-                    break  # No more messages
-
-                cursor_id = chunk_messages[-1].id  # Highest ID fetched so far
-
-                # Messages already come back oldest-first when reverse=True.
-                messages = []
-                for msg in chunk_messages:
-                    if end_datetime and self._is_after(msg, end_datetime):
-                        reached_end = True
-                        break
-                    if self.matches_criteria(
-                        msg, start_datetime, end_datetime, media_only, keyword
-                    ):
-                        messages.append(msg)
-
-                for i, message in enumerate(messages, 1):
-                    current_total = processed_count + i
-                    percentage = (
-                        (current_total / total_messages) * 100
-                        if total_messages > 0
-                        else 0
-                    )
+        # Process messages batch by batch, oldest-to-newest, so files/messages
+        # are forwarded in the order they were originally posted.
+        processed_count = 0
+        # Messages `History` already maps to this destination were sent by an
+        # earlier run whose saved cursor lagged behind its sends (progress is
+        # saved every BATCH_SIZE messages); they are skipped, not re-sent.
+        skipped_count = 0
+        # Consecutive messages sharing a grouped_id (an album) are held here
+        # and forwarded in one call; an album split across two batches stays
+        # pending until its last item has been fetched.
+        pending_album: list[Message] = []
+
+        # The loop only counts; the shared display draws the bar (with rate,
+        # ETA and queue status) at its own pace, and only in a terminal.
+        display = ProgressDisplay.shared()
+        label = f"{source}{' files' if media_only else ''}"
+        if id_range:
+            label += f" ids {id_range[0]}-{id_range[1] or 'end'}"
+        bar = display.add(label, total_messages, self.queue)
 
-                    console.print(
-                        f"[bold yellow]Progress: {current_total}/{total_messages} ({percentage:.1f}%)[/bold yellow]",
-                        end="\r",
+        try:
+            async for messages in batches:
+                # One existence check per chunk against the mapping index.
+                forwarded = (
+                    self.history.forwarded_ids(
+                        messages[0].chat_id,
+                        [message.id for message in messages],
+                        destination_id,
                     )
-
-                    try:
-                        reply_message = await self._handle_reply(
-                            message, destination_id
-                        )
-                        await self._forward_message(
-                            destination_id, message, reply_message
+                    if messages
+                    else set()
+                )
+                for message in messages:
+                    bar.advance()
+                    if message.id in forwarded:
+                        skipped_count += 1
+                        if not pending_album:
+                            last_message_id = max(last_message_id, message.id)
+                        continue
+
+                    processed_count += 1
+                    if self.on_progress:
+                        self.on_progress(bar.done, total_messages)
+
+                    grouped_id = message.grouped_id
+                    if pending_album and grouped_id != pending_album[0].grouped_id:
+                        last_message_id = await self._forward_history_batch(
+                            destination_id, pending_album, last_message_id, dedup
                         )
-                        last_message_id = max(last_message_id, message.id)
-                    except Exception as e:
-                        console.print(
-                            f"[bold red]Error forwarding message {message.id}: {e}[/bold red]"
+                        pending_album = []
+
+                    if grouped_id:
+                        pending_album.append(message)
+                    else:
+                        last_message_id = await self._forward_history_batch(
+                            destination_id, [message], last_message_id, dedup
                         )
 
-                    # Save progress every BATCH_SIZE messages
-                    if current_total % BATCH_SIZE == 0:
+                    # Save progress every BATCH_SIZE messages. A still-pending
+                    # album isn't counted yet, so a resume re-sends it whole.
+                    if processed_count % BATCH_SIZE == 0:
                         await self._save_progress(
                             source,
                             last_message_id,
@@ -227,45 +586,130 @@ class Forward:
                             end_date,
                             media_only,
                             keyword,
+                            id_range,
+                            destination_id,
                         )
 
-                processed_count += len(messages)
-
-                if len(chunk_messages) < CHUNK_SIZE:
-                    break
+            if pending_album:
+                last_message_id = await self._forward_history_batch(
+                    destination_id, pending_album, last_message_id, dedup
+                )
 
             # Final progress save
             await self._save_progress(
-                source, last_message_id, start_date, end_date, media_only, keyword
+                source,
+                last_message_id,
+                start_date,
+                end_date,
+                media_only,
+                keyword,
+                id_range,
+                destination_id,
             )
 
-            # Clear the progress line and show completion
             item_label = "files" if media_only else "messages"
+            skipped_label = (
+                f" ({skipped_count} already forwarded, skipped)"
+                if skipped_count
+                else ""
+            )
             console.print(
-                f"[bold green]✓ Completed forwarding {processed_count} {item_label}[/bold green]"
+                f"[bold green]✓ Completed forwarding {processed_count} {item_label}"
+                f"{skipped_label}[/bold green]"
             )
+            return processed_count
 
         finally:
-            # Stop the status updater
-            status_task.cancel()
-            try:
-                await status_task
-            except asyncio.CancelledError:
-                pass
+            display.remove(bar)
 
-    async def _periodic_status_update(self) -> None:
-        """Periodically display queue status during forwarding operations."""
-        while True:
-            await asyncio.sleep(2)  # Update every 2 seconds
-            if hasattr(self, "queue") and self.queue:
-                queue_size = self.queue.qsize()
-                current_task = (
-                    str(self.queue.current_task) if self.queue.current_task else "None"
+    async def _forward_history_batch(
+        self,
+        destination_id: int,
+        messages: list[Message],
+        last_message_id: int,
+        dedup: bool = False,
+    ) -> int:
+        """Forward one history item — a single message, or an album's
+        messages in a single call — and return the updated last message id."""
+        if self.max_backlog:
+            await self.queue.wait_below(self.max_backlog)
+        if dedup and self.dedup and self.dedup.seen(destination_id, messages):
+            DUPLICATES_SKIPPED.labels("history").inc()
+            return max(last_message_id, messages[-1].id)
+        try:
+            if len(messages) == 1:
+                reply_message = await self._handle_reply(messages[0], destination_id)
+                await self._forward_message(
+                    destination_id, messages[0], reply_message, dedup=dedup
                 )
+            else:
+                reply_message = await self._get_album_reply(messages, destination_id)
+                await self._forward_album(
+                    destination_id, messages, reply_message, dedup=dedup
+                )
+            return max(last_message_id, messages[-1].id)
+        except Exception as e:
+            console.print(
+                f"[bold red]Error forwarding message {messages[0].id}: {e}[/bold red]"
+            )
+            return last_message_id
+
+    async def retry_dead_letters(self) -> int:
+        """Queue every due dead letter for another send. Messages are
+        re-fetched by id, in batches per source chat, since the failed
+        message objects may carry expired file references; ones deleted from
+        the source since, or already in `History`, are dropped.
+
+        Returns:
+            Dead letters queued again
+        """
+        if not self.dead_letters:
+            return 0
+        by_source: dict[int, list[dict]] = {}
+        for entry in self.dead_letters.claim_due():
+            by_source.setdefault(entry["source_id"], []).append(entry)
+
+        requeued = 0
+        for source_id, entries in by_source.items():
+            wanted = sorted({i for entry in entries for i in entry["message_ids"]})
+            try:
+                fetched = await self._fetch_by_ids(source_id, wanted)
+            except Exception as e:
+                # Left claimed: tried again once its back-off has passed.
                 console.print(
-                    f"[dim]Queue Status: {queue_size} pending | Current: {current_task}[/dim]",
-                    end="\r",
+                    f"[bold red]Error re-fetching failed messages from "
+                    f"{source_id}: {e}[/bold red]"
                 )
+                continue
+            for entry in entries:
+                destination_id = entry["destination_id"]
+                ids = entry["message_ids"]
+                forwarded = self.history.forwarded_ids(source_id, ids, destination_id)
+                messages = [
+                    fetched[i] for i in ids if i in fetched and i not in forwarded
+                ]
+                if not messages:
+                    self.dead_letters.purge([entry["id"]])
+                    continue
+                if len(messages) < len(ids):
+                    self.dead_letters.narrow(entry["id"], [m.id for m in messages])
+                if len(messages) == 1:
+                    await self._forward_message(destination_id, messages[0])
+                else:
+                    await self._forward_album(destination_id, messages)
+                requeued += 1
+        if requeued:
+            console.print(f"[bold blue]Retrying {requeued} failed forwards[/bold blue]")
+        return requeued
+
+    async def _fetch_by_ids(self, source_id: int, ids: list[int]) -> dict:
+        fetched = {}
+        for start in range(0, len(ids), DEAD_LETTER_FETCH_BATCH_SIZE):
+            batch = ids[start : start + DEAD_LETTER_FETCH_BATCH_SIZE]
+            for message in await self.client.get_messages(source_id, ids=batch):
+                if message is not None:
+                    fetched[message.id] = message
+        return fetched
 
     async def _get_total_message_count(
         self,
@@ -311,35 +755,100 @@ class Forward:
         end_datetime: datetime | None,
         media_only: bool = False,
         keyword: str | None = None,
+        id_range: tuple[int, int] | None = None,
     ) -> int:
         """Count source messages in range without forwarding any message."""
-        cursor_id = last_message_id
+        archive = self._archive_for(id_range)
+        if archive is not None and await self._sync_archive(
+            archive, source, start_datetime, end_datetime
+        ):
+            return archive.count(
+                source,
+                last_message_id,
+                start_datetime,
+                end_datetime,
+                media_only,
+                keyword,
+            )
+
+        cursor_id, high_id = self._id_window(last_message_id, id_range)
         total = 0
+        async for messages in self._scan_history(
+            source,
+            cursor_id,
+            high_id,
+            start_datetime,
+            end_datetime,
+            media_only,
+            keyword,
+        ):
+            total += len(messages)
+        return total
+
+    def _archive_for(self, id_range: tuple[int, int] | None) -> MessageArchive | None:
+        """The archive a run reads from, or None if it scans Telegram."""
+        # Pool slices each scan their own id window, which the archive's one
+        # contiguous stretch per chat can't split, so they fetch directly.
+        return None if id_range else self.archive
+
+    async def _sync_archive(
+        self,
+        archive: MessageArchive,
+        source: int,
+        start_datetime: datetime | None,
+        end_datetime: datetime | None,
+    ) -> bool:
+        """Sync the archive for this run; False (after a warning) if it
+        can't be used, so the run falls back to scanning Telegram."""
+        try:
+            fetched = await archive.sync(source, start_datetime, end_datetime)
+        except (sqlite3.Error, OSError) as e:
+            console.print(
+                f"[bold yellow]Message archive unavailable ({e}); "
+                f"scanning chat {source} directly[/bold yellow]"
+            )
+            return False
+        console.print(
+            f"[dim]Archive of chat {source} synced: {fetched} new messages[/dim]"
+        )
+        return True
 
+    async def _scan_history(
+        self,
+        source: int,
+        cursor_id: int,
+        high_id: int | None,
+        start_datetime: datetime | None,
+        end_datetime: datetime | None,
+        media_only: bool = False,
+        keyword: str | None = None,
+    ):
+        """Scan the chat oldest-first from Telegram, yielding each chunk's
+        matching messages until the end date or id window is passed."""
         while True:
             chunk_messages = await self._fetch_ascending_chunk(
                 source, cursor_id, start_datetime, DEFAULT_CHUNK_SIZE
             )
 
             if not chunk_messages:
-                break
+                return
 
             cursor_id = chunk_messages[-1].id
 
             reached_end = False
+            matches = []
             for msg in chunk_messages:
-                if end_datetime and self._is_after(msg, end_datetime):
+                if self._past_window(msg, end_datetime, high_id):
                     reached_end = True
                     break
                 if self.matches_criteria(
                     msg, start_datetime, end_datetime, media_only, keyword
                 ):
-                    total += 1
+                    matches.append(msg)
+            yield matches
 
             if reached_end or len(chunk_messages) < DEFAULT_CHUNK_SIZE:
-                break
-
-        return total
+                return
 
     async def _save_progress(
         self,
@@ -349,10 +858,19 @@ class Forward:
         end_date: str | None = None,
         media_only: bool = False,
         keyword: str | None = None,
+        id_range: tuple[int, int] | None = None,
+        destination_id: int | None = None,
     ) -> None:
         """Save forwarding progress for this chat to resume later."""
         saved = ForwardProgress.save(
-            source, last_message_id, start_date, end_date, media_only, keyword
+            source,
+            last_message_id,
+            start_date,
+            end_date,
+            media_only,
+            keyword,
+            id_range,
+            destination_id,
         )
         if saved:
             console.print(
@@ -370,9 +888,13 @@ class Forward:
         end_date: str | None = None,
         media_only: bool = False,
         keyword: str | None = None,
+        id_range: tuple[int, int] | None = None,
+        destination_id: int | None = None,
     ) -> int:
         """Load saved progress for this chat (see ForwardProgress.load)."""
-        return ForwardProgress.load(source, start_date, end_date, media_only, keyword)
+        return ForwardProgress.load(
+            source, start_date, end_date, media_only, keyword, id_range, destination_id
+        )
 
     async def _mark_progress_completed(
         self,
@@ -381,10 +903,12 @@ class Forward:
         end_date: str | None = None,
         media_only: bool = False,
         keyword: str | None = None,
+        id_range: tuple[int, int] | None = None,
+        destination_id: int | None = None,
     ) -> None:
         """Mark progress as completed for this chat."""
         ForwardProgress.mark_completed(
-            source, start_date, end_date, media_only, keyword
+            source, start_date, end_date, media_only, keyword, id_range, destination_id
         )
 
     def progress_key(
@@ -394,11 +918,19 @@ class Forward:
         end_date: str | None = None,
         media_only: bool = False,
         keyword: str | None = None,
+        destination_id: int | None = None,
     ) -> str:
-        return ForwardProgress.key(source, start_date, end_date, media_only, keyword)
+        return ForwardProgress.key(
+            source,
+            start_date,
+            end_date,
+            media_only,
+            keyword,
+            destination_id=destination_id,
+        )
 
+    @staticmethod
     def build_date_bounds(
-        self,
         start_date: str | None,
         end_date: str | None,
         timezone_name: str = "UTC",
@@ -462,6 +994,24 @@ class Forward:
             return False
         return True
 
+    @staticmethod
+    def _id_window(
+        last_message_id: int, id_range: tuple[int, int] | None
+    ) -> tuple[int, int | None]:
+        """Starting cursor and exclusive upper id for a history scan."""
+        if not id_range:
+            return last_message_id, None
+        low_id, high_id = id_range
+        return max(last_message_id, low_id - 1), high_id
+
+    def _past_window(
+        self, message: Message, end_datetime: datetime | None, high_id: int | None
+    ) -> bool:
+        """True once a scan has moved past its end date or id window."""
+        if high_id is not None and message.id >= high_id:
+            return True
+        return end_datetime is not None and self._is_after(message, end_datetime)
+
     def _is_after(self, message: Message, end_datetime: datetime) -> bool:
         """True once a message (fetched in ascending order) has passed the
         configured end of the range, meaning every later message will too."""
@@ -493,6 +1043,7 @@ class Forward:
         cursor_id: int,
         start_datetime: datetime | None,
         limit: int,
+        operation: str = "history",
     ) -> list[Message]:
         """Fetch the next chunk of messages in ascending (oldest-first) order.
 
@@ -500,20 +1051,31 @@ class Forward:
         configured, jump directly to that date instead of scanning the whole
         chat history from message 1 forward.
         """
-        if cursor_id == 0 and start_datetime:
+        with FETCH_LATENCY.labels(operation).time():
+            if cursor_id == 0 and start_datetime:
+                return await self.client.get_messages(
+                    source, limit=limit, offset_date=start_datetime, reverse=True
+                )
             return await self.client.get_messages(
-                source, limit=limit, offset_date=start_datetime, reverse=True
+                source, limit=limit, min_id=cursor_id, reverse=True
             )
-        return await self.client.get_messages(
-            source, limit=limit, min_id=cursor_id, reverse=True
-        )
 
     async def clear_progress(self) -> bool:
-        """Delete the persisted forward progress file."""
+        """Forget saved history forward progress (see ForwardProgress.clear)."""
         return ForwardProgress.clear()
 
-    def _get_destination_id(self, source_id: int) -> int | None:
+    def _route_configs(self, source_id: int) -> list:
         config = self.forward_config_map.get(source_id)
+        if isinstance(config, (list, tuple)):
+            return list(config)
+        return [config] if config else []
+
+    def _primary_config(self, source_id: int):
+        configs = self._route_configs(source_id)
+        return configs[0] if configs else None
+
+    def _get_destination_id(self, source_id: int) -> int | None:
+        config = self._primary_config(source_id)
         return config.destinationID if config else None
 
     async def _handle_reply(self, message: Message, destination_id: int) -> int | None:
@@ -533,32 +1095,81 @@ class Forward:
         return None
 
     async def _forward_message(
-        self, destination_id: int, message: Message, reply_to: int | None = None
+        self,
+        destination_id: int,
+        message: Message,
+        reply_to: int | None = None,
+        route: Route | None = None,
+        dedup: bool = False,
     ) -> None:
+        # With `dedup` the content was claimed by `ContentDedup.seen`; it is
+        # stored together with the History mapping, or released on failure.
+        claimed = self.dedup if dedup else None
+
+        def on_sent(source_message: Message, sent_message) -> None:
+            if route and sent_message:
+                route.delivered += 1
+                self._advance_high_water(
+                    source_message.chat_id, destination_id, source_message.id
+                )
+            self._on_message_sent(source_message, sent_message)
+            if claimed:
+                claimed.record(destination_id, [source_message])
+
+        def on_failed(source_message: Message, _error) -> None:
+            if claimed:
+                claimed.release(destination_id, [source_message])
+
         try:
             await self.message_forward.forward_message(
-                destination_id, message, reply_to, on_sent=self._on_message_sent
+                destination_id, message, reply_to, on_sent=on_sent, on_failed=on_failed
             )
+            if route:
+                route.queued += 1
         except Exception as e:
+            if route:
+                route.failed += 1
             console.print(f"[bold red]Error forwarding message:[/bold red] {e}")
 
     async def _forward_album(
         self,
         destination_id: int,
-        event: events.Album.Event,
+        messages: list[Message],
         reply_to: int | None = None,
+        text: str | None = None,
+        route: Route | None = None,
+        dedup: bool = False,
     ) -> None:
+        claimed = self.dedup if dedup else None
+
+        def on_sent(source_messages: list[Message], sent_messages) -> None:
+            if route and sent_messages:
+                route.delivered += 1
+                self._advance_high_water(
+                    source_messages[0].chat_id, destination_id, source_messages[-1].id
+                )
+            self._on_album_sent(source_messages, sent_messages, destination_id)
+            if claimed:
+                claimed.record(destination_id, source_messages)
+
+        def on_failed(source_messages: list[Message], _error) -> None:
+            if claimed:
+                claimed.release(destination_id, source_messages)
+
         try:
             await self.message_forward.forward_album(
                 destination_id,
-                event.messages,
-                event.text,
+                messages,
+                text,
                 reply_to,
-                on_sent=lambda _source_messages, sent_messages: self._on_album_sent(
-                    event, sent_messages, destination_id
-                ),
+                on_sent=on_sent,
+                on_failed=on_failed,
             )
+            if route:
+                route.queued += 1
         except Exception as e:
+            if route:
+                route.failed += 1
             console.print(f"[bold red]Error forwarding album:[/bold red] {e}")
 
     def _on_message_sent(self, source_message: Message, sent_message) -> None:
@@ -570,12 +1181,14 @@ class Forward:
         else:
             self._update_history(source_message, sent_message)
 
-    def _on_album_sent(self, event, sent_messages, destination_id: int) -> None:
+    def _on_album_sent(
+        self, source_messages: list[Message], sent_messages, destination_id: int
+    ) -> None:
         if not sent_messages:
             return
         if not isinstance(sent_messages, list):
             sent_messages = [sent_messages]
-        self._update_album_history(event, sent_messages, destination_id)
+        self._update_album_history(source_messages, sent_messages, destination_id)
 
     def _update_history(self, source_message: Message, sent_message: Message) -> None:
         self.history.add_mapping(
@@ -587,11 +1200,14 @@ class Forward:
 
     def _update_album_history(
         self,
-        event: events.Album.Event,
+        source_messages: list[Message],
         sent_messages: list[Message],
         destination_id: int,
     ) -> None:
-        for source_message, dest_message in zip(event.messages, sent_messages):
+        for source_message, dest_message in zip(source_messages, sent_messages):
             self.history.add_mapping(
-                event.chat_id, source_message.id, destination_id, dest_message.id
+                source_message.chat_id,
+                source_message.id,
+                destination_id,
+                dest_message.id,
             )
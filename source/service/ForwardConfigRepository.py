@@ -0,0 +1,102 @@
+"""Cached, write-serialized access to `forwardConfig.json` for the web API.
+
+Every dashboard poll used to re-parse the file, and two edits arriving
+together could both read the old list and the later write would drop the
+earlier one. The repository keeps the parsed list until the file's
+mtime/size changes, runs read-modify-write edits one at a time under an
+asyncio lock, and writes through a temp file plus `os.replace` so readers
+never see a half-written file. Callers get immutable, versioned snapshots;
+edits work on copies."""
+
+import asyncio
+import json
+import os
+
+from source.model.ForwardConfig import ForwardConfig
+from source.utils.Constants import FORWARD_CONFIG_FILE_PATH
+
+
+class ConfigSnapshot:
+    """The configuration as of one version of the file."""
+
+    def __init__(self, version: int, configs: tuple[ForwardConfig, ...]):
+        self.version = version
+        self.configs = configs
+        self.enabled_count = sum(1 for config in configs if config.enabled)
+
+    def copies(self) -> list[ForwardConfig]:
+        """Independent copies of the configs, safe to modify."""
+        return [ForwardConfig(**vars(config)) for config in self.configs]
+
+    def group_by_source(self) -> dict:
+        return ForwardConfig.group_by_source(self.copies())
+
+
+class ForwardConfigRepository:
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path: Configuration file; defaults to FORWARD_CONFIG_FILE_PATH
+        """
+        self.path = path or FORWARD_CONFIG_FILE_PATH
+        self._signature: tuple[int, int] | None = None
+        self._snapshot = ConfigSnapshot(0, ())
+        self._lock = asyncio.Lock()
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def snapshot(self) -> ConfigSnapshot:
+        """Current configuration, re-parsed only if the file changed.
+
+        Raises:
+            json.JSONDecodeError: If another process left the file invalid.
+        """
+        signature = self._stat()
+        if signature != self._signature:
+            configs: tuple[ForwardConfig, ...] = ()
+            if signature is not None:
+                with open(self.path) as file:
+                    configs = tuple(ForwardConfig(**data) for data in json.load(file))
+            # Recorded only after a successful parse, so a bad read retries.
+            self._snapshot = ConfigSnapshot(self._snapshot.version + 1, configs)
+            self._signature = signature
+        return self._snapshot
+
+    async def update(self, mutate) -> ConfigSnapshot:
+        """Apply `mutate(configs)` to a copy of the current list and save it.
+
+        Edits run one at a time, each against the latest file contents. If
+        `mutate` raises, nothing is written and the exception propagates.
+
+        Args:
+            mutate: Callable editing the list of `ForwardConfig` in place
+
+        Returns:
+            The snapshot that was written.
+        """
+        async with self._lock:
+            configs = self.snapshot().copies()
+            mutate(configs)
+            # The fsync runs off the event loop; the lock keeps the next edit
+            # from reading the file before this write lands.
+            await asyncio.to_thread(self._write, configs)
+            # The written list is the new snapshot; no need to parse it back.
+            self._snapshot = ConfigSnapshot(
+                self._snapshot.version + 1,
+                tuple(ForwardConfig(**vars(c)) for c in configs),
+            )
+            self._signature = self._stat()
+            return self._snapshot
+
+    def _write(self, configs: list[ForwardConfig]) -> None:
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump([vars(config) for config in configs], file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
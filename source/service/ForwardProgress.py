@@ -2,11 +2,11 @@
 keyword forwards, so re-running the same source/date-range/mode picks up
 after whatever was already forwarded instead of duplicating it."""
 
-import json
-import os
 from datetime import datetime
 
 from source.utils.Constants import FORWARD_PROGRESS_FILE_PATH
+from source.utils.JsonFile import JsonFile
+from source.utils.Metrics import PROGRESS_SAVE_SECONDS
 
 
 class ForwardProgress:
@@ -17,6 +17,8 @@ class ForwardProgress:
         end_date: str | None = None,
         media_only: bool = False,
         keyword: str | None = None,
+        id_range: tuple[int, int] | None = None,
+        destination_id: int | None = None,
     ) -> str:
         start_value = start_date or "none"
         end_value = end_date or "none"
@@ -29,6 +31,14 @@ class ForwardProgress:
             progress_key += "|media"
         if keyword:
             progress_key += f"|kw:{keyword.lower()}"
+        # One slice of a history job split across pooled accounts; the
+        # last slice of an open-ended job has no upper bound.
+        if id_range:
+            progress_key += f"|ids:{id_range[0]}-{id_range[1] or 'end'}"
+        # Each destination of a source keeps its own cursor: one that is
+        # further along must not make the others skip what they still lack.
+        if destination_id is not None:
+            progress_key += f"|to:{destination_id}"
         return progress_key
 
     @staticmethod
@@ -38,6 +48,8 @@ class ForwardProgress:
         end_date: str | None = None,
         media_only: bool = False,
         keyword: str | None = None,
+        id_range: tuple[int, int] | None = None,
+        destination_id: int | None = None,
     ) -> int:
         """Resumes from the last processed message ID regardless of whether
         the prior run finished ("completed") or was interrupted
@@ -48,35 +60,33 @@ class ForwardProgress:
         Returns:
             Last processed message ID, or 0 if no progress saved.
         """
-        progress_file = FORWARD_PROGRESS_FILE_PATH
         progress_key = ForwardProgress.key(
-            source, start_date, end_date, media_only, keyword
+            source, start_date, end_date, media_only, keyword, id_range, destination_id
         )
+        progress_data = ForwardProgress._read_all()
 
-        if not os.path.exists(progress_file):
-            return 0
+        chat_progress = progress_data.get(progress_key)
+        if chat_progress is None and destination_id is not None:
+            # Written before cursors were kept per destination.
+            chat_progress = progress_data.get(
+                ForwardProgress.key(
+                    source, start_date, end_date, media_only, keyword, id_range
+                )
+            )
+        if chat_progress and chat_progress.get("status") in (
+            "in_progress",
+            "completed",
+        ):
+            return chat_progress.get("last_message_id", 0)
 
-        try:
-            with open(progress_file, encoding="utf-8") as f:
-                progress_data = json.load(f)
-
-            chat_progress = progress_data.get(progress_key)
-            if chat_progress and chat_progress.get("status") in (
-                "in_progress",
-                "completed",
-            ):
-                return chat_progress.get("last_message_id", 0)
-
-            # Backward compatibility: older progress files keyed only by source id.
-            legacy_progress = progress_data.get(str(source))
-            if legacy_progress and legacy_progress.get("status") in (
-                "in_progress",
-                "completed",
-            ):
-                return legacy_progress.get("last_message_id", 0)
-
-        except (json.JSONDecodeError, OSError, KeyError):
-            pass
+        # Backward compatibility: older progress files keyed only by source
+        # id. A slice must not resume from a whole-chat cursor.
+        legacy_progress = None if id_range else progress_data.get(str(source))
+        if legacy_progress and legacy_progress.get("status") in (
+            "in_progress",
+            "completed",
+        ):
+            return legacy_progress.get("last_message_id", 0)
 
         return 0
 
@@ -88,36 +98,24 @@ class ForwardProgress:
         end_date: str | None = None,
         media_only: bool = False,
         keyword: str | None = None,
+        id_range: tuple[int, int] | None = None,
+        destination_id: int | None = None,
     ) -> bool:
         """Persist progress for this chat/range/mode. Returns True on success."""
-        progress_file = FORWARD_PROGRESS_FILE_PATH
         progress_key = ForwardProgress.key(
-            source, start_date, end_date, media_only, keyword
+            source, start_date, end_date, media_only, keyword, id_range, destination_id
         )
-
-        progress_data = {}
-        if os.path.exists(progress_file):
-            try:
-                with open(progress_file, encoding="utf-8") as f:
-                    progress_data = json.load(f)
-            except (json.JSONDecodeError, OSError):
-                progress_data = {}
-
+        progress_data = ForwardProgress._read_all()
         progress_data[progress_key] = {
             "source": source,
+            "destination_id": destination_id,
             "start_date": start_date,
             "end_date": end_date,
             "last_message_id": last_message_id,
             "timestamp": datetime.now().isoformat(),
             "status": "in_progress",
         }
-
-        try:
-            with open(progress_file, "w", encoding="utf-8") as f:
-                json.dump(progress_data, f, indent=2)
-            return True
-        except OSError:
-            return False
+        return ForwardProgress._write_all(progress_data)
 
     @staticmethod
     def mark_completed(
@@ -126,36 +124,196 @@ class ForwardProgress:
         end_date: str | None = None,
         media_only: bool = False,
         keyword: str | None = None,
+        id_range: tuple[int, int] | None = None,
+        destination_id: int | None = None,
     ) -> None:
-        progress_file = FORWARD_PROGRESS_FILE_PATH
         progress_key = ForwardProgress.key(
-            source, start_date, end_date, media_only, keyword
+            source, start_date, end_date, media_only, keyword, id_range, destination_id
         )
-
-        progress_data = {}
-        if os.path.exists(progress_file):
-            try:
-                with open(progress_file, encoding="utf-8") as f:
-                    progress_data = json.load(f)
-            except (json.JSONDecodeError, OSError):
-                progress_data = {}
-
+        progress_data = ForwardProgress._read_all()
         if progress_key in progress_data:
             progress_data[progress_key]["status"] = "completed"
             progress_data[progress_key]["completed_at"] = datetime.now().isoformat()
+            ForwardProgress._write_all(progress_data)
+
+    @staticmethod
+    def _read_all() -> dict:
+        return JsonFile.read(FORWARD_PROGRESS_FILE_PATH)
+
+    @staticmethod
+    def _write_all(progress_data: dict) -> bool:
+        with PROGRESS_SAVE_SECONDS.time():
+            return JsonFile.write(FORWARD_PROGRESS_FILE_PATH, progress_data)
 
-            try:
-                with open(progress_file, "w", encoding="utf-8") as f:
-                    json.dump(progress_data, f, indent=2)
-            except OSError:
-                pass  # Ignore save errors for completion marking
+    @staticmethod
+    def global_key(
+        keyword: str, start_date: str | None = None, end_date: str | None = None
+    ) -> str:
+        """Key for a cross-chat (global search) keyword run. Global runs have
+        no single source, so they live in their own `global|...` namespace."""
+        return (
+            f"global|{start_date or 'none'}|{end_date or 'none'}|kw:{keyword.lower()}"
+        )
+
+    @staticmethod
+    def load_global(
+        keyword: str, start_date: str | None = None, end_date: str | None = None
+    ) -> dict:
+        """Resume state for a global (cross-chat) keyword run.
+
+        Global search pages newest-first, so the state is positional rather
+        than a single last message id:
+
+        - `offset`: (rate, peer id, message id) search offset an interrupted
+          pass continues from, or None to start at the newest result
+        - `newest`: (date, peer id, message id) of the newest result seen by
+          the pass in progress
+        - `floor`: `newest` of the last completed pass; results at or below
+          it were already handled and end the next pass
+
+        Returns:
+            dict with `offset`, `newest` and `floor` (each a tuple or None).
+        """
+        entry = ForwardProgress._read_all().get(
+            ForwardProgress.global_key(keyword, start_date, end_date)
+        )
+        if not entry:
+            return {"offset": None, "newest": None, "floor": None}
+
+        def as_tuple(value):
+            return tuple(value) if value else None
+
+        if entry.get("status") == "completed":
+            return {"offset": None, "newest": None, "floor": as_tuple(entry["newest"])}
+        return {
+            "offset": as_tuple(entry.get("offset")),
+            "newest": as_tuple(entry.get("newest")),
+            "floor": as_tuple(entry.get("floor")),
+        }
+
+    @staticmethod
+    def save_global(
+        keyword: str,
+        state: dict,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        completed: bool = False,
+    ) -> bool:
+        """Persist a global keyword run's state (see `load_global`).
+        Returns True on success."""
+        progress_data = ForwardProgress._read_all()
+        entry: dict[str, object] = {
+            "keyword": keyword,
+            "start_date": start_date,
+            "end_date": end_date,
+            "timestamp": datetime.now().isoformat(),
+            "status": "completed" if completed else "in_progress",
+        }
+        for field in ("offset", "newest", "floor"):
+            value = state.get(field)
+            entry[field] = list(value) if value else None
+        if completed:
+            # A finished pass covered everything down to the old floor, so
+            # the next pass only needs results newer than this one's newest.
+            entry["newest"] = entry["newest"] or entry["floor"]
+            entry["offset"] = None
+        progress_data[ForwardProgress.global_key(keyword, start_date, end_date)] = entry
+        return ForwardProgress._write_all(progress_data)
+
+    @staticmethod
+    def plan_key(
+        source: int, start_date: str | None = None, end_date: str | None = None
+    ) -> str:
+        """Key for the id windows an `AccountPool` split a source's history
+        into for this date range."""
+        return f"plan|{source}|{start_date or 'none'}|{end_date or 'none'}"
+
+    @staticmethod
+    def load_plan(
+        source: int, start_date: str | None = None, end_date: str | None = None
+    ) -> list[tuple[int, int | None]] | None:
+        """Saved `(low, high)` windows of a split history job, or None if the
+        job was never split. Each window's resume cursor is keyed by its
+        bounds, so a resumed job has to cut the same windows again."""
+        entry = ForwardProgress._read_all().get(
+            ForwardProgress.plan_key(source, start_date, end_date)
+        )
+        return [tuple(window) for window in entry["windows"]] if entry else None
+
+    @staticmethod
+    def save_plan(
+        source: int,
+        windows: list[tuple[int, int | None]],
+        start_date: str | None = None,
+        end_date: str | None = None,
+    ) -> bool:
+        """Persist a split history job's windows. Returns True on success."""
+        progress_data = ForwardProgress._read_all()
+        progress_data[ForwardProgress.plan_key(source, start_date, end_date)] = {
+            "source": source,
+            "start_date": start_date,
+            "end_date": end_date,
+            "windows": [list(window) for window in windows],
+            "timestamp": datetime.now().isoformat(),
+        }
+        return ForwardProgress._write_all(progress_data)
+
+    @staticmethod
+    def live_key(source: int, destination_id: int | None = None) -> str:
+        """Key for a route's live-forwarding high-water mark; without a
+        destination, the source-wide mark older versions kept."""
+        if destination_id is None:
+            return f"live|{source}"
+        return f"live|{source}|to:{destination_id}"
+
+    @staticmethod
+    def load_live(source: int, destination_ids=None) -> int:
+        """Message id up to which live forwarding has handled `source` for
+        every one of `destination_ids` (default: every destination with a
+        mark), i.e. the lowest of their marks. Destinations without a mark
+        yet are left out. 0 if live forwarding has never run for it."""
+        progress_data = ForwardProgress._read_all()
+        prefix = f"{ForwardProgress.live_key(source)}|to:"
+        marks = [
+            entry.get("last_message_id", 0)
+            for key, entry in progress_data.items()
+            if key.startswith(prefix)
+            and (destination_ids is None or entry["destination_id"] in destination_ids)
+        ]
+        if marks:
+            return min(marks)
+        entry = progress_data.get(ForwardProgress.live_key(source))
+        return entry.get("last_message_id", 0) if entry else 0
+
+    @staticmethod
+    def save_live(high_water: dict[tuple[int, int], int]) -> bool:
+        """Persist live high-water marks, keyed by (source, destination), in
+        one write. Marks only ever move forward. Returns True on success."""
+        progress_data = ForwardProgress._read_all()
+        timestamp = datetime.now().isoformat()
+        for (source, destination_id), message_id in high_water.items():
+            key = ForwardProgress.live_key(source, destination_id)
+            previous = progress_data.get(key, {}).get("last_message_id", 0)
+            progress_data[key] = {
+                "source": source,
+                "destination_id": destination_id,
+                "last_message_id": max(previous, message_id),
+                "timestamp": timestamp,
+                "status": "live",
+            }
+        return ForwardProgress._write_all(progress_data)
 
     @staticmethod
     def clear() -> bool:
-        """Delete the persisted forward progress file. Returns True if a file existed."""
-        progress_file = FORWARD_PROGRESS_FILE_PATH
-        if not os.path.exists(progress_file):
+        """Forget the resume cursors of history, media and keyword forwards
+        (and split plans). Live high-water marks and global keyword search
+        state are kept. Returns True if there was anything to clear."""
+        progress_data = ForwardProgress._read_all()
+        kept = {
+            key: entry
+            for key, entry in progress_data.items()
+            if key.startswith(("live|", "global|"))
+        }
+        if len(kept) == len(progress_data):
             return False
-
-        os.remove(progress_file)
-        return True
+        return ForwardProgress._write_all(kept)
@@ -0,0 +1,94 @@
+import itertools
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from telethon import utils
+from telethon.tl import functions, types
+from telethon.tl.custom import Message
+
+GLOBAL_SEARCH_PAGE_SIZE = 100  # Telegram's per-request maximum
+
+
+class GlobalSearch:
+    """Pages through Telegram's cross-chat message search (`messages.searchGlobal`).
+
+    Results come back newest first. Each page is yielded with the
+    (rate, peer id, message id) offset that requests the page after it, so
+    callers can persist that offset and continue an interrupted pass later.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    async def iter_pages(
+        self,
+        query: str,
+        min_date: datetime | None = None,
+        max_date: datetime | None = None,
+        offset: tuple[int, int, int] | None = None,
+        channels_only: bool = False,
+    ) -> AsyncIterator[tuple[list[Message], tuple[int, int, int]]]:
+        """Yield `(messages, next_offset)` pages until the search is exhausted.
+
+        Args:
+            query: Text to search for across every chat
+            min_date/max_date: Optional server-side date bounds
+            offset: (rate, peer id, message id) to continue from, or None to
+                start at the newest result
+            channels_only: Only search broadcast channels
+        """
+        rate, peer_id, message_id = offset or (0, 0, 0)
+        offset_peer = await self._input_peer(peer_id)
+
+        while True:
+            result = await self.client(
+                functions.messages.SearchGlobalRequest(
+                    q=query,
+                    filter=types.InputMessagesFilterEmpty(),
+                    min_date=min_date,
+                    max_date=max_date,
+                    offset_rate=rate,
+                    offset_peer=offset_peer,
+                    offset_id=message_id,
+                    limit=GLOBAL_SEARCH_PAGE_SIZE,
+                    broadcasts_only=channels_only or None,
+                )
+            )
+
+            entities = {
+                utils.get_peer_id(entity): entity
+                for entity in itertools.chain(result.users, result.chats)
+            }
+            messages = [
+                message
+                for message in result.messages
+                if not isinstance(message, types.MessageEmpty)
+            ]
+            if not messages:
+                return
+            for message in messages:
+                message._finish_init(self.client, entities, None)
+
+            last = messages[-1]
+            rate = getattr(result, "next_rate", None) or int(last.date.timestamp())
+            peer_id = utils.get_peer_id(last.peer_id)
+            message_id = last.id
+            offset_entity = entities.get(peer_id)
+            offset_peer = (
+                utils.get_input_peer(offset_entity)
+                if offset_entity
+                else await self._input_peer(peer_id)
+            )
+
+            yield messages, (rate, peer_id, message_id)
+
+            if len(result.messages) < GLOBAL_SEARCH_PAGE_SIZE:
+                return
+
+    async def _input_peer(self, peer_id: int):
+        if not peer_id:
+            return types.InputPeerEmpty()
+        try:
+            return await self.client.get_input_entity(peer_id)
+        except ValueError:
+            return types.InputPeerEmpty()
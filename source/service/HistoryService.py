@@ -55,6 +55,27 @@ class HistoryService:
             logger.error(f"Error getting message mapping: {e}", exc_info=True)
             return None
 
+    def forwarded_ids(
+        self, source_chat_id: int, source_msg_ids: list[int], dest_chat_id: int
+    ) -> set[int]:
+        """Get which of a batch of source messages already have a mapping.
+
+        Args:
+            source_chat_id: ID of the source chat
+            source_msg_ids: IDs of the source messages to check
+            dest_chat_id: ID of the destination chat
+
+        Returns:
+            The subset of `source_msg_ids` already forwarded to the destination
+        """
+        try:
+            return self._history.forwarded_ids(
+                source_chat_id, source_msg_ids, dest_chat_id
+            )
+        except Exception as e:
+            logger.error(f"Error checking message mappings: {e}", exc_info=True)
+            return set()
+
     def get_all_mappings(self) -> dict[tuple[int, int, int], int]:
         """Get all message mappings.
 
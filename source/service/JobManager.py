@@ -0,0 +1,143 @@
+"""Background jobs for long-running operations started from the web API.
+
+A keyword, history or media forward can take far longer than an HTTP
+request should stay open, so the API submits it here and returns a job id
+at once. Jobs run as asyncio tasks behind a semaphore, report progress
+through `Job.report`, can be cancelled, and once finished are kept in a
+small ring buffer so recent results stay queryable without growing memory
+forever."""
+
+import asyncio
+import itertools
+from collections import deque
+from datetime import datetime
+
+from source.utils.Constants import JOB_CONCURRENCY, JOB_HISTORY_SIZE
+
+
+class Job:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, job_id: str, kind: str, params: dict | None = None):
+        self.id = job_id
+        self.kind = kind
+        self.params = params or {}
+        self.state = self.QUEUED
+        self.done = 0
+        self.total: int | None = None
+        self.result = None
+        self.error: str | None = None
+        self.created_at = datetime.now()
+        self.started_at: datetime | None = None
+        self.finished_at: datetime | None = None
+        self.task: asyncio.Task | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (self.COMPLETED, self.FAILED, self.CANCELLED)
+
+    def report(self, done: int, total: int | None = None) -> None:
+        """Progress callback handed to the running operation."""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "state": self.state,
+            "progress": {"done": self.done, "total": self.total},
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobManager:
+    def __init__(
+        self,
+        max_concurrent: int = JOB_CONCURRENCY,
+        history_size: int = JOB_HISTORY_SIZE,
+    ):
+        """
+        Args:
+            max_concurrent: Jobs allowed to run at once; the rest wait queued
+            history_size: Finished jobs kept for status queries
+        """
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrent))
+        self._active: dict[str, Job] = {}
+        self._finished: deque[Job] = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+
+    def submit(self, kind: str, operation, params: dict | None = None) -> Job:
+        """Schedule `operation(job)` and return its job right away.
+
+        Args:
+            kind: Label such as "keyword", "history" or "media"
+            operation: Async callable taking the `Job`; its return value
+                becomes the job result
+            params: Request parameters echoed back in status responses
+        """
+        job = Job(f"{kind}-{next(self._ids)}", kind, params)
+        self._active[job.id] = job
+        job.task = asyncio.create_task(self._run(job, operation))
+        return job
+
+    async def _run(self, job: Job, operation) -> None:
+        try:
+            async with self._semaphore:
+                job.state = Job.RUNNING
+                job.started_at = datetime.now()
+                job.result = await operation(job)
+                job.state = Job.COMPLETED
+        except asyncio.CancelledError:
+            job.state = Job.CANCELLED
+        except Exception as e:
+            job.state = Job.FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+            self._active.pop(job.id, None)
+            self._finished.append(job)
+
+    def get(self, job_id: str) -> Job | None:
+        job = self._active.get(job_id)
+        if job:
+            return job
+        return next((job for job in self._finished if job.id == job_id), None)
+
+    def list(self) -> list[Job]:
+        """Active jobs followed by recently finished ones, newest first."""
+        return list(self._active.values()) + list(reversed(self._finished))
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job.
+
+        Messages the job already handed to the rate-limited queue are still
+        sent; cancelling stops it from queueing more.
+
+        Returns:
+            False if the job doesn't exist or has already finished.
+        """
+        job = self._active.get(job_id)
+        if not job or not job.task:
+            return False
+        job.task.cancel()
+        try:
+            await job.task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    async def shutdown(self) -> None:
+        """Cancel every job still queued or running."""
+        for job_id in list(self._active):
+            await self.cancel(job_id)
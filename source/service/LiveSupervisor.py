@@ -0,0 +1,219 @@
+"""Owns a live-forwarding session: the `Forward` instance, its event handler
+and config watcher, and the reconnect loop around `run_until_disconnected`.
+
+Both the CLI and the web dashboard drive live forwarding through a
+supervisor, so one process can hold the Telegram session and serve the
+dashboard instead of two processes competing for the same session file."""
+
+import asyncio
+import time
+from datetime import datetime
+
+from source.service.Forward import Forward
+from source.service.ForwardConfigWatcher import ForwardConfigWatcher
+from source.utils.Console import Terminal
+from source.utils.Constants import (
+    DEAD_LETTER_POLL_INTERVAL,
+    LIVE_RECONNECT_BASE_DELAY,
+    LIVE_RECONNECT_MAX_DELAY,
+)
+
+
+class LiveSupervisor:
+    STOPPED = "stopped"
+    STARTING = "starting"
+    RUNNING = "running"
+    RECONNECTING = "reconnecting"
+
+    def __init__(
+        self,
+        client,
+        queue,
+        console=None,
+        base_delay: float = LIVE_RECONNECT_BASE_DELAY,
+        max_delay: float = LIVE_RECONNECT_MAX_DELAY,
+        scheduler=None,
+        dedup=None,
+        dead_letters=None,
+        history=None,
+        retry_interval: float = DEAD_LETTER_POLL_INTERVAL,
+    ):
+        """
+        Args:
+            client: Connected Telegram client shared with the rest of the app
+            queue: Rate-limited MessageQueue deliveries go through
+            base_delay: First reconnect back-off, doubled after every failure
+            max_delay: Upper bound for the reconnect back-off
+            scheduler: Optional `SyncScheduler` run for as long as live
+                forwarding is, sharing its queue
+            dedup: Optional `ContentDedup` for routes that set `dedup`
+            dead_letters: Optional `DeadLetterQueue`; failed sends are
+                recorded in it and its due entries retried every
+                `retry_interval` seconds while live forwarding runs
+            history: Optional `HistoryService` shared with other forwards
+        """
+        self.client = client
+        self.queue = queue
+        self.console = console or Terminal.console
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.scheduler = scheduler
+        self.dedup = dedup
+        self.dead_letters = dead_letters
+        self.history = history
+        self.retry_interval = retry_interval
+
+        self.state = self.STOPPED
+        self.forward: Forward | None = None
+        self.watcher: ForwardConfigWatcher | None = None
+        self.started_at: datetime | None = None
+        self.reconnects = 0
+        self.last_error: str | None = None
+        self._started_monotonic = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, forward_config_map: dict) -> bool:
+        """Start live forwarding in the background.
+
+        Returns:
+            False if live forwarding is already running.
+        """
+        if self.is_active:
+            return False
+        self.state = self.STARTING
+        self._task = asyncio.create_task(self._supervise(forward_config_map))
+        return True
+
+    async def run(self, forward_config_map: dict) -> None:
+        """Start live forwarding and wait until it is stopped (CLI use)."""
+        if await self.start(forward_config_map) and self._task is not None:
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                await self.stop()
+                raise
+
+    async def stop(self) -> bool:
+        """Stop live forwarding; the client itself stays connected.
+
+        Returns:
+            False if live forwarding wasn't running.
+        """
+        task = self._task
+        if task is None or task.done():
+            return False
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return True
+
+    def reload(self) -> None:
+        """Ask the running session to re-read forwardConfig.json now."""
+        if self.watcher:
+            self.watcher.poke()
+
+    async def _supervise(self, forward_config_map: dict) -> None:
+        forward = Forward(
+            self.client,
+            forward_config_map,
+            self.queue,
+            dedup=self.dedup,
+            dead_letters=self.dead_letters,
+            history=self.history,
+        )
+        watcher = ForwardConfigWatcher(forward.apply_config, console=self.console)
+        self.forward, self.watcher = forward, watcher
+        self.started_at = datetime.now()
+        self._started_monotonic = time.monotonic()
+        self.reconnects = 0
+        self.last_error = None
+        retry_task = None
+
+        try:
+            await forward.start_live()
+            watcher.start()
+            if self.scheduler:
+                self.scheduler.start()
+            if self.dead_letters:
+                retry_task = asyncio.create_task(self._retry_dead_letters(forward))
+            failures = 0
+            while True:
+                self.state = self.RUNNING
+                try:
+                    await self.client.run_until_disconnected()
+                except Exception as e:
+                    self.last_error = str(e)
+
+                # Handlers stay registered on the client, so a reconnect only
+                # has to restore the connection and forward the gap.
+                self.state = self.RECONNECTING
+                while True:
+                    delay = min(self.max_delay, self.base_delay * 2**failures)
+                    self.console.print(
+                        f"[bold yellow]Live forwarding disconnected; "
+                        f"reconnecting in {delay:.0f}s[/bold yellow]"
+                    )
+                    await asyncio.sleep(delay)
+                    try:
+                        await self.client.connect()
+                        await forward.resume()
+                        break
+                    except Exception as e:
+                        failures += 1
+                        self.last_error = str(e)
+                failures = 0
+                self.reconnects += 1
+        finally:
+            if retry_task:
+                retry_task.cancel()
+                await asyncio.gather(retry_task, return_exceptions=True)
+            if self.scheduler:
+                await self.scheduler.stop()
+            await watcher.stop()
+            forward.remove_events()
+            await forward.raw_router.flush()
+            self.state = self.STOPPED
+
+    async def _retry_dead_letters(self, forward: Forward) -> None:
+        while True:
+            await asyncio.sleep(self.retry_interval)
+            try:
+                await forward.retry_dead_letters()
+            except Exception as e:
+                self.console.print(
+                    f"[bold red]Retrying failed forwards failed:[/bold red] {e}"
+                )
+
+    def uptime_seconds(self) -> float:
+        if self.state == self.STOPPED or not self._started_monotonic:
+            return 0.0
+        return time.monotonic() - self._started_monotonic
+
+    def route_stats(self) -> list[dict]:
+        """Per-route counters plus delivered-per-minute since start."""
+        if not self.forward:
+            return []
+        minutes = self.uptime_seconds() / 60
+        stats = self.forward.route_stats()
+        for route in stats:
+            route["per_minute"] = (
+                round(route["delivered"] / minutes, 2) if minutes else 0.0
+            )
+        return stats
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "uptime_seconds": round(self.uptime_seconds(), 1),
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+            "routes": self.route_stats(),
+            "schedules": self.scheduler.status() if self.scheduler else [],
+        }
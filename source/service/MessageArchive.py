@@ -0,0 +1,380 @@
+"""Local SQLite mirror of each source chat's message metadata.
+
+Dry runs, media forwards and history forwards used to page through the
+same source history from Telegram on every pass. The archive keeps one
+SQLite file per source under `resources/archive/` holding each message's
+id, date, album (grouped_id), media kind, file size, sender and text, and
+syncs it incrementally: a pass fetches only messages newer than the
+highest id already archived, plus any older stretch a new, earlier start
+date asks for. Filtering, counting and planning then run as local queries,
+so a dry run costs one short sync and a forward fetches only the messages
+it is actually going to send.
+
+Message text is also indexed with SQLite FTS5, kept current by triggers as
+messages are archived, so keyword forwards can search a chat's history
+locally with phrase ("exact words"), prefix (invoice*) and boolean
+(AND / OR / NOT) queries instead of one Telegram search per run.
+
+What is archived is always one contiguous stretch: every message dated on
+or after `since` with an id up to `high_id`. Messages are stored as they
+were when first synced; later edits or deletions aren't tracked (a
+deleted message simply comes back missing when a forward fetches it)."""
+
+import asyncio
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+from source.utils.Constants import (
+    ARCHIVE_FETCH_BATCH_SIZE,
+    ARCHIVE_FOLDER_PATH,
+    DEFAULT_CHUNK_SIZE,
+)
+from source.utils.Metrics import FETCH_LATENCY
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    date REAL NOT NULL,
+    grouped_id INTEGER,
+    media TEXT,
+    size INTEGER,
+    sender_id INTEGER,
+    text TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS messages_date ON messages (date);
+CREATE TABLE IF NOT EXISTS coverage (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    since REAL NOT NULL,
+    high_id INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text,
+    content = 'messages',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    INSERT INTO messages_fts (rowid, text) VALUES (new.id, new.text);
+END;
+"""
+# Bumped when a schema change needs existing archives migrated.
+SCHEMA_VERSION = 1
+
+# An upsert rather than INSERT OR REPLACE: REPLACE deletes the old row
+# without firing triggers, which would leave stale text in the index.
+UPSERT = """
+INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    date = excluded.date,
+    grouped_id = excluded.grouped_id,
+    media = excluded.media,
+    size = excluded.size,
+    sender_id = excluded.sender_id,
+    text = excluded.text
+"""
+
+# Message properties checked in order to name a message's media; anything
+# else carrying media (polls, locations, ...) is archived as "other".
+MEDIA_KINDS = (
+    "photo",
+    "sticker",
+    "gif",
+    "voice",
+    "video",
+    "audio",
+    "document",
+    "web_preview",
+)
+
+
+class MessageArchive:
+    def __init__(
+        self,
+        client,
+        folder: str = ARCHIVE_FOLDER_PATH,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Args:
+            client: Connected Telegram client, used only to sync
+            folder: Directory holding one `<source id>.sqlite3` per chat
+            chunk_size: Messages fetched per `get_messages` call while syncing
+        """
+        self.client = client
+        self.folder = folder
+        self.chunk_size = chunk_size
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    def path(self, source: int) -> str:
+        return os.path.join(self.folder, f"{source}.sqlite3")
+
+    def _open(self, source: int) -> sqlite3.Connection:
+        os.makedirs(self.folder, exist_ok=True)
+        db = sqlite3.connect(self.path(source))
+        db.executescript(SCHEMA)
+        # SQLite's lower() only folds ASCII; match Python's str.lower, which
+        # the live keyword filter uses.
+        db.create_function("py_lower", 1, str.lower, deterministic=True)
+        (version,) = db.execute("PRAGMA user_version").fetchone()
+        if version < SCHEMA_VERSION:
+            # Archives synced before the full-text index existed.
+            db.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.commit()
+        return db
+
+    @staticmethod
+    def validate_query(query: str) -> None:
+        """
+        Raises:
+            ValueError: If `query` isn't valid FTS5 query syntax.
+        """
+        db = sqlite3.connect(":memory:")
+        try:
+            db.execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+            db.execute("SELECT rowid FROM probe WHERE probe MATCH ?", (query,))
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid full-text query {query!r}: {e}") from None
+        finally:
+            db.close()
+
+    @staticmethod
+    def _timestamp(message) -> float:
+        date = message.date
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        return date.timestamp()
+
+    @staticmethod
+    def media_kind(message) -> str | None:
+        """Short name of the message's media, or None without any."""
+        if not message.media:
+            return None
+        for kind in MEDIA_KINDS:
+            if getattr(message, kind, None):
+                return kind
+        return "other"
+
+    @staticmethod
+    def _row(message) -> tuple:
+        file = getattr(message, "file", None)
+        return (
+            message.id,
+            MessageArchive._timestamp(message),
+            message.grouped_id,
+            MessageArchive.media_kind(message),
+            file.size if file else None,
+            message.sender_id,
+            getattr(message, "message", None) or "",
+        )
+
+    @staticmethod
+    def _coverage(db: sqlite3.Connection) -> tuple[float, int] | None:
+        return db.execute("SELECT since, high_id FROM coverage").fetchone()
+
+    async def sync(
+        self,
+        source: int,
+        start_datetime: datetime | None = None,
+        end_datetime: datetime | None = None,
+    ) -> int:
+        """Bring the archive of `source` up to date for a run over the given
+        dates: backfill from `start_datetime` if the archive starts later,
+        then fetch what is newer than the highest archived id, stopping
+        once past `end_datetime`.
+
+        Returns:
+            Messages fetched from Telegram.
+        """
+        since = start_datetime.timestamp() if start_datetime else 0.0
+        until = end_datetime.timestamp() if end_datetime else None
+        lock = self._locks.setdefault(source, asyncio.Lock())
+        async with lock:
+            db = self._open(source)
+            try:
+                coverage = self._coverage(db)
+                fetched = 0
+                if coverage is None or coverage[1] == 0:
+                    # Nothing archived yet: start at the requested date.
+                    db.execute(
+                        "INSERT OR REPLACE INTO coverage VALUES (0, ?, 0)", (since,)
+                    )
+                    db.commit()
+                    high_id = 0
+                    offset_date = start_datetime
+                else:
+                    covered_since, high_id = coverage
+                    offset_date = None
+                    if since < covered_since:
+                        (low_id,) = db.execute(
+                            "SELECT MIN(id) FROM messages WHERE date >= ?",
+                            (covered_since,),
+                        ).fetchone()
+                        fetched += await self._copy(
+                            db, source, 0, start_datetime, max_id=low_id or high_id + 1
+                        )
+                        db.execute("UPDATE coverage SET since = ?", (since,))
+                        db.commit()
+                fetched += await self._copy(
+                    db, source, high_id, offset_date, until=until, advance=True
+                )
+                return fetched
+            finally:
+                db.close()
+
+    async def _copy(
+        self,
+        db: sqlite3.Connection,
+        source: int,
+        min_id: int,
+        offset_date: datetime | None = None,
+        max_id: int = 0,
+        until: float | None = None,
+        advance: bool = False,
+    ) -> int:
+        """Archive messages oldest-first from just after `min_id` (or from
+        `offset_date` on the first fetch) up to `max_id`, exclusive.
+
+        With `advance`, `high_id` follows every committed chunk, so an
+        interrupted sync keeps what it already fetched.
+        """
+        copied = 0
+        first = True
+        while True:
+            kwargs: dict[str, object] = {"limit": self.chunk_size, "reverse": True}
+            if first and offset_date:
+                kwargs["offset_date"] = offset_date
+            else:
+                kwargs["min_id"] = min_id
+            if max_id:
+                kwargs["max_id"] = max_id
+            first = False
+            with FETCH_LATENCY.labels("archive").time():
+                chunk = await self.client.get_messages(source, **kwargs)
+            if not chunk:
+                break
+            db.executemany(UPSERT, [self._row(message) for message in chunk])
+            min_id = chunk[-1].id
+            copied += len(chunk)
+            if advance:
+                db.execute("UPDATE coverage SET high_id = MAX(high_id, ?)", (min_id,))
+            db.commit()
+            if len(chunk) < self.chunk_size:
+                break
+            if until is not None and self._timestamp(chunk[-1]) > until:
+                break
+        return copied
+
+    @staticmethod
+    def _where(
+        after_id: int,
+        start_datetime: datetime | None,
+        end_datetime: datetime | None,
+        media_only: bool,
+        keyword: str | None,
+    ) -> tuple[str, list]:
+        clauses = ["id > ?"]
+        params: list = [after_id]
+        if start_datetime:
+            clauses.append("date >= ?")
+            params.append(start_datetime.timestamp())
+        if end_datetime:
+            clauses.append("date <= ?")
+            params.append(end_datetime.timestamp())
+        if media_only:
+            clauses.append("media IS NOT NULL")
+        if keyword:
+            clauses.append("instr(py_lower(text), ?) > 0")
+            params.append(keyword.lower())
+        return " AND ".join(clauses), params
+
+    def plan(
+        self,
+        source: int,
+        after_id: int = 0,
+        start_datetime: datetime | None = None,
+        end_datetime: datetime | None = None,
+        media_only: bool = False,
+        keyword: str | None = None,
+    ) -> list[int]:
+        """Ids of the archived messages matching the same filters as
+        `Forward.matches_criteria`, oldest first."""
+        where, params = self._where(
+            after_id, start_datetime, end_datetime, media_only, keyword
+        )
+        db = self._open(source)
+        try:
+            rows = db.execute(
+                f"SELECT id FROM messages WHERE {where} ORDER BY id", params
+            )
+            return [message_id for (message_id,) in rows]
+        finally:
+            db.close()
+
+    def count(
+        self,
+        source: int,
+        after_id: int = 0,
+        start_datetime: datetime | None = None,
+        end_datetime: datetime | None = None,
+        media_only: bool = False,
+        keyword: str | None = None,
+    ) -> int:
+        """Number of messages `plan` would return."""
+        where, params = self._where(
+            after_id, start_datetime, end_datetime, media_only, keyword
+        )
+        db = self._open(source)
+        try:
+            (total,) = db.execute(
+                f"SELECT COUNT(*) FROM messages WHERE {where}", params
+            ).fetchone()
+            return total
+        finally:
+            db.close()
+
+    def search(
+        self,
+        source: int,
+        query: str,
+        after_id: int = 0,
+        start_datetime: datetime | None = None,
+        end_datetime: datetime | None = None,
+        limit: int | None = None,
+    ) -> list[int]:
+        """Ids of archived messages whose text matches the FTS5 `query`,
+        oldest first; with `limit`, only the newest `limit` of them.
+
+        Raises:
+            ValueError: If `query` isn't valid FTS5 query syntax.
+        """
+        where, params = self._where(after_id, start_datetime, end_datetime, False, None)
+        db = self._open(source)
+        try:
+            rows = db.execute(
+                "SELECT id FROM messages WHERE id IN (SELECT rowid FROM "
+                f"messages_fts WHERE messages_fts MATCH ?) AND {where} "
+                "ORDER BY id DESC LIMIT ?",
+                [query, *params, limit or -1],
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid full-text query {query!r}: {e}") from None
+        finally:
+            db.close()
+        return [message_id for (message_id,) in reversed(rows)]
+
+    async def fetch(self, source: int, ids: list[int]):
+        """Fetch messages by id from Telegram in batches, yielding each
+        batch; ids deleted since they were archived are skipped."""
+        for start in range(0, len(ids), ARCHIVE_FETCH_BATCH_SIZE):
+            batch = ids[start : start + ARCHIVE_FETCH_BATCH_SIZE]
+            with FETCH_LATENCY.labels("archive").time():
+                messages = await self.client.get_messages(source, ids=batch)
+            yield [message for message in messages if message is not None]
@@ -1,61 +1,153 @@
+import time
+
+from source.service.FloodWaitGovernor import FLOOD_ERRORS
+from source.utils.Metrics import (
+    FLOOD_WAITS,
+    MESSAGES_FAILED,
+    MESSAGES_FORWARDED,
+    SEND_LATENCY,
+)
+
+# Label children resolved once; this is the send hot path.
+_FORWARDED = MESSAGES_FORWARDED.labels("forward")
+_FAILED = MESSAGES_FAILED.labels("forward")
+_FLOOD_WAITS = FLOOD_WAITS.labels("forward")
+_SEND_LATENCY = SEND_LATENCY.labels("forward")
+
+
 class MessageForwardService:
-    def __init__(self, client, queue=None):
+    def __init__(self, client, queue=None, dead_letters=None):
+        """
+        Args:
+            dead_letters: Optional `DeadLetterQueue` failed sends are
+                recorded in for retry, and resolved from once they succeed
+
+        Sends take an optional `on_sent(source, sent)` callback run after a
+        successful send and `on_failed(source, error)` run after a failed
+        one; `source` is the message, or an album's list of messages.
+        """
         self.client = client
         self.queue = queue
+        self.dead_letters = dead_letters
 
     async def forward_message(
-        self, destination_id, message, reply_to=None, on_sent=None
+        self, destination_id, message, reply_to=None, on_sent=None, on_failed=None
     ):
         if self.queue:
             await self.queue.put(
                 (
                     self._send_message_and_notify,
-                    (destination_id, message, reply_to, on_sent),
+                    (destination_id, message, reply_to, on_sent, on_failed),
                 )
             )
             return None
-        sent = await self._send_message(destination_id, message, reply_to)
-        if on_sent:
-            on_sent(message, sent)
-        return sent
+        return await self._send_message_and_notify(
+            destination_id, message, reply_to, on_sent, on_failed
+        )
 
     async def forward_album(
-        self, destination_id, messages, text=None, reply_to=None, on_sent=None
+        self,
+        destination_id,
+        messages,
+        text=None,
+        reply_to=None,
+        on_sent=None,
+        on_failed=None,
     ):
         if self.queue:
             await self.queue.put(
                 (
                     self._send_album_and_notify,
-                    (destination_id, messages, text, reply_to, on_sent),
+                    (destination_id, messages, text, reply_to, on_sent, on_failed),
                 )
             )
             return None
-        sent = await self._send_album(destination_id, messages, text, reply_to)
-        if on_sent:
-            on_sent(messages, sent)
-        return sent
+        return await self._send_album_and_notify(
+            destination_id, messages, text, reply_to, on_sent, on_failed
+        )
 
     async def _send_message_and_notify(
-        self, destination_id, message, reply_to, on_sent
+        self, destination_id, message, reply_to, on_sent, on_failed=None
     ):
-        sent = await self._send_message(destination_id, message, reply_to)
+        try:
+            sent = await self._send_message(destination_id, message, reply_to)
+        except Exception as e:
+            self._dead_letter(destination_id, [message], e)
+            if on_failed:
+                on_failed(message, e)
+            raise
+        self._resolve(destination_id, [message])
         if on_sent:
             on_sent(message, sent)
         return sent
 
     async def _send_album_and_notify(
-        self, destination_id, messages, text, reply_to, on_sent
+        self, destination_id, messages, text, reply_to, on_sent, on_failed=None
     ):
-        sent = await self._send_album(destination_id, messages, text, reply_to)
+        try:
+            sent = await self._send_album(destination_id, messages, text, reply_to)
+        except Exception as e:
+            self._dead_letter(destination_id, messages, e)
+            if on_failed:
+                on_failed(messages, e)
+            raise
+        self._resolve(destination_id, messages)
         if on_sent:
             on_sent(messages, sent)
         return sent
 
+    def abandon(self, args: tuple, error: BaseException) -> dict | None:
+        """Give up on a send that was queued but will never run (its
+        account's queue was stopped): record it as a dead letter and tell
+        `on_failed`, as a failed send would.
+
+        Args:
+            args: The queued job's arguments, as `forward_message` or
+                `forward_album` put them on the queue
+
+        Returns:
+            The dead letter entry, or None without a dead letter queue
+        """
+        destination_id, payload, *_, on_failed = args
+        messages = payload if isinstance(payload, list) else [payload]
+        entry = self._dead_letter(destination_id, messages, error)
+        if on_failed:
+            on_failed(payload, error)
+        return entry
+
+    def _dead_letter(self, destination_id, messages, error) -> dict | None:
+        if not self.dead_letters:
+            return None
+        return self.dead_letters.record(
+            messages[0].chat_id, [m.id for m in messages], destination_id, error
+        )
+
+    def _resolve(self, destination_id, messages):
+        if self.dead_letters and self.dead_letters.keys:
+            self.dead_letters.resolve(
+                messages[0].chat_id, [m.id for m in messages], destination_id
+            )
+
     async def _send_message(self, destination_id, message, reply_to=None):
         # Telethon forward_messages does not support reply_to across versions.
         _ = reply_to
-        return await self.client.forward_messages(destination_id, message)
+        return await self._timed_forward(destination_id, message, 1)
 
     async def _send_album(self, destination_id, messages, _text=None, reply_to=None):
         _ = reply_to
-        return await self.client.forward_messages(destination_id, messages)
+        return await self._timed_forward(destination_id, messages, len(messages))
+
+    async def _timed_forward(self, destination_id, payload, count):
+        started = time.perf_counter()
+        try:
+            sent = await self.client.forward_messages(destination_id, payload)
+        except FLOOD_ERRORS:
+            _FLOOD_WAITS.inc()
+            _FAILED.inc(count)
+            raise
+        except Exception:
+            _FAILED.inc(count)
+            raise
+        _SEND_LATENCY.observe(time.perf_counter() - started)
+        _FORWARDED.inc(count)
+        return sent
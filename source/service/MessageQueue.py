@@ -1,6 +1,8 @@
 import asyncio
+import weakref
 
 from source.utils.Console import Terminal
+from source.utils.Metrics import QUEUE_DEPTH, QUEUE_JOBS
 
 console = Terminal.console
 
@@ -8,6 +10,9 @@ console = Terminal.console
 class MessageQueue:
     """Rate-limited async queue for Telegram messages."""
 
+    # Every queue in the process (one per account in a pool), for the gauge.
+    _live: "weakref.WeakSet[MessageQueue]" = weakref.WeakSet()
+
     def __init__(self, max_concurrent=1, delay=1.0):
         """
         Args:
@@ -18,8 +23,11 @@ class MessageQueue:
         self.max_concurrent = max_concurrent
         self.delay = delay
         self.current_task = None
+        self.processed = 0  # Jobs finished since start, for throughput stats
         self._workers = []
+        self.interrupted = []  # Jobs stop() cut off while they ran
         self._running = False
+        MessageQueue._live.add(self)
 
     async def start(self):
         """Start the worker(s) to process the queue."""
@@ -45,11 +53,18 @@ class MessageQueue:
                 func, args = await self.queue.get()
                 got_item = True
                 self.current_task = self._format_task_name(args)
-                await func(*args)
+                try:
+                    await func(*args)
+                except asyncio.CancelledError:
+                    self.interrupted.append((func, args))
+                    raise
+                self.processed += 1
+                QUEUE_JOBS.labels("completed").inc()
                 await asyncio.sleep(self.delay)  # rate limit
             except asyncio.CancelledError:
                 break
             except Exception as e:
+                QUEUE_JOBS.labels("failed").inc()
                 console.print(f"[bold red]Queue Worker Error:[/bold red] {e}")
             finally:
                 if got_item:
@@ -79,5 +94,26 @@ class MessageQueue:
         await self.queue.put(item)
         await self.start()  # ensure the worker is running
 
+    async def wait_below(self, limit: int) -> None:
+        """Wait until fewer than `limit` jobs are queued.
+
+        Bulk producers call this before queueing more, so messages queued
+        by live forwarding never wait behind more than `limit` of theirs.
+        """
+        while self.queue.qsize() >= limit:
+            await asyncio.sleep(max(self.delay, 0.05))
+
     def qsize(self):
         return self.queue.qsize()
+
+    def take_pending(self) -> list:
+        """Remove and return the jobs still waiting, without running them."""
+        pending = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+            self.queue.task_done()
+        return pending
+
+
+# Read at scrape time, so queueing pays nothing for the gauge.
+QUEUE_DEPTH.set_function(lambda: sum(queue.qsize() for queue in MessageQueue._live))
@@ -1,37 +1,170 @@
+import asyncio
+import time
 from datetime import datetime, timezone
 
+from telethon.tl import types
+
+from source.service.FloodWaitGovernor import FLOOD_ERRORS
 from source.service.ForwardProgress import ForwardProgress
-from source.utils.Constants import DEFAULT_BATCH_SIZE
+from source.service.GlobalSearch import GlobalSearch
+from source.utils.Constants import DEFAULT_BATCH_SIZE, DELETE_BATCH_SIZE
 from source.utils.DateUtils import DateUtils
+from source.utils.Metrics import (
+    FLOOD_WAITS,
+    MESSAGES_FAILED,
+    MESSAGES_FORWARDED,
+    SEND_LATENCY,
+)
 
 
 class MessageService:
-    def __init__(self, client, console, queue=None):
+    def __init__(self, client, console, queue=None, archive=None):
         self.client = client
         self.console = console
         self.queue = queue
+        self.archive = archive
+        self.global_search = GlobalSearch(client)
+
+    async def delete_messages_from_dialog(self, dialog, state=None):
+        """Delete every message the current account sent in `dialog`, and
+        return once the deletes have run.
+
+        The sender filter runs server-side (`from_user="me"`), so only our
+        own messages are fetched, and deletes go out in `DELETE_BATCH_SIZE`
+        id batches through the rate-limited queue instead of one call each.
+
+        Args:
+            state: Dict kept across retries of the same dialog (e.g. after a
+                flood wait). A retry re-sends only the batches that failed
+                and fetches on from the oldest message already scheduled,
+                instead of queueing every batch again.
+
+        Returns:
+            Number of messages deleted.
 
-    async def delete_messages_from_dialog(self, dialog, my_id):
-        async for message in self.client.iter_messages(dialog.id):
-            if message.from_id == my_id:
-                if self.queue:
-                    await self.queue.put((self._delete_message, (message,)))
-                else:
-                    await self._delete_message(message)
+        Raises:
+            The first error a delete batch failed with, once all have run.
+        """
+        state = {} if state is None else state
+        batches = state.setdefault("batches", [])
+        started = time.monotonic()
+        for index, (message_ids, done) in enumerate(batches):
+            # Batches still queued (a flood wait cut the fetch short) run as
+            # they are; only finished ones that failed are sent again.
+            if done.done() and (done.cancelled() or done.exception() is not None):
+                batches[index] = (
+                    message_ids,
+                    await self._schedule_delete(dialog.id, message_ids),
+                )
+
+        kwargs = {"from_user": "me"}
+        if state.get("offset_id"):
+            kwargs["offset_id"] = state["offset_id"]
+        batch = []
+        async for message in self.client.iter_messages(dialog.id, **kwargs):
+            batch.append(message.id)
+            if len(batch) == DELETE_BATCH_SIZE:
+                batches.append((batch, await self._schedule_delete(dialog.id, batch)))
+                state["offset_id"] = batch[-1]
+                batch = []
+        if batch:
+            batches.append((batch, await self._schedule_delete(dialog.id, batch)))
+            state["offset_id"] = batch[-1]
+
+        results = await asyncio.gather(
+            *(done for _, done in batches), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        total = sum(results)
 
-    async def _delete_message(self, message):
+        elapsed = time.monotonic() - started
+        if total:
+            rate = total / elapsed if elapsed > 0 else float(total)
+            title = getattr(dialog, "title", None) or dialog.id
+            self.console.print(
+                f"[bold green]{title}:[/bold green] {total} messages deleted "
+                f"in {elapsed:.1f}s ({rate:.1f} msg/s)"
+            )
+        return total
+
+    async def _schedule_delete(self, chat_id, message_ids) -> asyncio.Future:
+        """Queue one delete batch; the returned future resolves to the number
+        of messages deleted, or to the error, once the batch has run."""
+        done = asyncio.get_running_loop().create_future()
+        if self.queue:
+            await self.queue.put(
+                (self._delete_messages, (chat_id, list(message_ids), done))
+            )
+        else:
+            await self._delete_messages(chat_id, message_ids, done)
+        return done
+
+    async def _delete_messages(self, chat_id, message_ids, done=None):
         try:
-            await self.client.delete_messages(message.chat_id, message.id)
+            await self.client.delete_messages(chat_id, message_ids)
         except Exception as e:
-            self.console.print(f"[bold red]Error deleting message:[/bold red] {e}")
+            self.console.print(f"[bold red]Error deleting messages:[/bold red] {e}")
+            if done:
+                done.set_exception(e)
+        else:
+            if done:
+                done.set_result(len(message_ids))
 
     async def process_user_messages(self, chat, user, limit=None):
-        async for message in self.client.iter_messages(chat.id, limit=limit):
-            if message.sender_id == user.id:
-                if self.queue:
-                    await self.queue.put((self._process_message, (message,)))
-                else:
-                    await self._process_message(message)
+        """Process `user`'s messages in `chat`, newest first.
+
+        The sender filter runs server-side (`from_user`), so `limit` caps
+        the number of *matching* messages rather than the number scanned.
+
+        Returns:
+            Number of matching messages processed.
+        """
+        count = 0
+        async for message in self.client.iter_messages(
+            chat.id, from_user=self._input_user(user), limit=limit
+        ):
+            await self._dispatch_user_message(message)
+            count += 1
+        return count
+
+    async def process_user_messages_global(self, user, limit=None):
+        """Fast path for Find User: one server-side search across every chat
+        (Telegram's global search with a sender filter) instead of scanning
+        dialogs one by one. `limit` caps matches per chat, and private chats
+        are skipped the same way the per-dialog sweep skips them.
+
+        Returns:
+            dict mapping chat id to the number of matching messages processed.
+        """
+        per_chat = {}
+        async for message in self.client.iter_messages(
+            None, from_user=self._input_user(user)
+        ):
+            if message.is_private:
+                continue
+            seen = per_chat.get(message.chat_id, 0)
+            if limit and seen >= limit:
+                continue
+            per_chat[message.chat_id] = seen + 1
+            await self._dispatch_user_message(message)
+        return per_chat
+
+    async def _dispatch_user_message(self, message):
+        if self.queue:
+            await self.queue.put((self._process_message, (message,)))
+        else:
+            await self._process_message(message)
+
+    @staticmethod
+    def _input_user(user):
+        # A stored Chat carries its access hash, which lets Telegram resolve
+        # the sender without the entity being in the session cache.
+        access_hash = getattr(user, "access_hash", None)
+        if access_hash:
+            return types.InputPeerUser(user.id, access_hash)
+        return user.id
 
     async def _process_message(self, message):
         pass  # implement any processing/download logic
@@ -46,9 +179,16 @@ class MessageService:
         end_date=None,
         timezone_name="UTC",
         dry_run=False,
+        on_progress=None,
+        full_text=False,
     ):
         """Search a chat's history and forward matches. `keyword` is
         optional — leave it unset to forward every message in the range.
+        `on_progress(done, total)` is called as matches are found and sent.
+
+        With `full_text`, `keyword` is an FTS5 query (phrases, `prefix*`,
+        AND / OR / NOT) answered from the local message archive after an
+        incremental sync, instead of a Telegram `search=` scan.
 
         When both `start_date` and `end_date` are given, this is resumable:
         re-running the same source/date-range/keyword combination skips
@@ -62,12 +202,24 @@ class MessageService:
             keyword.strip() if isinstance(keyword, str) and keyword.strip() else None
         )
         keyword_label = f" matching keyword '{keyword}'" if keyword else ""
+        if full_text:
+            if not keyword:
+                raise ValueError("Full-text search requires a query")
+            if self.archive is None:
+                raise ValueError("Full-text search needs the message archive")
+            keyword_label = f" matching query '{keyword}'"
+        # Full-text runs match differently, so they keep their own cursor.
+        progress_keyword = f"fts:{keyword}" if full_text else keyword
 
         has_date_range = bool(start_date and end_date)
         last_message_id = 0
         if has_date_range:
             last_message_id = ForwardProgress.load(
-                source_id, start_date, end_date, keyword=keyword
+                source_id,
+                start_date,
+                end_date,
+                keyword=progress_keyword,
+                destination_id=destination_id,
             )
             if last_message_id > 0:
                 self.console.print(
@@ -75,26 +227,54 @@ class MessageService:
                     f"up through {last_message_id}[/bold yellow]"
                 )
 
-        matches = []
-        async for message in self.client.iter_messages(
-            source_id,
-            search=keyword,
-            limit=limit,
-            min_id=last_message_id,
-        ):
-            if self._in_date_range(message.date, start_datetime, end_datetime):
-                matches.append(message)
-
-        if dry_run:
-            self.console.print(
-                f"[bold cyan]Dry-run:[/bold cyan] {len(matches)} messages"
-                f"{keyword_label} remain to forward"
+        if full_text:
+            await self.archive.sync(source_id, start_datetime, end_datetime)
+            ids = self.archive.search(
+                source_id,
+                keyword,
+                last_message_id,
+                start_datetime,
+                end_datetime,
+                limit,
             )
-            return len(matches)
+            if on_progress:
+                on_progress(0, len(ids))
+            if dry_run:
+                self.console.print(
+                    f"[bold cyan]Dry-run:[/bold cyan] {len(ids)} messages"
+                    f"{keyword_label} remain to forward"
+                )
+                return len(ids)
+            matches = [
+                message
+                async for batch in self.archive.fetch(source_id, ids)
+                for message in batch
+            ]
+        else:
+            matches = []
+            async for message in self.client.iter_messages(
+                source_id,
+                search=keyword,
+                limit=limit,
+                min_id=last_message_id,
+            ):
+                if self._in_date_range(message.date, start_datetime, end_datetime):
+                    matches.append(message)
+                    if on_progress:
+                        on_progress(0, len(matches))
+
+            if dry_run:
+                self.console.print(
+                    f"[bold cyan]Dry-run:[/bold cyan] {len(matches)} messages"
+                    f"{keyword_label} remain to forward"
+                )
+                return len(matches)
+            # Search results come newest first; forward in posting order.
+            matches.reverse()
 
         sent_count = 0
         last_forwarded_id = last_message_id
-        for i, message in enumerate(reversed(matches), 1):
+        for i, message in enumerate(matches, 1):
             if self.queue:
                 await self.queue.put(
                     (self._forward_message, (destination_id, message, None))
@@ -103,19 +283,35 @@ class MessageService:
                 await self._forward_message(destination_id, message)
             sent_count += 1
             last_forwarded_id = max(last_forwarded_id, message.id)
+            if on_progress:
+                on_progress(sent_count, len(matches))
 
             if has_date_range and i % DEFAULT_BATCH_SIZE == 0:
                 ForwardProgress.save(
-                    source_id, last_forwarded_id, start_date, end_date, keyword=keyword
+                    source_id,
+                    last_forwarded_id,
+                    start_date,
+                    end_date,
+                    keyword=progress_keyword,
+                    destination_id=destination_id,
                 )
 
         if has_date_range:
             if matches:
                 ForwardProgress.save(
-                    source_id, last_forwarded_id, start_date, end_date, keyword=keyword
+                    source_id,
+                    last_forwarded_id,
+                    start_date,
+                    end_date,
+                    keyword=progress_keyword,
+                    destination_id=destination_id,
                 )
             ForwardProgress.mark_completed(
-                source_id, start_date, end_date, keyword=keyword
+                source_id,
+                start_date,
+                end_date,
+                keyword=progress_keyword,
+                destination_id=destination_id,
             )
 
         self.console.print(
@@ -123,9 +319,150 @@ class MessageService:
         )
         return sent_count
 
+    async def forward_messages_by_global_keyword(
+        self,
+        keyword,
+        destination_id=None,
+        routes=None,
+        limit=None,
+        start_date=None,
+        end_date=None,
+        timezone_name="UTC",
+        dry_run=False,
+        channels_only=False,
+        on_progress=None,
+    ):
+        """Forward every message mentioning `keyword` across all chats, using
+        one global search pass instead of a separate scan per source chat.
+
+        Each match goes to every destination in `routes[source_chat_id]` (a
+        list of ids, or one id) when the source has routes, otherwise to
+        `destination_id`; matches with neither are
+        skipped, as are matches found inside a destination chat. Results are
+        deduplicated by (chat, message id). The pass is resumable through
+        `ForwardProgress`: an interrupted run continues from its saved
+        search offset, and a re-run after a completed one stops at the
+        newest result the previous pass already handled.
+
+        `on_progress(done, limit)` is called after each match.
+
+        Returns:
+            Number of matches forwarded, or (dry-run) remaining to forward.
+        """
+        keyword = keyword.strip() if isinstance(keyword, str) else ""
+        if not keyword:
+            raise ValueError("Global keyword search requires a keyword")
+        routes = {
+            source: list(targets) if isinstance(targets, (list, tuple)) else [targets]
+            for source, targets in (routes or {}).items()
+        }
+        destinations = {target for targets in routes.values() for target in targets}
+        if destination_id is not None:
+            destinations.add(destination_id)
+
+        start_datetime, end_datetime = self._build_date_bounds(
+            start_date, end_date, timezone_name
+        )
+        state = ForwardProgress.load_global(keyword, start_date, end_date)
+        floor = state["floor"]
+        if state["offset"]:
+            self.console.print(
+                "[bold yellow]Resuming global search from the last saved "
+                "offset[/bold yellow]"
+            )
+
+        seen = set()
+        matched = 0
+        limit_reached = False
+        async for page, next_offset in self.global_search.iter_pages(
+            keyword,
+            min_date=start_datetime,
+            max_date=end_datetime,
+            offset=state["offset"],
+            channels_only=channels_only,
+        ):
+            reached_floor = False
+            for message in page:
+                position = (
+                    int(message.date.timestamp()),
+                    message.chat_id,
+                    message.id,
+                )
+                if floor and (
+                    position[0] < floor[0] or position[1:] == tuple(floor[1:])
+                ):
+                    reached_floor = True
+                    break
+                if state["newest"] is None:
+                    state["newest"] = position
+
+                if position[1:] in seen:
+                    continue
+                seen.add(position[1:])
+
+                if message.chat_id in destinations:
+                    continue
+                targets = routes.get(message.chat_id)
+                if targets is None:
+                    targets = [] if destination_id is None else [destination_id]
+                if not targets:
+                    continue
+                if not self._in_date_range(message.date, start_datetime, end_datetime):
+                    continue
+
+                matched += 1
+                if not dry_run:
+                    for target in targets:
+                        if self.queue:
+                            await self.queue.put(
+                                (self._forward_message, (target, message, None))
+                            )
+                        else:
+                            await self._forward_message(target, message)
+                if on_progress:
+                    on_progress(matched, limit)
+                if limit and matched >= limit:
+                    limit_reached = True
+                    break
+
+            if not dry_run:
+                # Stopping mid-page on the limit resumes right after the last
+                # forwarded match rather than skipping the rest of the page.
+                state["offset"] = position if limit_reached else next_offset
+                ForwardProgress.save_global(keyword, state, start_date, end_date)
+            if reached_floor or limit_reached:
+                break
+
+        if dry_run:
+            self.console.print(
+                f"[bold cyan]Dry-run:[/bold cyan] {matched} messages matching "
+                f"keyword '{keyword}' across all chats remain to forward"
+            )
+            return matched
+
+        ForwardProgress.save_global(
+            keyword, state, start_date, end_date, completed=not limit_reached
+        )
+        self.console.print(
+            f"[bold green]Forwarded {matched} messages matching keyword "
+            f"'{keyword}' across all chats[/bold green]"
+        )
+        return matched
+
     async def _forward_message(self, destination_id, message, reply_to=None):
         _ = reply_to
-        await self.client.forward_messages(destination_id, message)
+        started = time.perf_counter()
+        try:
+            await self.client.forward_messages(destination_id, message)
+        except FLOOD_ERRORS:
+            FLOOD_WAITS.labels("keyword").inc()
+            MESSAGES_FAILED.labels("keyword").inc()
+            raise
+        except Exception:
+            MESSAGES_FAILED.labels("keyword").inc()
+            raise
+        SEND_LATENCY.labels("keyword").observe(time.perf_counter() - started)
+        MESSAGES_FORWARDED.labels("keyword").inc()
 
     @staticmethod
     def _build_date_bounds(start_date, end_date, timezone_name):
@@ -0,0 +1,70 @@
+"""Standalone `/metrics` endpoint for CLI runs.
+
+The web dashboard serves metrics from its own app; a plain `python main.py`
+has no HTTP server, so this answers Prometheus scrapes on a separate port
+with a bare asyncio server instead of pulling a web framework into the
+CLI."""
+
+import asyncio
+
+from source.utils.Console import Terminal
+from source.utils.Metrics import REGISTRY, MetricsRegistry
+
+
+class MetricsServer:
+    def __init__(
+        self,
+        port: int,
+        host: str = "127.0.0.1",
+        registry: MetricsRegistry = REGISTRY,
+        console=None,
+    ):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self.console = console or Terminal.console
+        self._server: asyncio.base_events.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.console.print(
+            f"[dim]Serving metrics on http://{self.host}:{self.port}/metrics[/dim]"
+        )
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request_line = await reader.readline()
+            # Drain the headers; nothing in them changes the response.
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0].rstrip("/") if len(parts) >= 2 else ""
+            if parts[:1] == ["GET"] and path == "/metrics":
+                status = "200 OK"
+                body = self.registry.render().encode()
+                content_type = MetricsRegistry.CONTENT_TYPE
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+                content_type = "text/plain; charset=utf-8"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,141 @@
+import asyncio
+
+from telethon import events
+from telethon.tl import types
+from telethon.tl.custom import Message
+
+from source.utils.Console import Terminal
+from source.utils.Constants import LIVE_ALBUM_DELAY
+
+# Every update shape a new message can arrive in. Service messages and edits
+# use other update types and never reach the router.
+MESSAGE_UPDATE_TYPES = (
+    types.UpdateNewMessage,
+    types.UpdateNewChannelMessage,
+    types.UpdateShortMessage,
+    types.UpdateShortChatMessage,
+)
+
+# Telethon's marked-id offset for channels: -100<id> == -(10**12 + id)
+_CHANNEL_MARK = 1000000000000
+
+
+class RawUpdateRouter:
+    """Filters raw new-message updates against a set of source chat ids.
+
+    `events.NewMessage(chats=...)` and `events.Album(chats=...)` build a full
+    event object for every incoming update before their chat filter runs,
+    which adds up once thousands of chats are routed. The router reads the
+    chat id straight off the raw update and checks it against a precomputed
+    `frozenset`; only updates from a routed chat are turned into a `Message`.
+    Album items arrive as separate updates, so they are held for
+    `album_delay` seconds after the last item and handed over together.
+    """
+
+    def __init__(
+        self,
+        client,
+        on_message,
+        on_album,
+        source_ids: frozenset = frozenset(),
+        album_delay: float = LIVE_ALBUM_DELAY,
+    ):
+        """
+        Args:
+            client: Telegram client the messages are bound to
+            on_message: Async callable `(chat_id, message)` for single messages
+            on_album: Async callable `(chat_id, messages)` for complete albums
+            source_ids: Marked chat ids to accept; everything else is dropped
+            album_delay: Seconds to wait for further items of an album
+        """
+        self.client = client
+        self.on_message = on_message
+        self.on_album = on_album
+        self.source_ids = source_ids
+        self.album_delay = album_delay
+        self._albums: dict[int, tuple[int, list[Message]]] = {}
+        self._album_timers: dict[int, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def chat_id_of(update) -> int | None:
+        """Marked chat id of a raw message update, without building a Message."""
+        update_type = type(update)
+        if update_type is types.UpdateShortMessage:
+            return update.user_id
+        if update_type is types.UpdateShortChatMessage:
+            return -update.chat_id
+
+        peer = getattr(update.message, "peer_id", None)
+        if isinstance(peer, types.PeerChannel):
+            return -(_CHANNEL_MARK + peer.channel_id)
+        if isinstance(peer, types.PeerChat):
+            return -peer.chat_id
+        if isinstance(peer, types.PeerUser):
+            return peer.user_id
+        return None
+
+    async def handle(self, update) -> None:
+        """Raw event handler: drop unrouted updates, dispatch the rest."""
+        chat_id = self.chat_id_of(update)
+        if chat_id is None or chat_id not in self.source_ids:
+            return
+
+        try:
+            message = self._build_message(update)
+            if message is None:
+                return
+            if message.grouped_id:
+                self._buffer_album(chat_id, message)
+            else:
+                await self.on_message(chat_id, message)
+        except Exception as e:
+            Terminal.console.print(f"[bold red]Error handling message:[/bold red] {e}")
+
+    def _build_message(self, update) -> Message | None:
+        # NewMessage.build already knows how to expand the short update
+        # forms into a full Message; it returns None for service messages.
+        event = events.NewMessage.build(
+            update, self_id=getattr(self.client, "_self_id", None)
+        )
+        if event is None:
+            return None
+        event._entities = getattr(update, "_entities", None) or {}
+        event._set_client(self.client)
+        return event.message
+
+    def _buffer_album(self, chat_id: int, message: Message) -> None:
+        grouped_id = message.grouped_id
+        _, messages = self._albums.setdefault(grouped_id, (chat_id, []))
+        messages.append(message)
+
+        timer = self._album_timers.get(grouped_id)
+        if timer:
+            timer.cancel()
+        self._album_timers[grouped_id] = asyncio.get_running_loop().call_later(
+            self.album_delay, self._flush_album, grouped_id
+        )
+
+    def _flush_album(self, grouped_id: int) -> None:
+        self._album_timers.pop(grouped_id, None)
+        chat_id, messages = self._albums.pop(grouped_id, (None, []))
+        if chat_id is None or not messages:
+            return
+        messages.sort(key=lambda message: message.id)
+        task = asyncio.create_task(self._deliver_album(chat_id, messages))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver_album(self, chat_id: int, messages: list[Message]) -> None:
+        try:
+            await self.on_album(chat_id, messages)
+        except Exception as e:
+            Terminal.console.print(f"[bold red]Error handling album:[/bold red] {e}")
+
+    async def flush(self) -> None:
+        """Deliver every buffered album now, e.g. before shutting down."""
+        for grouped_id in list(self._album_timers):
+            self._album_timers[grouped_id].cancel()
+            self._flush_album(grouped_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
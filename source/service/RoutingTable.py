@@ -0,0 +1,136 @@
+"""Compiled source → destination routing for live forwarding.
+
+The forward configuration is turned into a lookup table once, when event
+handlers are registered, so each incoming message costs a single dict lookup
+instead of re-reading configuration, and one source can fan out to any
+number of destinations."""
+
+
+class Route:
+    """One source → destination delivery rule with its own filters and counters."""
+
+    def __init__(
+        self,
+        source_id: int,
+        destination_id: int,
+        media_only: bool = False,
+        keyword: str | None = None,
+        name: str | None = None,
+        dedup: bool = False,
+    ):
+        self.source_id = source_id
+        self.destination_id = destination_id
+        self.media_only = media_only
+        self.keyword = keyword.lower() if keyword else None
+        self.name = name or f"{source_id} → {destination_id}"
+        # Skip content the destination already got from any source.
+        self.dedup = dedup
+        self.queued = 0
+        self.delivered = 0
+        self.skipped = 0
+        self.failed = 0
+        self.duplicates = 0
+
+    def accepts(self, message) -> bool:
+        """Apply this route's media/keyword filters to a message."""
+        if self.media_only and not message.media:
+            return False
+        if self.keyword:
+            text = (message.text or getattr(message, "message", "") or "").lower()
+            if self.keyword not in text:
+                return False
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "route": self.name,
+            "source_id": self.source_id,
+            "destination_id": self.destination_id,
+            "queued": self.queued,
+            "delivered": self.delivered,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+        }
+
+
+class RoutingTable:
+    def __init__(self, routes: dict[int, tuple[Route, ...]] | None = None):
+        self._routes = routes or {}
+        self.source_ids = frozenset(self._routes)
+
+    @classmethod
+    def compile(cls, forward_config_map: dict) -> "RoutingTable":
+        """Build a table from a forward config map whose values are a single
+        config or a list of configs (one per destination of that source).
+
+        Disabled configs are dropped, and a destination listed twice for the
+        same source only gets one route.
+        """
+        routes: dict[int, tuple[Route, ...]] = {}
+        for source_id, configs in forward_config_map.items():
+            if not isinstance(configs, (list, tuple)):
+                configs = [configs]
+            source_routes = []
+            seen_destinations = set()
+            for config in configs:
+                destination_id = getattr(config, "destinationID", None)
+                if not destination_id or destination_id in seen_destinations:
+                    continue
+                if getattr(config, "enabled", True) is False:
+                    continue
+                seen_destinations.add(destination_id)
+                source_routes.append(
+                    Route(
+                        source_id,
+                        destination_id,
+                        media_only=getattr(config, "media_only", False) is True,
+                        keyword=cls._route_keyword(config),
+                        name=cls._route_name(config),
+                        dedup=getattr(config, "dedup", False) is True,
+                    )
+                )
+            if source_routes:
+                routes[source_id] = tuple(source_routes)
+        return cls(routes)
+
+    @staticmethod
+    def _route_keyword(config) -> str | None:
+        keyword = getattr(config, "keyword", None)
+        if isinstance(keyword, str) and keyword.strip():
+            return keyword.strip()
+        return None
+
+    @staticmethod
+    def _route_name(config) -> str | None:
+        source_name = getattr(config, "sourceName", None)
+        destination_name = getattr(config, "destinationName", None)
+        if isinstance(source_name, str) and isinstance(destination_name, str):
+            return f"{source_name} → {destination_name}"
+        return None
+
+    def carry_counters_from(self, previous: "RoutingTable") -> None:
+        """Keep delivery counters for routes that survive a reload, matched
+        by source and destination."""
+        old_routes = {
+            (route.source_id, route.destination_id): route
+            for route in previous.all_routes()
+        }
+        for route in self.all_routes():
+            old = old_routes.get((route.source_id, route.destination_id))
+            if old:
+                route.queued = old.queued
+                route.delivered = old.delivered
+                route.skipped = old.skipped
+                route.failed = old.failed
+                route.duplicates = old.duplicates
+
+    def routes_for(self, source_id: int) -> tuple[Route, ...]:
+        return self._routes.get(source_id, ())
+
+    def all_routes(self) -> list[Route]:
+        return [route for routes in self._routes.values() for route in routes]
+
+    def stats(self) -> list[dict]:
+        """Per-route delivery counters, in configuration order."""
+        return [route.stats() for route in self.all_routes()]
@@ -0,0 +1,121 @@
+"""Server-push status for the web dashboard.
+
+One ticking task builds a status snapshot per interval and fans the same
+payload out to every connected dashboard, so the cost on the bot is one
+snapshot per tick no matter how many dashboards are watching. Each
+subscriber has a one-slot mailbox: a slow client skips stale ticks instead
+of building up a backlog."""
+
+import asyncio
+import logging
+import time
+
+from source.service.JobManager import JobManager
+from source.utils.Constants import STREAM_TICK_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+
+class StatusStream:
+    def __init__(
+        self,
+        get_telegram,
+        job_manager: JobManager,
+        interval: float = STREAM_TICK_INTERVAL,
+        extra_fields=None,
+    ):
+        """
+        Args:
+            get_telegram: Callable returning the current `Telegram` or None;
+                the web app replaces its client at startup
+            job_manager: Jobs whose progress is streamed
+            interval: Seconds between ticks
+            extra_fields: Optional callable returning app-level fields
+                (e.g. uptime, active forwards) merged into every payload
+        """
+        self.get_telegram = get_telegram
+        self.job_manager = job_manager
+        self.interval = interval
+        self.extra_fields = extra_fields
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: asyncio.Task | None = None
+        self._job_versions: dict[str, tuple] = {}
+        self._last_processed: int | None = None
+        self._last_tick = 0.0
+        self._rate = 0.0
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber. Its first message is a full snapshot; later
+        ones carry only jobs that changed since the previous tick."""
+        mailbox: asyncio.Queue = asyncio.Queue(maxsize=1)
+        mailbox.put_nowait(self.snapshot(full=True))
+        self._subscribers.add(mailbox)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return mailbox
+
+    def unsubscribe(self, mailbox: asyncio.Queue) -> None:
+        self._subscribers.discard(mailbox)
+
+    async def _run(self) -> None:
+        # The tick stops with the last subscriber and restarts with the next.
+        while self._subscribers:
+            await asyncio.sleep(self.interval)
+            try:
+                payload = self.snapshot()
+            except Exception:
+                # One bad snapshot skips a tick; it mustn't end the stream.
+                logger.exception("Error building status snapshot")
+                continue
+            for mailbox in list(self._subscribers):
+                if mailbox.full():
+                    mailbox.get_nowait()
+                mailbox.put_nowait(payload)
+
+    def snapshot(self, full: bool = False) -> dict:
+        telegram = self.get_telegram()
+        payload = {
+            "type": "snapshot" if full else "tick",
+            "status": getattr(telegram, "status", "Not Initialized"),
+            "queue_size": 0,
+            "current_task": None,
+            # A subscriber's opening snapshot reuses the last measured rate
+            # so joining dashboards don't reset the tick's measurement window.
+            "throughput": self._rate if full else self._throughput(telegram),
+            "live": telegram.live_supervisor.status() if telegram else None,
+            "jobs": self._jobs(full),
+        }
+        if telegram:
+            queue_status = telegram.get_queue_status()
+            payload["queue_size"] = queue_status.get("queue_length", 0)
+            payload["current_task"] = queue_status.get("active_task")
+        if self.extra_fields:
+            payload.update(self.extra_fields())
+        return payload
+
+    def _throughput(self, telegram) -> float:
+        """Queue jobs finished per second since the previous tick."""
+        if not telegram:
+            return 0.0
+        now = time.monotonic()
+        processed = telegram.queue.processed
+        rate = 0.0
+        if self._last_processed is not None and now > self._last_tick:
+            rate = (processed - self._last_processed) / (now - self._last_tick)
+        self._last_processed, self._last_tick = processed, now
+        self._rate = round(rate, 2)
+        return self._rate
+
+    def _jobs(self, full: bool) -> list[dict]:
+        jobs = self.job_manager.list()
+        if full:
+            return [job.to_dict() for job in jobs]
+        changed = []
+        versions = {}
+        for job in jobs:
+            version = (job.state, job.done, job.total)
+            versions[job.id] = version
+            if self._job_versions.get(job.id) != version:
+                changed.append(job.to_dict())
+        self._job_versions = versions
+        return changed
@@ -0,0 +1,277 @@
+"""Recurring incremental history syncs for routes with a `schedule`.
+
+A forward config may carry a cron expression (`"schedule": "0 3 * * *"`).
+While live forwarding runs, the scheduler starts a history forward for each
+scheduled route whenever its expression fires. The run resumes from the
+same `ForwardProgress` cursor "Past Forward Messages" uses, so it fetches
+only messages newer than the last one forwarded (`min_id=cursor`), never
+re-scanning the date range.
+
+* Jitter: each run starts up to `jitter` seconds after its fire time, so
+  several routes on the same expression don't hit Telegram together.
+* No overlap: a route whose previous run is still going skips that
+  occurrence instead of starting a second pass over the same cursor.
+* Shared rate budget: runs send through the account's one `MessageQueue`,
+  which live forwarding uses too, and stop queueing while `max_backlog`
+  sends are waiting, so a big sync can't push live messages far back."""
+
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+from source.model.ForwardConfig import ForwardConfig
+from source.service.ForwardConfigRepository import ForwardConfigRepository
+from source.utils.Console import Terminal
+from source.utils.Constants import (
+    SCHEDULE_JITTER,
+    SCHEDULE_MAX_BACKLOG,
+    SCHEDULE_POLL_INTERVAL,
+)
+from source.utils.Cron import CronExpression
+from source.utils.DateUtils import DateUtils
+
+
+class ScheduledSync:
+    """One scheduled route: its config, expression and run history."""
+
+    def __init__(self, config, cron: CronExpression):
+        self.config = config
+        self.cron = cron
+        self.next_run: datetime | None = None
+        self.task: asyncio.Task | None = None
+        self.runs = 0
+        self.skipped = 0
+        self.last_run: datetime | None = None
+        self.last_result: int | None = None
+        self.last_error: str | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    @staticmethod
+    def signature(config) -> tuple:
+        """Fields of a route that change what or when it syncs."""
+        return (
+            config.schedule,
+            config.destinationID,
+            config.start_date,
+            config.end_date,
+            config.timezone_name,
+            config.media_only,
+            config.keyword,
+            config.dedup,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "source_id": self.config.sourceID,
+            "destination_id": self.config.destinationID,
+            "schedule": self.cron.expression,
+            "running": self.running,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+            "runs": self.runs,
+            "skipped": self.skipped,
+        }
+
+
+class SyncScheduler:
+    def __init__(
+        self,
+        run_sync,
+        console=None,
+        repository: ForwardConfigRepository | None = None,
+        jitter: float = SCHEDULE_JITTER,
+        max_backlog: int = SCHEDULE_MAX_BACKLOG,
+        poll_interval: float = SCHEDULE_POLL_INTERVAL,
+        rng: random.Random | None = None,
+    ):
+        """
+        Args:
+            run_sync: Async callable running one history forward from a
+                `Telegram.forward_history` config dict
+            repository: Source of forward configs; re-checked every wake-up
+                so schedule edits apply without a restart
+            jitter: Max seconds a run starts after its fire time
+            max_backlog: Queued sends a run may keep ahead of live messages
+            poll_interval: Max seconds between wake-ups
+        """
+        self.run_sync = run_sync
+        self.console = console or Terminal.console
+        self.repository = repository or ForwardConfigRepository()
+        self.jitter = jitter
+        self.max_backlog = max_backlog
+        self.poll_interval = poll_interval
+        self.rng = rng or random.Random()
+        # Keyed by (source, destination): history cursors are per route.
+        self.syncs: dict[tuple[int, int], ScheduledSync] = {}
+        self._invalid: set[tuple] = set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def is_active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """Run the scheduler in the background.
+
+        Returns:
+            False if it is already running.
+        """
+        if self.is_active:
+            return False
+        self._task = asyncio.create_task(self._loop())
+        return True
+
+    async def stop(self) -> bool:
+        """Stop scheduling and cancel syncs in progress; their cursors keep
+        what they already forwarded.
+
+        Returns:
+            False if the scheduler wasn't running.
+        """
+        task = self._task
+        if task is None or task.done():
+            return False
+        tasks = [task] + [s.task for s in self.syncs.values() if s.task and s.running]
+        for running in tasks:
+            running.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                self.refresh(now)
+            except (ValueError, OSError) as e:
+                self.console.print(
+                    f"[bold red]Can't read schedules from forward config:[/bold red] {e}"
+                )
+            self.tick(now)
+            await asyncio.sleep(self._seconds_until_next(now))
+
+    def _seconds_until_next(self, now: datetime) -> float:
+        upcoming = [s.next_run for s in self.syncs.values() if s.next_run]
+        if not upcoming:
+            return self.poll_interval
+        delay = (min(upcoming) - now).total_seconds()
+        return min(self.poll_interval, max(0.0, delay))
+
+    def refresh(self, now: datetime) -> None:
+        """Match `syncs` to the scheduled routes in the forward config.
+
+        Every enabled route with a schedule gets its own sync, since each
+        (source, destination) pair keeps its own history cursor. Changed
+        routes are re-planned; a run already in progress is left to finish.
+        """
+        wanted: dict[tuple[int, int], ForwardConfig] = {}
+        for config in self.repository.snapshot().configs:
+            if config.enabled and config.schedule:
+                wanted.setdefault((config.sourceID, config.destinationID), config)
+
+        for route in list(self.syncs):
+            if route in wanted:
+                continue
+            if self.syncs[route].running:
+                # Unscheduled mid-run: let it finish, but never again.
+                self.syncs[route].next_run = None
+            else:
+                del self.syncs[route]
+
+        for route, config in wanted.items():
+            existing = self.syncs.get(route)
+            if existing and ScheduledSync.signature(
+                existing.config
+            ) == ScheduledSync.signature(config):
+                continue
+            try:
+                cron = CronExpression(config.schedule)
+            except ValueError as e:
+                if (route, config.schedule) not in self._invalid:
+                    self._invalid.add((route, config.schedule))
+                    self.console.print(
+                        f"[bold red]Ignoring schedule for chat {route[0]} -> "
+                        f"{route[1]}:[/bold red] {e}"
+                    )
+                continue
+            sync = ScheduledSync(config, cron)
+            if existing:
+                sync.task = existing.task
+                sync.runs, sync.skipped = existing.runs, existing.skipped
+            sync.next_run = self._plan(sync, now)
+            self.syncs[route] = sync
+
+    def _plan(self, sync: ScheduledSync, after: datetime) -> datetime | None:
+        """Next jittered start time of `sync`, in UTC."""
+        zone = DateUtils.get_timezone(sync.config.timezone_name)
+        try:
+            fire = sync.cron.next_after(after.astimezone(zone))
+        except ValueError as e:
+            sync.last_error = str(e)
+            return None
+        jitter = timedelta(seconds=self.rng.uniform(0, self.jitter))
+        return (fire + jitter).astimezone(timezone.utc)
+
+    def tick(self, now: datetime) -> list[asyncio.Task]:
+        """Start every sync that is due at `now`.
+
+        Returns:
+            Tasks of the syncs started.
+        """
+        started = []
+        for (source, destination), sync in self.syncs.items():
+            if sync.next_run is None or sync.next_run > now:
+                continue
+            sync.next_run = self._plan(sync, now)
+            if sync.running:
+                sync.skipped += 1
+                self.console.print(
+                    f"[bold yellow]Scheduled sync of chat {source} -> "
+                    f"{destination} is still running; skipping this run[/bold yellow]"
+                )
+                continue
+            sync.task = asyncio.create_task(self._run(sync))
+            started.append(sync.task)
+        return started
+
+    async def _run(self, sync: ScheduledSync) -> None:
+        config = sync.config
+        sync.last_run = datetime.now(timezone.utc)
+        sync.runs += 1
+        self.console.print(
+            f"[bold blue]Scheduled sync of chat {config.sourceID} -> "
+            f"{config.destinationID} started[/bold blue]"
+        )
+        try:
+            sync.last_result = await self.run_sync(
+                {
+                    "source_id": config.sourceID,
+                    "destination_id": config.destinationID,
+                    # Same dates and mode as Past Forward, so both share
+                    # the cursor; a scheduled run always forwards.
+                    "start_date": config.start_date,
+                    "end_date": config.end_date,
+                    "timezone_name": config.timezone_name,
+                    "media_only": config.media_only,
+                    "keyword": config.keyword,
+                    "dedup": config.dedup,
+                    "dry_run": False,
+                    "max_backlog": self.max_backlog,
+                }
+            )
+            sync.last_error = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            sync.last_error = str(e)
+            self.console.print(
+                f"[bold red]Scheduled sync of chat {config.sourceID} -> "
+                f"{config.destinationID} failed:[/bold red] {e}"
+            )
+
+    def status(self) -> list[dict]:
+        return [sync.to_dict() for sync in self.syncs.values()]
@@ -3,3 +3,5 @@ from rich.console import Console
 
 class Terminal:
     console = Console()
+    # Live progress bars (`ProgressDisplay`); headless runs switch them off.
+    live_progress = True
@@ -6,6 +6,10 @@ HISTORY_FILE_PATH = f"{RESOURCE_FILE_PATH}/history.json"
 IGNORE_CHATS_FILE_PATH = f"{RESOURCE_FILE_PATH}/ignoreChats.json"
 WANTED_USER_FILE_PATH = f"{RESOURCE_FILE_PATH}/wantedUser.json"
 FORWARD_PROGRESS_FILE_PATH = f"{RESOURCE_FILE_PATH}/forward_progress.json"
+DIALOG_SCAN_PROGRESS_FILE_PATH = f"{RESOURCE_FILE_PATH}/dialog_scan_progress.json"
+ARCHIVE_FOLDER_PATH = f"{RESOURCE_FILE_PATH}/archive"
+DEDUP_FILE_PATH = f"{RESOURCE_FILE_PATH}/dedup.sqlite3"
+DEAD_LETTER_FILE_PATH = f"{RESOURCE_FILE_PATH}/dead_letters.sqlite3"
 
 MEDIA_FOLDER_PATH = "media"
 
@@ -16,3 +20,35 @@ SESSION_PREFIX_PATH = f"{SESSION_FOLDER_PATH}/session_"
 DEFAULT_CHUNK_SIZE = 500  # Messages per chunk when retrieving from Telegram
 DEFAULT_BATCH_SIZE = 50  # Messages to process before saving progress
 DEFAULT_RATE_LIMIT_DELAY = 1.0  # Seconds between message sends
+DELETE_BATCH_SIZE = 100  # Max message ids Telegram accepts per delete call
+DIALOG_SCAN_CONCURRENCY = 4  # Dialogs swept in parallel by Delete/Find User
+LIVE_ALBUM_DELAY = 0.5  # Seconds to wait for further items of a live album
+LIVE_HIGH_WATER_SAVE_INTERVAL = 2.0  # Min seconds between live high-water saves
+CONFIG_WATCH_INTERVAL = 2.0  # Seconds between forwardConfig.json change checks
+LIVE_RECONNECT_BASE_DELAY = 1.0  # First reconnect back-off after a disconnect
+LIVE_RECONNECT_MAX_DELAY = 300.0  # Cap on the exponential reconnect back-off
+JOB_CONCURRENCY = 2  # Background web jobs (keyword/history/media forwards) run at once
+JOB_HISTORY_SIZE = 50  # Finished jobs kept for status queries
+STREAM_TICK_INTERVAL = 1.0  # Seconds between dashboard stream updates
+DIALOG_CACHE_TTL = 300.0  # Seconds the web API serves cached dialogs before refetching
+POOL_HASH_REPLICAS = 64  # Virtual nodes per account on the account pool's hash ring
+POOL_MIN_SLICE_IDS = 1000  # Smallest message-id window worth handing to another account
+POOL_DRAIN_TIMEOUT = 30.0  # Seconds a failed account gets to flush its send queue
+HEADLESS_PROGRESS_INTERVAL = 1.0  # Min seconds between progress lines per headless job
+SCHEDULE_JITTER = 60.0  # Max random seconds added to each scheduled sync's start
+SCHEDULE_POLL_INTERVAL = 30.0  # Max seconds between scheduler wake-ups (config changes)
+SCHEDULE_MAX_BACKLOG = (
+    20  # Queued sends a scheduled sync may keep ahead of live messages
+)
+ARCHIVE_FETCH_BATCH_SIZE = (
+    100  # Planned message ids fetched per get_messages(ids=...) call
+)
+DEDUP_CAPACITY = 100_000  # Content fingerprints remembered per destination
+DEDUP_FALSE_POSITIVE_RATE = 0.001  # Bloom filter false-positive rate (store lookups)
+DEDUP_MIN_TEXT_LENGTH = 12  # Shorter text-only messages are never treated as duplicates
+DEAD_LETTER_MAX_ATTEMPTS = 5  # Failed sends before a dead letter stops being retried
+DEAD_LETTER_RETRY_BASE_DELAY = 30.0  # Seconds before a first retry, then doubled
+DEAD_LETTER_RETRY_MAX_DELAY = 3600.0  # Cap on the dead-letter retry back-off
+DEAD_LETTER_POLL_INTERVAL = 30.0  # Seconds between due-retry checks while live
+DEAD_LETTER_FETCH_BATCH_SIZE = 100  # Failed message ids re-fetched per call
+PROGRESS_REFRESH_PER_SECOND = 4.0  # Redraws per second of history-forward progress bars
@@ -0,0 +1,115 @@
+"""
+Cron expression parsing for scheduled history syncs.
+Supports the standard five fields and the usual @-aliases.
+"""
+
+from datetime import datetime, timedelta
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (name, lowest, highest) of each field, in expression order.
+FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+# Five years covers every valid expression, including "29 February".
+MAX_SEARCH = timedelta(days=5 * 366)
+
+
+class CronExpression:
+    """A parsed `minute hour day-of-month month day-of-week` expression.
+
+    Fields accept `*`, numbers, ranges (`1-5`), steps (`*/15`, `0-30/10`)
+    and comma-separated lists of those. Day of week runs 0-7 with both 0
+    and 7 meaning Sunday. As in cron, when both day fields are restricted
+    a day matching either one fires.
+    """
+
+    def __init__(self, expression: str):
+        """
+        Raises:
+            ValueError: If the expression isn't a valid cron expression.
+        """
+        self.expression = expression.strip()
+        text = ALIASES.get(self.expression.lower(), self.expression)
+        parts = text.split()
+        if len(parts) != len(FIELDS):
+            raise ValueError(
+                f"Cron expression {expression!r} needs 5 fields, got {len(parts)}"
+            )
+        fields = [self._parse_field(part, *field) for part, field in zip(parts, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {day % 7 for day in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(text: str, name: str, low: int, high: int) -> frozenset[int]:
+        values: set[int] = set()
+        for item in text.split(","):
+            base, _, step_text = item.partition("/")
+            try:
+                step = int(step_text) if step_text else 1
+                if base == "*":
+                    start, end = low, high
+                elif "-" in base:
+                    start, end = (int(value) for value in base.split("-", 1))
+                else:
+                    start = int(base)
+                    end = high if step_text else start
+            except ValueError:
+                raise ValueError(f"Invalid {name} field {text!r}") from None
+            if step < 1 or not low <= start <= end <= high:
+                raise ValueError(
+                    f"Invalid {name} field {text!r} (allowed {low}-{high})"
+                )
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_month = moment.day in self.days
+        # isoweekday() is 1-7 from Monday, so % 7 gives cron's 0 = Sunday.
+        in_week = moment.isoweekday() % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First time strictly after `moment` the expression fires, in
+        `moment`'s timezone.
+
+        Raises:
+            ValueError: If it never fires (e.g. "0 0 31 2 *").
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + MAX_SEARCH
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(
+                    year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0
+                )
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+    def __repr__(self):
+        return f"CronExpression({self.expression!r})"
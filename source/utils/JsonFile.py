@@ -0,0 +1,31 @@
+"""Whole-file JSON state shared by the resumable-progress stores."""
+
+import json
+import os
+
+
+class JsonFile:
+    @staticmethod
+    def read(path: str) -> dict:
+        """The file's object, or {} if it is missing or unreadable."""
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return {}
+
+    @staticmethod
+    def write(path: str, data: dict) -> bool:
+        """Replace the file with `data` through a temp file, so a reader (or
+        an interrupted write) never sees it half-written. Returns True on
+        success."""
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,330 @@
+"""Process-wide metrics in the Prometheus text exposition format.
+
+A small dependency-free registry: counters, gauges and histograms that the
+forwarding pipeline updates in place and that `render()` serializes for a
+`/metrics` scrape. Updating a metric is an attribute add (plus a bisect
+for histograms), so instrumenting a send costs a microsecond or two against
+the tens of milliseconds of the Telegram call itself (see
+`benchmarks/bench_metrics.py`)."""
+
+import math
+import time
+from bisect import bisect_left
+from typing import Generic, TypeVar
+
+# Seconds; spans a local fsync up to a long flood-throttled Telegram call.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+_Child = TypeVar("_Child")
+
+
+class _Metric(Generic[_Child]):
+    TYPE = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, _Child] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self) -> _Child:
+        raise NotImplementedError
+
+    def labels(self, *values) -> _Child:
+        """Child metric for one combination of label values."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {values}"
+                )
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.TYPE}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Counter(_Metric[_CounterChild]):
+    TYPE = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].value += amount
+
+    @property
+    def value(self) -> float:
+        return self._children[()].value
+
+    def _samples(self):
+        for values, child in self._children.items():
+            yield (
+                f"{self.name}{_format_labels(self.labelnames, values)} "
+                f"{_format_value(child.value)}"
+            )
+
+
+class _GaugeChild:
+    __slots__ = ("function", "value")
+
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def get(self) -> float:
+        return self.function() if self.function else self.value
+
+
+class Gauge(_Metric[_GaugeChild]):
+    TYPE = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._children[()].value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].value -= amount
+
+    def set_function(self, function) -> None:
+        """Read the value from `function()` at scrape time instead of
+        keeping it updated, e.g. a queue's `qsize`."""
+        self._children[()].function = function
+
+    @property
+    def value(self) -> float:
+        return self._children[()].get()
+
+    def _samples(self):
+        for values, child in self._children.items():
+            yield (
+                f"{self.name}{_format_labels(self.labelnames, values)} "
+                f"{_format_value(child.get())}"
+            )
+
+
+class _Timer:
+    __slots__ = ("child", "started")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "count", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        # Per-bucket (not cumulative) counts; the last slot is +Inf.
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> _Timer:
+        """Context manager observing the elapsed seconds of its block."""
+        return _Timer(self)
+
+
+class Histogram(_Metric[_HistogramChild]):
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def time(self) -> _Timer:
+        return _Timer(self._children[()])
+
+    @property
+    def count(self) -> int:
+        return self._children[()].count
+
+    def _samples(self):
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip((*self.bounds, math.inf), child.counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames, values, f'le="{_format_value(bound)}"'
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {child.count}"
+
+
+class MetricsRegistry:
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(
+                name, documentation, labelnames, **kwargs
+            )
+        elif not isinstance(metric, cls):
+            raise ValueError(f"{name} is already registered as a {metric.TYPE}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+MESSAGES_FORWARDED = REGISTRY.counter(
+    "tfb_messages_forwarded_total",
+    "Messages forwarded to a destination (album items counted individually).",
+    ("path",),
+)
+MESSAGES_FAILED = REGISTRY.counter(
+    "tfb_messages_failed_total",
+    "Messages whose forward raised an error.",
+    ("path",),
+)
+FLOOD_WAITS = REGISTRY.counter(
+    "tfb_flood_waits_total",
+    "Flood-wait errors Telegram returned instead of performing a call.",
+    ("path",),
+)
+SEND_LATENCY = REGISTRY.histogram(
+    "tfb_send_latency_seconds",
+    "Duration of one forward_messages call (a message or a whole album).",
+    ("path",),
+)
+FETCH_LATENCY = REGISTRY.histogram(
+    "tfb_fetch_latency_seconds",
+    "Duration of one get_messages chunk fetch.",
+    ("operation",),
+)
+HISTORY_FLUSH_SECONDS = REGISTRY.histogram(
+    "tfb_history_flush_seconds",
+    "Time to write the message-mapping history file.",
+)
+PROGRESS_SAVE_SECONDS = REGISTRY.histogram(
+    "tfb_progress_save_seconds",
+    "Time to write the forward progress file.",
+)
+DUPLICATES_SKIPPED = REGISTRY.counter(
+    "tfb_duplicates_skipped_total",
+    "Messages not forwarded because their destination already has the content.",
+    ("path",),
+)
+DEAD_LETTERS = REGISTRY.counter(
+    "tfb_dead_letters_total",
+    "Failed forwards stored for retry, by resulting state (pending, "
+    "exhausted) or resolved once a retry went through.",
+    ("state",),
+)
+QUEUE_JOBS = REGISTRY.counter(
+    "tfb_queue_jobs_total",
+    "Rate-limited queue jobs finished, by outcome.",
+    ("outcome",),
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "tfb_queue_depth",
+    "Jobs waiting in the rate-limited send queue.",
+)
+HISTORY_MAPPINGS = REGISTRY.gauge(
+    "tfb_history_mappings",
+    "Source-to-destination message mappings held in history.",
+)
@@ -0,0 +1,161 @@
+"""Progress bars for history forwards, drawn apart from the forwarding loop.
+
+A forward only bumps a counter per message (`SourceProgress.advance`). One
+render task redraws every bar `PROGRESS_REFRESH_PER_SECOND` times a second:
+a bar per running source with its rate and ETA, plus a line with the send
+queue's depth and current job. Concurrent forwards (web jobs, an account
+pool) share the display, so their output doesn't overwrite each other.
+
+Nothing is drawn unless the console is a terminal and
+`Terminal.live_progress` is set; headless runs clear it. The counters are
+still kept, so callers needn't care which case they are in."""
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from source.utils.Console import Terminal
+from source.utils.Constants import PROGRESS_REFRESH_PER_SECOND
+
+if TYPE_CHECKING:
+    from rich.progress import Progress, TaskID
+
+
+class SourceProgress:
+    """Counters of one running forward; the display reads them."""
+
+    __slots__ = ("done", "label", "queue", "total")
+
+    def __init__(self, label: str, total: int, queue=None):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.queue = queue
+
+    def advance(self, count: int = 1) -> None:
+        self.done += count
+
+
+class ProgressDisplay:
+    _shared: "ProgressDisplay | None" = None
+
+    def __init__(
+        self, console=None, refresh_per_second: float = PROGRESS_REFRESH_PER_SECOND
+    ):
+        self.console = console or Terminal.console
+        self.refresh_per_second = refresh_per_second
+        self.bars: list[SourceProgress] = []
+        self._progress: Progress | None = None
+        self._task_ids: dict[SourceProgress, TaskID] = {}
+        self._render_task: asyncio.Task | None = None
+
+    @classmethod
+    def shared(cls) -> "ProgressDisplay":
+        """The process-wide display on `Terminal.console`."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            Terminal.live_progress
+            and getattr(self.console, "is_terminal", False) is True
+        )
+
+    def add(self, label: str, total: int, queue=None) -> SourceProgress:
+        """Show a bar for a forward that starts now.
+
+        Args:
+            label: Bar description, e.g. the source chat id
+            total: Expected number of messages (may be an estimate)
+            queue: `MessageQueue` its sends go through, for the status line
+        """
+        bar = SourceProgress(label, total, queue)
+        self.bars.append(bar)
+        if self._render_task is None and self.enabled:
+            self._start()
+        return bar
+
+    def remove(self, bar: SourceProgress) -> None:
+        """Drop a finished forward's bar; the last one stops rendering."""
+        if bar in self.bars:
+            self.bars.remove(bar)
+        if not self.bars and self._render_task is not None:
+            self._stop()
+
+    def _start(self) -> None:
+        # Imported on first render: rich's progress widgets are only needed
+        # in an interactive terminal.
+        from rich.progress import (
+            BarColumn,
+            MofNCompleteColumn,
+            Progress,
+            ProgressColumn,
+            TextColumn,
+            TimeRemainingColumn,
+        )
+        from rich.text import Text
+
+        display = self
+
+        class RateColumn(ProgressColumn):
+            def render(self, task):
+                speed = task.speed
+                return Text(f"{speed:.1f} msg/s" if speed else "", style="dim")
+
+        class QueueProgress(Progress):
+            def get_renderables(self):
+                yield self.make_tasks_table(self.tasks)
+                yield Text(display.queue_status(), style="dim")
+
+        progress = QueueProgress(
+            TextColumn("[bold blue]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            RateColumn(),
+            TimeRemainingColumn(),
+            console=self.console,
+            auto_refresh=False,
+            transient=True,
+        )
+        progress.start()
+        self._progress = progress
+        self._render_task = asyncio.create_task(self._render_loop())
+
+    def _stop(self) -> None:
+        if self._render_task is not None:
+            self._render_task.cancel()
+            self._render_task = None
+        if self._progress is not None:
+            self._progress.stop()
+            self._progress = None
+        self._task_ids.clear()
+
+    async def _render_loop(self) -> None:
+        while True:
+            self.render()
+            await asyncio.sleep(1 / self.refresh_per_second)
+
+    def render(self) -> None:
+        """Copy the counters into the bars and redraw once."""
+        progress = self._progress
+        if progress is None:
+            return
+        for bar in list(self._task_ids):
+            if bar not in self.bars:
+                progress.remove_task(self._task_ids.pop(bar))
+        for bar in self.bars:
+            task_id = self._task_ids.get(bar)
+            if task_id is None:
+                task_id = progress.add_task(bar.label, total=bar.total or None)
+                self._task_ids[bar] = task_id
+            progress.update(task_id, completed=bar.done, total=bar.total or None)
+        progress.refresh()
+
+    def queue_status(self) -> str:
+        queues = {id(bar.queue): bar.queue for bar in self.bars if bar.queue}
+        pending = sum(queue.qsize() for queue in queues.values())
+        current = ", ".join(
+            str(queue.current_task) for queue in queues.values() if queue.current_task
+        )
+        return f"Queue: {pending} pending | Current: {current or 'None'}"
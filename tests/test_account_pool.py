@@ -0,0 +1,240 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from source.core.AccountPool import AccountPool, HashRing, PoolAccount
+from source.service.DeadLetterQueue import DeadLetterQueue
+from source.service.MessageForwardService import MessageForwardService
+from source.service.MessageQueue import MessageQueue
+
+
+def _telegram(phone, forward_history=None):
+    telegram = MagicMock()
+    telegram.credentials = SimpleNamespace(phone_number=phone)
+    telegram.queue = MessageQueue(delay=0)
+    telegram.forward_history = forward_history or AsyncMock(return_value=1)
+    telegram.client.get_messages = AsyncMock()
+    return telegram
+
+
+def _pool(*telegrams, **kwargs):
+    return AccountPool(
+        [t.credentials for t in telegrams],
+        shared=telegrams,
+        drain_timeout=0.1,
+        **kwargs,
+    )
+
+
+def test_split_range_is_disjoint_and_covers_the_range():
+    windows = AccountPool.split_range(1, 10_001, 3)
+    assert windows == [(1, 3335), (3335, 6668), (6668, 10001)]
+
+
+def test_hash_ring_only_moves_keys_of_a_removed_node():
+    ring = HashRing(["a", "b", "c"])
+    before = {key: ring.node_for(key) for key in range(500)}
+    after = {key: ring.node_for(key, exclude={"b"}) for key in range(500)}
+
+    moved = {key for key in before if before[key] != after[key]}
+    assert moved == {key for key, node in before.items() if node == "b"}
+    assert set(before.values()) == {"a", "b", "c"}
+
+
+@pytest.mark.asyncio
+async def test_connect_marks_unreachable_accounts_failed():
+    credentials = [SimpleNamespace(phone_number=p) for p in ("+1", "+2")]
+    good = _telegram("+1")
+    good.client.get_dialogs = AsyncMock()
+
+    async def create(creds, interactive=True):
+        assert interactive is False
+        if creds.phone_number == "+2":
+            raise RuntimeError("not logged in")
+        return good
+
+    with patch("source.core.AccountPool.Telegram.create", side_effect=create):
+        pool = AccountPool(credentials)
+        assert await pool.connect() == 1
+
+    assert pool.accounts["+2"].state == PoolAccount.FAILED
+    assert pool.accounts["+2"].last_error == "not logged in"
+    good.client.get_dialogs.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_past_forward_routes_each_destination_by_the_ring():
+    a, b = _telegram("+1"), _telegram("+2")
+    pool = _pool(a, b)
+    config_map = {
+        -1000 - i: [SimpleNamespace(destinationID=-2000 - i)] for i in range(20)
+    }
+    config_map[-1000].append(SimpleNamespace(destinationID=-2020))
+
+    assert await pool.past_forward(config_map) == 21
+
+    for telegram, name in ((a, "+1"), (b, "+2")):
+        destinations = {
+            call.args[0]["destination_id"]
+            for call in telegram.forward_history.await_args_list
+        }
+        assert destinations == {
+            d for d in range(-2020, -1999) if pool.ring.node_for(d) == name
+        }
+        assert all(
+            call.args[0]["id_range"] is None
+            for call in telegram.forward_history.await_args_list
+        )
+
+
+@pytest.mark.asyncio
+async def test_failed_account_is_drained_and_its_job_moves():
+    broken = _telegram("+1", AsyncMock(side_effect=ConnectionError("gone")))
+    healthy = _telegram("+2")
+    pool = _pool(broken, healthy)
+    destination = next(d for d in range(1000) if pool.ring.node_for(d) == "+1")
+
+    count = await pool.forward_history(
+        {"source_id": -100123, "destination_id": destination}
+    )
+
+    assert count == 1
+    assert pool.accounts["+1"].state == PoolAccount.FAILED
+    assert pool.accounts["+1"].last_error == "gone"
+    healthy.forward_history.assert_awaited_once()
+    assert pool.accounts["+2"].jobs_done == 1
+
+
+@pytest.mark.asyncio
+async def test_sends_left_on_a_failed_account_move_to_a_healthy_one(tmp_path):
+    broken, healthy = _telegram("+1"), _telegram("+2")
+    broken.dead_letters = DeadLetterQueue(str(tmp_path / "dead_letters.sqlite3"))
+    healthy.retry_dead_letters = AsyncMock(return_value=2)
+
+    async def hang(*args):
+        await asyncio.Event().wait()
+
+    # The account's connection hangs: nothing queued drains in time.
+    broken.client.forward_messages = AsyncMock(side_effect=hang)
+    pool = _pool(broken, healthy)
+    released = []
+
+    async def forward_history(config):
+        sender = MessageForwardService(broken.client, broken.queue, pool.dead_letters)
+        for message_id in (5, 6):
+            await sender.forward_message(
+                config["destination_id"],
+                SimpleNamespace(id=message_id, chat_id=config["source_id"]),
+                on_failed=lambda message, _error: released.append(message.id),
+            )
+        await asyncio.sleep(0)
+        raise ConnectionError("gone")
+
+    broken.forward_history = AsyncMock(side_effect=forward_history)
+    destination = next(d for d in range(1000) if pool.ring.node_for(d) == "+1")
+
+    await pool.forward_history({"source_id": -100123, "destination_id": destination})
+
+    entries = pool.dead_letters.entries()
+    assert [e["message_ids"] for e in entries] == [[5], [6]]
+    assert released == [5, 6]
+    healthy.retry_dead_letters.assert_awaited_once_with([e["id"] for e in entries])
+    healthy.forward_history.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_job_error_moves_the_job_but_keeps_the_account():
+    not_member = _telegram("+1", AsyncMock(side_effect=ValueError("no entity")))
+    member = _telegram("+2")
+    pool = _pool(not_member, member)
+    destination = next(d for d in range(1000) if pool.ring.node_for(d) == "+1")
+
+    await pool.forward_history({"source_id": -100123, "destination_id": destination})
+
+    assert pool.accounts["+1"].state == PoolAccount.HEALTHY
+    member.forward_history.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_split_hands_each_account_a_disjoint_id_window(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    a, b = _telegram("+1"), _telegram("+2")
+    a.client.get_messages = AsyncMock(return_value=[SimpleNamespace(id=4000)])
+    pool = _pool(a, b, min_slice_ids=1000)
+    progress = []
+
+    await pool.forward_history(
+        {"source_id": -100123, "destination_id": -100456},
+        split=True,
+        on_progress=lambda done, total: progress.append((done, total)),
+    )
+
+    windows = [
+        call.args[0]["id_range"]
+        for telegram in (a, b)
+        for call in telegram.forward_history.await_args_list
+    ]
+    # No end date: the last window stays open for messages posted later.
+    assert windows == [(1, 2001), (2001, None)]
+
+    # Reports from both windows are summed into one progress stream.
+    a.forward_history.await_args.args[0]["on_progress"](5, 10)
+    b.forward_history.await_args.args[0]["on_progress"](2, 10)
+    assert progress[-1] == (7, 20)
+
+    # A later run reuses the saved windows, whose cursors it resumes from,
+    # however much the chat grew or whichever accounts are up.
+    a.client.get_messages = AsyncMock(return_value=[SimpleNamespace(id=9000)])
+    a.forward_history.reset_mock()
+    b.forward_history.reset_mock()
+    c = _telegram("+3")
+    await _pool(a, b, c, min_slice_ids=1000).forward_history(
+        {"source_id": -100123, "destination_id": -100456}, split=True
+    )
+    a.client.get_messages.assert_not_awaited()
+    windows = [
+        call.args[0]["id_range"]
+        for telegram in (a, b, c)
+        for call in telegram.forward_history.await_args_list
+    ]
+    assert sorted(windows) == [(1, 2001), (2001, None)]
+
+
+@pytest.mark.asyncio
+async def test_failed_window_lets_the_others_finish_before_raising():
+    pool = _pool(_telegram("+1"), _telegram("+2"))
+    finished = []
+
+    async def run_job(job, key, account, on_progress):
+        if job["source_id"] == -100111:
+            raise RuntimeError("No healthy account left")
+        await asyncio.sleep(0.01)
+        finished.append(job["source_id"])
+        return 1
+
+    pool._run_job = run_job
+    config_map = {
+        -100111: SimpleNamespace(destinationID=-1),
+        -100222: SimpleNamespace(destinationID=-2),
+    }
+    with pytest.raises(RuntimeError):
+        await pool.past_forward(config_map)
+    assert finished == [-100222]
+
+
+@pytest.mark.asyncio
+async def test_basic_groups_are_never_split():
+    a, b = _telegram("+1"), _telegram("+2")
+    pool = _pool(a, b)
+
+    await pool.forward_history(
+        {"source_id": -123, "destination_id": -100456}, split=True
+    )
+
+    a.client.get_messages.assert_not_awaited()
+    assert a.forward_history.await_count + b.forward_history.await_count == 1
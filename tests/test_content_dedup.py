@@ -0,0 +1,151 @@
+import asyncio
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.service.ContentDedup import BloomFilter, ContentDedup
+from source.service.Forward import Forward
+from source.service.MessageQueue import MessageQueue
+
+DESTINATION = -100222
+
+
+def _message(message_id, chat_id=-100111, text="", photo_id=None, size=2048):
+    photo = SimpleNamespace(id=photo_id) if photo_id else None
+    return SimpleNamespace(
+        id=message_id,
+        chat_id=chat_id,
+        media=photo,
+        photo=photo,
+        document=None,
+        file=SimpleNamespace(size=size) if photo else None,
+        message=text,
+        text=text,
+        grouped_id=None,
+        is_reply=False,
+    )
+
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    members = [os.urandom(16) for _ in range(2000)]
+    for digest in members:
+        bloom.add(digest)
+
+    assert all(digest in bloom for digest in members)
+    false_positives = sum(os.urandom(16) in bloom for _ in range(10000))
+    assert false_positives < 200  # 1% expected, 2% allowed
+
+
+def test_reposts_are_duplicates_per_destination_and_persist(tmp_path):
+    path = str(tmp_path / "dedup.sqlite3")
+    dedup = ContentDedup(path)
+
+    photo = _message(1, text="Sale  today!", photo_id=77)
+    repost = _message(9, chat_id=-100333, text="sale today!", photo_id=77)
+    announcement = _message(2, text="Doors open at 9 tonight")
+
+    assert not dedup.seen(DESTINATION, [photo])
+    assert dedup.seen(DESTINATION, [repost])  # While the first send is in flight
+    dedup.record(DESTINATION, [photo])
+    assert dedup.seen(DESTINATION, [repost])
+    assert not dedup.seen(-100444, [repost])  # Other destination
+    assert not dedup.seen(DESTINATION, [_message(3, text="Sale today!", photo_id=78)])
+    # Too short to tell a repost from a coincidence.
+    assert not dedup.seen(DESTINATION, [_message(4, text="ok")])
+    assert not dedup.seen(DESTINATION, [_message(5, text="ok")])
+    assert not dedup.seen(DESTINATION, [announcement])
+    dedup.record(DESTINATION, [announcement])
+    dedup.close()
+
+    restarted = ContentDedup(path)
+    assert restarted.seen(DESTINATION, [_message(6, text=" DOORS open at 9 tonight")])
+
+
+def test_store_is_compacted_at_capacity(tmp_path):
+    dedup = ContentDedup(str(tmp_path / "dedup.sqlite3"), capacity=4)
+    for i in range(1, 6):
+        dedup.seen(DESTINATION, [_message(i, photo_id=i)])
+        dedup.record(DESTINATION, [_message(i, photo_id=i)])
+
+    (stored,) = dedup.db.execute("SELECT COUNT(*) FROM fingerprints").fetchone()
+    assert stored == 3  # Half kept at the 4th, then the 5th added
+    assert dedup.seen(DESTINATION, [_message(10, photo_id=5)])
+    assert not dedup.seen(DESTINATION, [_message(11, photo_id=1)])
+
+
+@pytest.mark.asyncio
+async def test_live_routes_skip_content_their_destination_already_got(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    client = AsyncMock()
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, msg: MagicMock(id=msg.id + 1000, chat_id=dest)
+    )
+    queue = MessageQueue(delay=0)
+    dedup = ContentDedup(str(tmp_path / "dedup.sqlite3"))
+    config_map = {
+        -100111: SimpleNamespace(destinationID=DESTINATION, dedup=True),
+        -100333: SimpleNamespace(destinationID=DESTINATION, dedup=True),
+        -100555: SimpleNamespace(destinationID=DESTINATION),
+    }
+    forward = Forward(client, config_map, queue, dedup=dedup)
+    forward.apply_config(config_map)
+
+    await forward._route_message(-100111, _message(1, photo_id=77))
+    await forward._route_message(-100333, _message(5, chat_id=-100333, photo_id=77))
+    await forward._route_message(-100555, _message(8, chat_id=-100555, photo_id=77))
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+
+    forwarded = [call.args[1].id for call in client.forward_messages.await_args_list]
+    assert forwarded == [1, 8]  # The route without dedup still forwards
+    stats = {s["source_id"]: s for s in forward.route_stats()}
+    assert stats[-100333]["duplicates"] == 1
+    assert stats[-100333]["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_send_leaves_no_fingerprint_behind(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    client = AsyncMock()
+    client.forward_messages = AsyncMock(side_effect=ConnectionError("reset"))
+    queue = MessageQueue(delay=0)
+    path = str(tmp_path / "dedup.sqlite3")
+    dedup = ContentDedup(path)
+    config_map = {-100111: SimpleNamespace(destinationID=DESTINATION, dedup=True)}
+    forward = Forward(client, config_map, queue, dedup=dedup)
+    forward.apply_config(config_map)
+
+    await forward._route_message(-100111, _message(1, photo_id=77))
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    assert dedup.stats()["in_flight"] == 0
+    (stored,) = dedup.db.execute("SELECT COUNT(*) FROM fingerprints").fetchone()
+    assert stored == 0
+
+    # Handled again (a reconnect replay) once sends work: it goes out.
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, msg: MagicMock(id=msg.id + 1000, chat_id=dest)
+    )
+    await forward._route_message(-100111, _message(1, photo_id=77))
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+    client.forward_messages.assert_awaited_once()
+    dedup.close()
+
+    assert ContentDedup(path).seen(DESTINATION, [_message(9, photo_id=77)])
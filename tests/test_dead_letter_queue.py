@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from telethon import errors
+
+from source.service.DeadLetterQueue import DeadLetterQueue
+from source.service.Forward import Forward
+from source.service.MessageQueue import MessageQueue
+
+SOURCE = -100111
+DESTINATION = -100222
+
+
+def _message(message_id, grouped_id=None):
+    return SimpleNamespace(
+        id=message_id, chat_id=SOURCE, grouped_id=grouped_id, is_reply=False
+    )
+
+
+def test_failures_back_off_exponentially_until_exhausted(tmp_path):
+    dead_letters = DeadLetterQueue(
+        str(tmp_path / "dead_letters.sqlite3"), max_attempts=3, base_delay=10
+    )
+
+    first = dead_letters.record(SOURCE, [5], DESTINATION, ConnectionError("reset"))
+    assert first["attempts"] == 1 and first["state"] == "pending"
+    assert first["next_attempt"] - first["failed_at"] == pytest.approx(10)
+
+    second = dead_letters.record(
+        SOURCE, [5], DESTINATION, errors.FloodWaitError(request=None, capture=300)
+    )
+    assert second["id"] == first["id"] and second["error"] == "FloodWaitError"
+    # Back-off would be 20s; the flood wait asked for longer.
+    assert second["next_attempt"] - second["failed_at"] == pytest.approx(300)
+
+    third = dead_letters.record(SOURCE, [5], DESTINATION, ConnectionError("reset"))
+    assert third["state"] == "exhausted"
+    assert dead_letters.claim_due(now=third["next_attempt"] + 1) == []
+
+    # A manual retry puts it back for one more attempt.
+    assert dead_letters.retry() == 1
+    assert [e["id"] for e in dead_letters.claim_due()] == [first["id"]]
+    assert dead_letters.claim_due() == []  # Claimed until its back-off passes
+    again = dead_letters.record(SOURCE, [5], DESTINATION, ConnectionError("reset"))
+    assert again["state"] == "exhausted"
+
+    dead_letters.record(SOURCE, [6, 7], DESTINATION, ConnectionError("reset"))
+    assert dead_letters.stats() == {"pending": 1, "exhausted": 1}
+    assert dead_letters.purge(state="exhausted") == 1
+    assert dead_letters.resolve(SOURCE, [6, 7], DESTINATION)
+    assert dead_letters.entries() == []
+
+
+@pytest.mark.asyncio
+async def test_failed_sends_are_refetched_and_retried(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    client = AsyncMock()
+    client.forward_messages = AsyncMock(
+        side_effect=errors.FileReferenceExpiredError(request=None)
+    )
+    dead_letters = DeadLetterQueue(str(tmp_path / "dead_letters.sqlite3"))
+    queue = MessageQueue(delay=0)
+    forward = Forward(client, {}, queue, dead_letters=dead_letters)
+
+    await forward._forward_message(DESTINATION, _message(5))
+    await forward._forward_album(DESTINATION, [_message(6, 9), _message(7, 9)])
+    await forward._forward_message(DESTINATION, _message(8))
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+
+    entries = dead_letters.entries()
+    assert [e["message_ids"] for e in entries] == [[5], [6, 7], [8]]
+    assert {e["error"] for e in entries} == {"FileReferenceExpiredError"}
+
+    # Fresh copies come back by id; 8 was deleted from the source since.
+    client.get_messages = AsyncMock(
+        return_value=[_message(5), _message(6, 9), _message(7, 9), None]
+    )
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, payload: (
+            [MagicMock(id=m.id + 1000) for m in payload]
+            if isinstance(payload, list)
+            else MagicMock(id=payload.id + 1000, chat_id=dest)
+        )
+    )
+    dead_letters.retry()
+    assert await forward.retry_dead_letters() == 2
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+
+    client.get_messages.assert_awaited_once_with(SOURCE, ids=[5, 6, 7, 8])
+    assert dead_letters.entries() == []
+    assert forward.history.forwarded_ids(SOURCE, [5, 6, 7], DESTINATION) == {5, 6, 7}
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from source.service.DialogCache import DialogCache
+
+
+def _dialog(id, title, kind="Channel", username=None):
+    return SimpleNamespace(
+        id=id,
+        title=title,
+        is_channel=kind == "Channel",
+        is_group=kind == "Group",
+        is_user=kind == "User",
+        entity=SimpleNamespace(username=username, access_hash=None),
+    )
+
+
+@pytest.fixture
+def chat_path(tmp_path, monkeypatch):
+    path = tmp_path / "chats.json"
+    monkeypatch.setattr("source.model.Chat.CHAT_FILE_PATH", str(path))
+    return path
+
+
+@pytest.fixture
+def client():
+    client = AsyncMock()
+    client.get_dialogs = AsyncMock(
+        return_value=[
+            _dialog(3, "Beta", "Group"),
+            _dialog(2, "Alpha", "User", username="alpha_user"),
+            _dialog(1, "Alpha", "Channel"),
+        ]
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_get_serves_cached_dialogs_until_refresh(client, chat_path):
+    cache = DialogCache(client, ttl=60)
+
+    chats = await cache.get()
+    assert [(c.title, c.id) for c in chats] == [("Alpha", 1), ("Alpha", 2), ("Beta", 3)]
+    assert [c["id"] for c in json.loads(chat_path.read_text())] == [1, 2, 3]
+
+    assert await cache.get() is chats
+    assert client.get_dialogs.await_count == 1
+
+    await cache.get(refresh=True)
+    assert client.get_dialogs.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_cache_refetches(client, chat_path):
+    cache = DialogCache(client, ttl=0)
+    await cache.get()
+    await cache.get()
+    assert client.get_dialogs.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_fetch(client, chat_path):
+    release = asyncio.Event()
+    dialogs = client.get_dialogs.return_value
+
+    async def slow_fetch():
+        await release.wait()
+        return dialogs
+
+    client.get_dialogs = AsyncMock(side_effect=slow_fetch)
+    cache = DialogCache(client, ttl=60)
+
+    waiters = [asyncio.create_task(cache.get()) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert client.get_dialogs.await_count == 1
+    assert results[0] is results[1] is results[2]
+
+
+@pytest.mark.asyncio
+async def test_etag_follows_content(client, chat_path):
+    cache = DialogCache(client, ttl=60)
+    await cache.get()
+    etag = cache.etag
+
+    await cache.get(refresh=True)
+    assert cache.etag == etag
+
+    client.get_dialogs.return_value = [_dialog(4, "Gamma")]
+    await cache.get(refresh=True)
+    assert cache.etag != etag
+
+
+@pytest.mark.asyncio
+async def test_select_filters_by_type_and_text(client, chat_path):
+    chats = await DialogCache(client).get()
+
+    assert [c.id for c in DialogCache.select(chats, chat_type="channel")] == [1]
+    assert [c.id for c in DialogCache.select(chats, query="ALPHA_")] == [2]
+    assert [c.id for c in DialogCache.select(chats, "Group", "bet")] == [3]
+    assert DialogCache.select(chats) == chats
@@ -0,0 +1,87 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from telethon import errors
+
+from source.service.DialogScanner import DialogScanner
+from source.service.DialogScanProgress import DialogScanProgress
+from source.service.FloodWaitGovernor import FloodWaitGovernor
+
+
+@pytest.fixture
+def scan_progress_file(tmp_path, monkeypatch):
+    path = tmp_path / "dialog_scan_progress.json"
+    monkeypatch.setattr(
+        "source.service.DialogScanProgress.DIALOG_SCAN_PROGRESS_FILE_PATH", str(path)
+    )
+    return path
+
+
+def _console():
+    return MagicMock(is_terminal=False)
+
+
+@pytest.mark.asyncio
+async def test_scan_never_exceeds_max_concurrency(scan_progress_file):
+    dialogs = [MagicMock(id=i) for i in range(10)]
+    active = 0
+    peak = 0
+
+    async def handler(_dialog):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    scanner = DialogScanner(_console(), max_concurrent=3)
+    result = await scanner.scan("delete", dialogs, handler)
+
+    assert result == {"done": 10, "failed": 0, "skipped": 0}
+    assert peak == 3
+    # A clean sweep forgets its cursor so the next run starts fresh.
+    assert DialogScanProgress.load("delete") == set()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_scan_resumes_with_pending_dialogs(scan_progress_file):
+    dialogs = [MagicMock(id=i) for i in range(4)]
+    seen = []
+
+    async def failing_handler(dialog):
+        if dialog.id == 2:
+            raise RuntimeError("connection lost")
+        seen.append(dialog.id)
+
+    scanner = DialogScanner(_console(), max_concurrent=1)
+    first = await scanner.scan("find_user:7", dialogs, failing_handler)
+
+    assert first["failed"] == 1
+    assert DialogScanProgress.load("find_user:7") == {0, 1, 3}
+
+    seen.clear()
+
+    async def handler(dialog):
+        seen.append(dialog.id)
+
+    second = await scanner.scan("find_user:7", dialogs, handler)
+
+    assert seen == [2]
+    assert second == {"done": 1, "failed": 0, "skipped": 3}
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_pauses_and_retries():
+    governor = FloodWaitGovernor(console=_console())
+    calls = 0
+
+    async def flaky():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise errors.FloodWaitError(request=None, capture=0)
+        return "ok"
+
+    assert await governor.run(flaky) == "ok"
+    assert calls == 2
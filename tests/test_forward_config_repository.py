@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from source.model.ForwardConfig import ForwardConfig
+from source.service.ForwardConfigRepository import ForwardConfigRepository
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    return tmp_path / "forwardConfig.json"
+
+
+def test_snapshot_is_cached_until_the_file_changes(config_path):
+    config_path.write_text(json.dumps([{"sourceID": 1, "destinationID": 2}]))
+    repository = ForwardConfigRepository(str(config_path))
+
+    with patch(
+        "source.service.ForwardConfigRepository.json.load", wraps=json.load
+    ) as load:
+        first = repository.snapshot()
+        assert repository.snapshot() is first
+        assert load.call_count == 1
+
+        config_path.write_text(
+            json.dumps(
+                [
+                    {"sourceID": 1, "destinationID": 2},
+                    {"sourceID": 3, "destinationID": 4, "enabled": False},
+                ]
+            )
+        )
+        stat = os.stat(config_path)
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        second = repository.snapshot()
+
+    assert load.call_count == 2
+    assert second.version == first.version + 1
+    assert [c.sourceID for c in second.configs] == [1, 3]
+    assert second.enabled_count == 1
+
+
+def test_missing_file_is_an_empty_snapshot(config_path):
+    snapshot = ForwardConfigRepository(str(config_path)).snapshot()
+    assert snapshot.configs == ()
+    assert snapshot.enabled_count == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_do_not_clobber_each_other(config_path):
+    repository = ForwardConfigRepository(str(config_path))
+
+    async def add(source_id):
+        config = ForwardConfig(sourceID=source_id, destinationID=0)
+        return await repository.update(lambda configs: configs.append(config))
+
+    snapshots = await asyncio.gather(*(add(i) for i in range(10)))
+
+    saved = json.loads(config_path.read_text())
+    assert sorted(c["sourceID"] for c in saved) == list(range(10))
+    assert sorted(s.version for s in snapshots) == list(range(1, 11))
+    assert not os.path.exists(f"{config_path}.tmp")
+    assert len(repository.snapshot().configs) == 10
+
+
+@pytest.mark.asyncio
+async def test_failed_update_writes_nothing_and_snapshots_stay_immutable(config_path):
+    original = json.dumps([{"sourceID": 1, "destinationID": 2}])
+    config_path.write_text(original)
+    repository = ForwardConfigRepository(str(config_path))
+    before = repository.snapshot()
+
+    def reject(configs):
+        configs[0].enabled = False
+        raise LookupError("not found")
+
+    with pytest.raises(LookupError):
+        await repository.update(reject)
+
+    assert before.configs[0].enabled is True
+    assert config_path.read_text() == original
+    assert repository.snapshot() is before
@@ -0,0 +1,82 @@
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from source.service.Forward import Forward
+from source.service.ForwardConfigWatcher import ForwardConfigWatcher
+
+
+def _write_configs(path, configs):
+    path.write_text(json.dumps(configs))
+    # Bump the mtime explicitly so back-to-back writes in one test are
+    # always seen as a change, whatever the filesystem's timestamp precision.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    path = tmp_path / "forwardConfig.json"
+    monkeypatch.setattr(
+        "source.model.ForwardConfig.FORWARD_CONFIG_FILE_PATH", str(path)
+    )
+    return path
+
+
+def test_check_applies_changed_config_grouped_by_source(config_path):
+    _write_configs(config_path, [{"sourceID": 1, "destinationID": 2}])
+    on_change = MagicMock()
+    watcher = ForwardConfigWatcher(on_change, path=str(config_path))
+
+    assert watcher.check() is False  # unchanged since the watcher started
+
+    _write_configs(
+        config_path,
+        [{"sourceID": 1, "destinationID": 2}, {"sourceID": 1, "destinationID": 3}],
+    )
+    assert watcher.check() is True
+    assert watcher.check() is False
+
+    config_map = on_change.call_args.args[0]
+    assert [c.destinationID for c in config_map[1]] == [2, 3]
+
+
+def test_check_retries_after_a_partial_write(config_path):
+    _write_configs(config_path, [])
+    on_change = MagicMock()
+    watcher = ForwardConfigWatcher(on_change, path=str(config_path))
+
+    config_path.write_text('[{"sourceID": 1')
+    os.utime(config_path, ns=(0, os.stat(config_path).st_mtime_ns + 2_000_000))
+    assert watcher.check() is False
+    on_change.assert_not_called()
+
+    _write_configs(config_path, [{"sourceID": 1, "destinationID": 2}])
+    assert watcher.check() is True
+
+
+def test_apply_config_swaps_routes_and_keeps_counters(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    client = MagicMock()
+    forward = Forward(
+        client, {-100111: [SimpleNamespace(destinationID=-100201)]}, MagicMock()
+    )
+    forward.add_events()
+    forward.routing_table.routes_for(-100111)[0].delivered = 7
+
+    forward.apply_config(
+        {
+            -100111: [SimpleNamespace(destinationID=-100201)],
+            -100112: [SimpleNamespace(destinationID=-100202)],
+        }
+    )
+
+    assert forward.raw_router.source_ids == frozenset({-100111, -100112})
+    assert forward.routing_table.routes_for(-100111)[0].delivered == 7
+    # Handlers are registered once; a reload only swaps the table.
+    assert client.add_event_handler.call_count == 1
@@ -4,7 +4,10 @@ from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
+from source.model.History import History
 from source.service.Forward import Forward
+from source.service.ForwardProgress import ForwardProgress
+from source.service.HistoryService import HistoryService
 from source.service.MessageForwardService import MessageForwardService
 from source.service.MessageQueue import MessageQueue
 
@@ -15,6 +18,7 @@ def _mock_message(
     chat_id: int = -100111,
     media=None,
     text: str = "",
+    grouped_id: int | None = None,
 ):
     message = MagicMock()
     message.id = message_id
@@ -23,6 +27,8 @@ def _mock_message(
     message.is_reply = False
     message.media = media
     message.text = text
+    message.grouped_id = grouped_id
+    message.action = None
     return message
 
 
@@ -159,6 +165,10 @@ def test_progress_key_keeps_media_and_keyword_runs_separate():
     assert media_key == "-100123|2026-06-01|2026-06-30|media"
     assert keyword_key == "-100123|2026-06-01|2026-06-30|kw:invoice"
     assert len({plain_key, media_key, keyword_key}) == 3
+    assert (
+        forward.progress_key(-100123, "2026-06-01", "2026-06-30", destination_id=-5)
+        == "-100123|2026-06-01|2026-06-30|to:-5"
+    )
 
 
 def test_matches_criteria_filters_by_media_presence():
@@ -247,11 +257,6 @@ async def test_forward_chat_history_forwards_in_ascending_order_and_stops_at_end
 
     client.get_messages = AsyncMock(side_effect=fake_get_messages)
 
-    async def idle_status_task():
-        while True:
-            await asyncio.sleep(60)
-
-    forward._periodic_status_update = idle_status_task
     forward._get_total_message_count = AsyncMock(return_value=2)
     forward._handle_reply = AsyncMock(return_value=None)
     forward._save_progress = AsyncMock()
@@ -380,10 +385,6 @@ async def test_media_forward_end_to_end_forwards_in_order_and_resumes(
         side_effect=lambda _dest, msg: MagicMock(id=msg.id * 10, chat_id=-100222)
     )
 
-    async def idle_status_task():
-        while True:
-            await asyncio.sleep(60)
-
     config = MagicMock(
         destinationID=-100222,
         start_date="2026-06-01",
@@ -396,7 +397,6 @@ async def test_media_forward_end_to_end_forwards_in_order_and_resumes(
 
     queue = MessageQueue(delay=0)
     forward = Forward(client, {-100111: config}, queue)
-    forward._periodic_status_update = idle_status_task
     forward._get_total_message_count = AsyncMock(return_value=2)
     await forward.history_handler()
     await asyncio.wait_for(queue.queue.join(), timeout=1)
@@ -411,9 +411,397 @@ async def test_media_forward_end_to_end_forwards_in_order_and_resumes(
     client.forward_messages.reset_mock()
     queue_again = MessageQueue(delay=0)
     forward_again = Forward(client, {-100111: config}, queue_again)
-    forward_again._periodic_status_update = idle_status_task
     forward_again._get_total_message_count = AsyncMock(return_value=2)
     await forward_again.history_handler()
     await queue_again.stop()
 
     client.forward_messages.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_each_destination_of_a_source_resumes_from_its_own_cursor(
+    monkeypatch, tmp_path
+):
+    """Jobs forwarding one source to two destinations keep separate cursors:
+    a destination interrupted part-way resumes where it stopped, even after
+    the other one has finished the whole range."""
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    messages = [
+        _mock_message(message_id, datetime(2026, 6, day, tzinfo=timezone.utc))
+        for message_id, day in ((101, 2), (102, 5), (103, 9), (104, 12))
+    ]
+
+    client = AsyncMock()
+
+    async def fake_get_messages(_source, **kwargs):
+        return [m for m in messages if m.id > kwargs.get("min_id", 0)]
+
+    client.get_messages = AsyncMock(side_effect=fake_get_messages)
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, msg: MagicMock(id=msg.id * 10, chat_id=dest)
+    )
+
+    async def run(destination_id):
+        config = MagicMock(
+            destinationID=destination_id,
+            start_date="2026-06-01",
+            end_date="2026-06-30",
+            timezone_name="UTC",
+            dry_run=False,
+            media_only=False,
+            keyword=None,
+            id_range=None,
+            dedup=False,
+        )
+        client.forward_messages.reset_mock()
+        queue = MessageQueue(delay=0)
+        forward = Forward(client, {-100111: config}, queue)
+        forward._get_total_message_count = AsyncMock(return_value=4)
+        await forward.history_handler()
+        await asyncio.wait_for(queue.queue.join(), timeout=1)
+        await queue.stop()
+        return [call.args[1].id for call in client.forward_messages.await_args_list]
+
+    # The job for -100333 was interrupted after sending 101 and 102.
+    ForwardProgress.save(
+        -100111, 102, "2026-06-01", "2026-06-30", destination_id=-100333
+    )
+
+    assert await run(-100222) == [101, 102, 103, 104]
+    assert await run(-100333) == [103, 104]
+    assert await run(-100222) == []
+    assert await run(-100333) == []
+
+
+@pytest.mark.asyncio
+async def test_history_run_forwards_every_route_of_a_source(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    june = datetime(2026, 6, 2, tzinfo=timezone.utc)
+    messages = [
+        _mock_message(101, june, media=MagicMock()),
+        _mock_message(102, june),
+        _mock_message(103, june, media=MagicMock()),
+    ]
+    client = AsyncMock()
+    client.get_messages = AsyncMock(
+        side_effect=lambda _source, **kwargs: [
+            m for m in messages if m.id > kwargs.get("min_id", 0)
+        ]
+    )
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, msg: MagicMock(id=msg.id * 10, chat_id=dest)
+    )
+    routes = [
+        MagicMock(
+            destinationID=destination_id,
+            start_date=None,
+            end_date=None,
+            timezone_name="UTC",
+            dry_run=False,
+            media_only=media_only,
+            keyword=None,
+            id_range=None,
+            dedup=False,
+        )
+        for destination_id, media_only in ((-100222, False), (-100333, True))
+    ]
+
+    queue = MessageQueue(delay=0)
+    forward = Forward(client, {-100111: routes}, queue)
+    forward._get_total_message_count = AsyncMock(return_value=3)
+    assert await forward.history_handler() == 5
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+
+    sent = [(c.args[0], c.args[1].id) for c in client.forward_messages.await_args_list]
+    assert sent == [
+        (-100222, 101),
+        (-100222, 102),
+        (-100222, 103),
+        (-100333, 101),
+        (-100333, 103),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_forward_chat_history_groups_albums_across_chunk_boundaries(
+    monkeypatch,
+):
+    """Album items must go out in one forward_album call, even when the
+    album straddles two fetched chunks, while singles still go one by one."""
+    client = AsyncMock()
+    forward = Forward(client, {-100111: MagicMock(destinationID=-100222)}, MagicMock())
+    monkeypatch.setattr("source.service.Forward.DEFAULT_CHUNK_SIZE", 2)
+
+    day = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+    chunks = {
+        0: [_mock_message(1, day), _mock_message(2, day, grouped_id=77)],
+        2: [_mock_message(3, day, grouped_id=77), _mock_message(4, day)],
+    }
+
+    async def fake_fetch(_source, cursor_id, _start, _limit):
+        return chunks.get(cursor_id, [])
+
+    forward._fetch_ascending_chunk = fake_fetch
+    forward._get_total_message_count = AsyncMock(return_value=4)
+    forward._save_progress = AsyncMock()
+    forward._forward_message = AsyncMock()
+    forward._forward_album = AsyncMock()
+
+    await forward._forward_chat_history(-100111, 0)
+
+    singles = [call.args[1].id for call in forward._forward_message.await_args_list]
+    albums = [
+        [m.id for m in call.args[1]] for call in forward._forward_album.await_args_list
+    ]
+    assert singles == [1, 4]
+    assert albums == [[2, 3]]
+    forward._save_progress.assert_awaited_with(
+        -100111, 4, None, None, False, None, None, -100222
+    )
+
+
+def test_album_sent_records_history_for_every_item(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    forward = Forward(AsyncMock(), {}, MagicMock())
+    source_messages = [
+        MagicMock(id=2, chat_id=-100111),
+        MagicMock(id=3, chat_id=-100111),
+    ]
+    sent = [MagicMock(id=902), MagicMock(id=903)]
+
+    forward._on_album_sent(source_messages, sent, -100222)
+
+    assert forward.history.get_mapping(-100111, 2, -100222) == 902
+    assert forward.history.get_mapping(-100111, 3, -100222) == 903
+
+
+def test_forwards_sharing_a_history_keep_each_others_mappings(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    history = HistoryService()
+    live = Forward(AsyncMock(), {}, MagicMock(), history=history)
+    backfill = Forward(AsyncMock(), {}, MagicMock(), history=history)
+
+    live._on_album_sent([MagicMock(id=2, chat_id=-100111)], [MagicMock(id=902)], -5)
+    backfill._on_album_sent([MagicMock(id=3, chat_id=-100111)], [MagicMock(id=903)], -5)
+
+    # Each save rewrites the file; with one store neither drops the other.
+    assert History().message_map == {(-100111, 2, -5): 902, (-100111, 3, -5): 903}
+
+
+@pytest.mark.asyncio
+async def test_live_catch_up_first_run_only_records_high_water(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    client = AsyncMock()
+    client.add_event_handler = MagicMock()
+    client.get_messages = AsyncMock(
+        return_value=[_mock_message(500, datetime.now(timezone.utc))]
+    )
+    forward = Forward(client, {-100111: MagicMock(destinationID=-100222)}, MagicMock())
+
+    missed = await forward.start_live()
+
+    assert missed == 0
+    client.forward_messages.assert_not_called()
+    assert ForwardProgress.load_live(-100111) == 500
+
+
+@pytest.mark.asyncio
+async def test_live_catch_up_backfills_gap_then_releases_held_live_messages(
+    monkeypatch, tmp_path
+):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    ForwardProgress.save_live({(-100111, -100222): 100})
+    now = datetime.now(timezone.utc)
+    gap = [_mock_message(i, now) for i in (101, 102, 103)]
+
+    client = AsyncMock()
+    client.add_event_handler = MagicMock()
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, msg: MagicMock(id=msg.id + 1000, chat_id=dest)
+    )
+    queue = MessageQueue(delay=0)
+    forward = Forward(client, {-100111: MagicMock(destinationID=-100222)}, queue)
+    # 102 already went out before the bot stopped.
+    forward.history.add_mapping(-100111, 102, -100222, 1102)
+
+    async def fake_get_messages(_source, **kwargs):
+        assert kwargs["min_id"] == 100
+        # Live updates arrive while the gap is still being fetched: 103 is
+        # also in the gap, 104 is new.
+        await forward._on_live_message(-100111, gap[2])
+        await forward._on_live_message(-100111, _mock_message(104, now))
+        return gap
+
+    client.get_messages = AsyncMock(side_effect=fake_get_messages)
+
+    missed = await forward.start_live()
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+
+    assert missed == 3
+    forwarded = [c.args[1].id for c in client.forward_messages.await_args_list]
+    assert forwarded == [101, 103, 104]
+    forward._save_high_water(force=True)
+    assert ForwardProgress.load_live(-100111) == 104
+
+
+@pytest.mark.asyncio
+async def test_live_catch_up_starts_at_the_route_furthest_behind(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    # -100222 got 104 and 105; their sends to -100333 were still queued.
+    ForwardProgress.save_live({(-100111, -100222): 105, (-100111, -100333): 103})
+    now = datetime.now(timezone.utc)
+    client = AsyncMock()
+    client.add_event_handler = MagicMock()
+    client.get_messages = AsyncMock(
+        return_value=[_mock_message(104, now), _mock_message(105, now)]
+    )
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, msg: MagicMock(id=msg.id + 1000, chat_id=dest)
+    )
+    queue = MessageQueue(delay=0)
+    routes = [MagicMock(destinationID=d, dedup=False) for d in (-100222, -100333)]
+    forward = Forward(client, {-100111: routes}, queue)
+    for message_id in (104, 105):
+        forward.history.add_mapping(-100111, message_id, -100222, message_id + 1000)
+
+    assert await forward.start_live() == 2
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+
+    assert client.get_messages.await_args.kwargs["min_id"] == 103
+    sent = [(c.args[0], c.args[1].id) for c in client.forward_messages.await_args_list]
+    assert sent == [(-100333, 104), (-100333, 105)]
+    assert ForwardProgress.load_live(-100111) == 105
+
+
+def test_clearing_progress_keeps_live_marks_and_global_searches(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    ForwardProgress.save(-100111, 50, "2026-06-01", "2026-06-30")
+    ForwardProgress.save_plan(-100111, [(1, 100), (100, None)])
+    ForwardProgress.save_live({(-100111, -100222): 80})
+    ForwardProgress.save_global("sale", {"newest": (1, 2, 3)}, completed=True)
+
+    assert ForwardProgress.clear()
+    assert not ForwardProgress.clear()  # Nothing left to clear
+
+    assert ForwardProgress.load(-100111, "2026-06-01", "2026-06-30") == 0
+    assert ForwardProgress.load_plan(-100111) is None
+    assert ForwardProgress.load_live(-100111) == 80
+    assert ForwardProgress.load_global("sale")["floor"] == (1, 2, 3)
+
+
+@pytest.mark.asyncio
+async def test_history_id_window_stops_at_its_upper_bound(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    date = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    history = [_mock_message(i, date) for i in range(1, 11)]
+    client = AsyncMock()
+
+    async def fake_get_messages(_source, **kwargs):
+        return [m for m in history if m.id > kwargs["min_id"]]
+
+    client.get_messages = AsyncMock(side_effect=fake_get_messages)
+    config = MagicMock(
+        destinationID=-100222,
+        start_date=None,
+        end_date=None,
+        timezone_name="UTC",
+        dry_run=True,
+        media_only=False,
+        keyword=None,
+        id_range=(3, 7),
+    )
+    forward = Forward(client, {-100111: config}, MessageQueue(delay=0))
+
+    assert await forward.history_handler() == 4
+    assert client.get_messages.await_args_list[0].kwargs["min_id"] == 2
+    assert ForwardProgress.key(-100111, id_range=(3, 7)).endswith("|ids:3-7")
+
+
+@pytest.mark.asyncio
+async def test_history_run_skips_messages_history_already_maps(monkeypatch, tmp_path):
+    """A run resuming from a cursor that lagged behind its sends must not
+    re-send what `History` already recorded for the destination."""
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    monkeypatch.setattr("source.service.Forward.DEFAULT_CHUNK_SIZE", 3)
+    forward = Forward(
+        AsyncMock(), {-100111: MagicMock(destinationID=-100222)}, MagicMock()
+    )
+    for message_id in (1, 2, 3):
+        forward.history.add_mapping(-100111, message_id, -100222, 900 + message_id)
+    forward.history.add_mapping(-100111, 4, -100333, 904)  # Other destination
+
+    day = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+    chunks = {
+        0: [
+            _mock_message(1, day),
+            _mock_message(2, day, grouped_id=77),
+            _mock_message(3, day, grouped_id=77),
+        ],
+        3: [_mock_message(4, day), _mock_message(5, day)],
+    }
+
+    async def fake_fetch(_source, cursor_id, _start, _limit):
+        return chunks.get(cursor_id, [])
+
+    lookups = MagicMock(wraps=forward.history.forwarded_ids)
+    forward.history.forwarded_ids = lookups
+    forward._fetch_ascending_chunk = fake_fetch
+    forward._get_total_message_count = AsyncMock(return_value=5)
+    forward._save_progress = AsyncMock()
+    forward._forward_message = AsyncMock()
+    forward._forward_album = AsyncMock()
+
+    assert await forward._forward_chat_history(-100111, 0) == 2
+
+    singles = [call.args[1].id for call in forward._forward_message.await_args_list]
+    assert singles == [4, 5]
+    forward._forward_album.assert_not_awaited()
+    assert lookups.call_count == 2  # One batched check per chunk
+    forward._save_progress.assert_awaited_with(
+        -100111, 5, None, None, False, None, None, -100222
+    )
@@ -0,0 +1,164 @@
+import io
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.core.Headless import (
+    EXIT_JOBS_FAILED,
+    EXIT_NO_ACCOUNT,
+    EXIT_OK,
+    HeadlessRunner,
+    JobFile,
+    JobFileError,
+    ProgressWriter,
+)
+from source.service.MessageQueue import MessageQueue
+
+
+def _telegram():
+    telegram = MagicMock()
+    telegram.queue = MessageQueue(delay=0)
+    telegram.forward_history = AsyncMock(return_value=3)
+    telegram.forward_media_files = AsyncMock(return_value=2)
+    telegram.forward_by_keyword = AsyncMock(return_value=1)
+    return telegram
+
+
+def _events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_job_file_expands_source_destination_pairs():
+    job_file = JobFile.parse(
+        {
+            "concurrency": 3,
+            "jobs": [
+                {"sources": [-1001, -1002], "destinations": [-2001, -2002]},
+                {
+                    "name": "files",
+                    "source_id": -1003,
+                    "destination_id": -2003,
+                    "media_only": True,
+                    "keyword": "pdf",
+                },
+            ],
+        }
+    )
+
+    assert job_file.concurrency == 3
+    assert [(j["source_id"], j["destination_id"]) for j in job_file.jobs] == [
+        (-1001, -2001),
+        (-1001, -2002),
+        (-1002, -2001),
+        (-1002, -2002),
+        (-1003, -2003),
+    ]
+    assert job_file.jobs[0]["name"] == "job-1"
+    assert [JobFile.kind(j) for j in job_file.jobs[-2:]] == ["history", "media"]
+
+
+@pytest.mark.parametrize(
+    "spec, message",
+    [
+        ({"source_id": -1, "destination_id": -2, "dest": 1}, "unknown fields"),
+        ({"source_id": "-1", "destination_id": -2}, "must be a chat id"),
+        ({"source_id": -1}, "must be a chat id"),
+        ({"source_id": -1, "destination_id": -2, "start_date": "June"}, "invalid date"),
+        (
+            {
+                "source_id": -1,
+                "destination_id": -2,
+                "start_date": "2026-06-30",
+                "end_date": "2026-06-01",
+            },
+            "after end_date",
+        ),
+        ({"source_id": -1, "destination_id": -2, "timezone_name": "Mars"}, "timezone"),
+        (
+            {
+                "source_id": -1,
+                "destination_id": -2,
+                "keyword": "a AND",
+                "full_text": True,
+            },
+            "Invalid full-text query",
+        ),
+    ],
+)
+def test_job_file_rejects_invalid_jobs(spec, message):
+    with pytest.raises(JobFileError, match=message):
+        JobFile.parse({"jobs": [spec]})
+
+
+@pytest.mark.asyncio
+async def test_runner_dispatches_by_kind_and_reports_json_lines():
+    telegram = _telegram()
+
+    async def history(config):
+        config["on_progress"](1, 3)
+        config["on_progress"](2, 3)  # Throttled away
+        return 3
+
+    telegram.forward_history.side_effect = history
+    job_file = JobFile.parse(
+        [
+            {"source_id": -1, "destination_id": -2},
+            {"source_id": -3, "destination_id": -4, "keyword": "sale"},
+            {"source_id": -5, "destination_id": -6, "media_only": True},
+        ]
+    )
+    stream = io.StringIO()
+
+    code = await HeadlessRunner(job_file, ProgressWriter(stream), telegram).run()
+
+    assert code == EXIT_OK
+    telegram.forward_by_keyword.assert_awaited_once()
+    telegram.forward_media_files.assert_awaited_once()
+    telegram.disconnect.assert_not_called()  # Caller-owned client
+    events = _events(stream)
+    assert [e["event"] for e in events].count("progress") == 1
+    assert sorted(e["event"] for e in events if e["event"] != "progress") == [
+        "completed",
+        "completed",
+        "completed",
+        "started",
+        "started",
+        "started",
+        "summary",
+    ]
+    assert events[-1]["messages"] == 6
+
+
+@pytest.mark.asyncio
+async def test_failed_job_sets_the_exit_code_without_stopping_the_rest():
+    telegram = _telegram()
+    telegram.forward_by_keyword.side_effect = ValueError("Cannot find entity")
+    job_file = JobFile.parse(
+        [
+            {"source_id": -1, "destination_id": -2, "keyword": "x"},
+            {"source_id": -3, "destination_id": -4},
+        ]
+    )
+    stream = io.StringIO()
+
+    code = await HeadlessRunner(job_file, ProgressWriter(stream), telegram).run()
+
+    assert code == EXIT_JOBS_FAILED
+    failed = next(e for e in _events(stream) if e["event"] == "failed")
+    assert failed["error"] == "Cannot find entity"
+    assert _events(stream)[-1]["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_account_exits_without_running_jobs(monkeypatch):
+    monkeypatch.setattr("source.core.Headless.Credentials.get_all", list)
+    stream = io.StringIO()
+    job_file = JobFile.parse([{"source_id": -1, "destination_id": -2}])
+
+    code = await HeadlessRunner(job_file, ProgressWriter(stream)).run()
+
+    assert code == EXIT_NO_ACCOUNT
+    assert [(e["event"], e["message"]) for e in _events(stream)] == [
+        ("error", "No stored accounts")
+    ]
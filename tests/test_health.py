@@ -0,0 +1,22 @@
+from source import health
+
+
+def test_healthy_tree_passes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "resources").mkdir()
+    (tmp_path / "sessions").mkdir()
+    (tmp_path / "resources" / "forwardConfig.json").write_text("[]")
+
+    assert health.check_files() == []
+    assert health.main([]) == 0
+
+
+def test_missing_directory_and_corrupt_state_fail(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "resources").mkdir()
+    (tmp_path / "resources" / "credentials.json").write_text("{not json")
+
+    assert health.main([]) == 1
+    problems = capsys.readouterr().err.splitlines()
+    assert problems[0] == "sessions/ is missing"
+    assert problems[1].startswith("resources/credentials.json is unreadable")
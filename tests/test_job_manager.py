@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from source.service.JobManager import Job, JobManager
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_bounded_and_report_progress():
+    manager = JobManager(max_concurrent=1)
+    release = asyncio.Event()
+
+    async def slow(job):
+        job.report(1, 2)
+        await release.wait()
+        job.report(2)
+        return 2
+
+    async def quick(job):
+        return "done"
+
+    first = manager.submit("keyword", slow, {"keyword": "sale"})
+    second = manager.submit("history", quick)
+    await asyncio.sleep(0.01)
+
+    assert first.state == Job.RUNNING
+    assert second.state == Job.QUEUED  # waits for the only slot
+    assert first.to_dict()["progress"] == {"done": 1, "total": 2}
+
+    release.set()
+    await asyncio.wait_for(asyncio.gather(first.task, second.task), timeout=1)
+
+    assert first.state == Job.COMPLETED and first.result == 2
+    assert second.state == Job.COMPLETED and second.result == "done"
+    assert [job.id for job in manager.list()] == [second.id, first.id]
+
+
+@pytest.mark.asyncio
+async def test_cancel_and_failure_are_recorded_in_bounded_history():
+    manager = JobManager(history_size=2)
+
+    async def forever(job):
+        await asyncio.Event().wait()
+
+    async def broken(job):
+        raise ValueError("bad source")
+
+    running = manager.submit("media", forever)
+    failed = manager.submit("keyword", broken)
+    await asyncio.sleep(0.01)
+
+    assert await manager.cancel(running.id)
+    assert not await manager.cancel(running.id)
+    assert manager.get(running.id).state == Job.CANCELLED
+    assert manager.get(failed.id).error == "bad source"
+
+    third = manager.submit("keyword", broken)
+    await asyncio.wait_for(third.task, timeout=1)
+    # Only the two most recently finished jobs are kept.
+    assert manager.get(failed.id) is None
+    assert [job.id for job in manager.list()] == [third.id, running.id]
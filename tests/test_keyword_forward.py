@@ -156,3 +156,119 @@ async def test_keyword_forward_resumes_and_skips_already_forwarded(
 
     assert second_count == 0
     client.forward_messages.assert_not_awaited()
+
+
+class _FakeGlobalSearch:
+    """Serves pre-built pages, honouring a resume offset by message id."""
+
+    def __init__(self, pages):
+        self._pages = pages
+        self.offsets = []
+
+    async def iter_pages(self, _query, min_date=None, max_date=None, offset=None, **_):
+        self.offsets.append(offset)
+        for page in self._pages:
+            if offset:
+                page = [m for m in page if m.id < offset[2]]
+            if page:
+                last = page[-1]
+                yield page, (int(last.date.timestamp()), last.chat_id, last.id)
+
+
+def _make_global_message(message_id, chat_id, message_date):
+    message = _make_message(message_id, message_date)
+    message.chat_id = chat_id
+    return message
+
+
+@pytest.mark.asyncio
+async def test_global_keyword_dedups_routes_and_skips_destinations(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    date = datetime(2026, 3, 15, tzinfo=timezone.utc)
+    routed = _make_global_message(30, -1001, date)
+    fallback = _make_global_message(20, -1002, date)
+    in_destination = _make_global_message(10, -100222, date)
+    client = _IterMessagesClient([])
+    service = MessageService(client, MagicMock())
+    service.global_search = _FakeGlobalSearch(
+        [[routed, fallback], [fallback, in_destination]]
+    )
+
+    count = await service.forward_messages_by_global_keyword(
+        "guts", destination_id=-100222, routes={-1001: [-100333, -100444]}
+    )
+
+    assert count == 2
+    sent = [(c.args[0], c.args[1].id) for c in client.forward_messages.await_args_list]
+    assert sent == [(-100333, 30), (-100444, 30), (-100222, 20)]
+
+
+@pytest.mark.asyncio
+async def test_global_keyword_dry_run_counts_in_one_pass_and_rerun_stops_at_floor(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    pages = [
+        [
+            _make_global_message(3, -1001, datetime(2026, 3, 3, tzinfo=timezone.utc)),
+            _make_global_message(2, -1001, datetime(2026, 3, 2, tzinfo=timezone.utc)),
+        ],
+        [_make_global_message(1, -1002, datetime(2026, 3, 1, tzinfo=timezone.utc))],
+    ]
+    client = _IterMessagesClient([])
+    service = MessageService(client, MagicMock())
+    service.global_search = _FakeGlobalSearch(pages)
+
+    dry = await service.forward_messages_by_global_keyword(
+        "guts", destination_id=-100222, dry_run=True
+    )
+    assert dry == 3
+    client.forward_messages.assert_not_awaited()
+
+    assert (
+        await service.forward_messages_by_global_keyword("guts", destination_id=-100222)
+        == 3
+    )
+
+    # A second pass over the same results finds nothing newer than the floor.
+    client.forward_messages.reset_mock()
+    again = await service.forward_messages_by_global_keyword(
+        "guts", destination_id=-100222
+    )
+    assert again == 0
+    client.forward_messages.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_global_keyword_resumes_from_saved_offset_after_limit(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    date = datetime(2026, 3, 15, tzinfo=timezone.utc)
+    page = [_make_global_message(i, -1001, date) for i in (5, 4, 3)]
+    client = _IterMessagesClient([])
+    service = MessageService(client, MagicMock())
+    service.global_search = _FakeGlobalSearch([page])
+
+    first = await service.forward_messages_by_global_keyword(
+        "guts", destination_id=-100222, limit=2
+    )
+    second = await service.forward_messages_by_global_keyword(
+        "guts", destination_id=-100222
+    )
+
+    assert (first, second) == (2, 1)
+    assert service.global_search.offsets[1][2] == 4
+    sent = [c.args[1].id for c in client.forward_messages.await_args_list]
+    assert sent == [5, 4, 3]
@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.service.LiveSupervisor import LiveSupervisor
+
+
+@pytest.fixture
+def live_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    monkeypatch.setattr(
+        "source.service.ForwardConfigWatcher.FORWARD_CONFIG_FILE_PATH",
+        str(tmp_path / "forwardConfig.json"),
+    )
+    client = AsyncMock()
+    client.add_event_handler = MagicMock()
+    client.remove_event_handler = MagicMock()
+    client.get_messages = AsyncMock(return_value=[])
+    return client
+
+
+async def _wait_for(predicate, timeout=1.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.asyncio
+async def test_supervisor_reconnects_with_backoff_after_disconnect(live_client):
+    forever = asyncio.Event()
+
+    async def run_until_disconnected():
+        if live_client.run_until_disconnected.await_count == 1:
+            return  # first session drops straight away
+        await forever.wait()
+
+    live_client.run_until_disconnected = AsyncMock(side_effect=run_until_disconnected)
+    live_client.connect = AsyncMock(side_effect=[ConnectionError("down"), None])
+    supervisor = LiveSupervisor(
+        live_client, MagicMock(), console=MagicMock(), base_delay=0.001
+    )
+
+    assert await supervisor.start({-100111: [SimpleNamespace(destinationID=-1002)]})
+    assert not await supervisor.start({})  # already running
+    await _wait_for(lambda: supervisor.reconnects == 1)
+
+    assert supervisor.state == LiveSupervisor.RUNNING
+    assert live_client.connect.await_count == 2
+    assert supervisor.last_error == "down"
+    assert supervisor.status()["routes"][0]["destination_id"] == -1002
+
+    assert await supervisor.stop()
+    assert supervisor.state == LiveSupervisor.STOPPED
+
+
+@pytest.mark.asyncio
+async def test_stop_unregisters_handler_but_keeps_client_connected(live_client):
+    async def run_until_disconnected():
+        await asyncio.Event().wait()
+
+    live_client.run_until_disconnected = AsyncMock(side_effect=run_until_disconnected)
+    supervisor = LiveSupervisor(live_client, MagicMock(), console=MagicMock())
+
+    await supervisor.start({-100111: [SimpleNamespace(destinationID=-1002)]})
+    await _wait_for(lambda: supervisor.state == LiveSupervisor.RUNNING)
+    handler = live_client.add_event_handler.call_args.args[0]
+
+    assert await supervisor.stop()
+    assert not await supervisor.stop()
+    live_client.remove_event_handler.assert_called_once_with(handler)
+    live_client.disconnect.assert_not_called()
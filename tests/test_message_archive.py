@@ -0,0 +1,220 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from source.service.Forward import Forward
+from source.service.MessageArchive import MessageArchive
+from source.service.MessageQueue import MessageQueue
+from source.service.MessageService import MessageService
+
+SOURCE = -100111
+JUNE = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+
+def _message(message_id, day, text="", photo=None, grouped_id=None):
+    return SimpleNamespace(
+        id=message_id,
+        date=JUNE + timedelta(days=day),
+        chat_id=SOURCE,
+        grouped_id=grouped_id,
+        media=photo,
+        photo=photo,
+        file=SimpleNamespace(size=2048) if photo else None,
+        sender_id=42,
+        message=text,
+        text=text,
+        is_reply=False,
+    )
+
+
+class FakeChat:
+    """Serves `get_messages` from an in-memory history, recording each call."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.calls = []
+
+    async def get_messages(
+        self,
+        _source,
+        limit=None,
+        reverse=False,
+        min_id=0,
+        max_id=0,
+        offset_date=None,
+        ids=None,
+    ):
+        self.calls.append({"min_id": min_id, "max_id": max_id, "ids": ids})
+        if ids is not None:
+            by_id = {message.id: message for message in self.messages}
+            return [by_id.get(message_id) for message_id in ids]
+        found = [
+            message
+            for message in self.messages
+            if message.id > min_id
+            and (not max_id or message.id < max_id)
+            and (offset_date is None or message.date >= offset_date)
+        ]
+        return found[:limit]
+
+
+@pytest.fixture
+def history():
+    return [
+        _message(1, 0, "Über den Wolken", photo=object()),
+        _message(2, 1, "plain text"),
+        _message(3, 2, "album", photo=object(), grouped_id=7),
+        _message(4, 2, "", photo=object(), grouped_id=7),
+        _message(5, 9, "later über"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sync_is_incremental_and_plans_locally(tmp_path, history):
+    chat = FakeChat(history)
+    archive = MessageArchive(chat, folder=str(tmp_path), chunk_size=2)
+
+    assert await archive.sync(SOURCE) == 5
+    chat.calls.clear()
+    assert await archive.sync(SOURCE) == 0
+    assert [call["min_id"] for call in chat.calls] == [5]
+
+    history.append(_message(6, 10, "new"))
+    assert await archive.sync(SOURCE) == 1
+
+    assert archive.plan(SOURCE, media_only=True) == [1, 3, 4]
+    # Python's case folding, not SQLite's ASCII-only lower().
+    assert archive.plan(SOURCE, keyword="ÜBER") == [1, 5]
+    assert archive.count(SOURCE, after_id=1, end_datetime=JUNE + timedelta(days=3)) == 3
+
+
+@pytest.mark.asyncio
+async def test_earlier_start_date_backfills_only_the_missing_stretch(tmp_path, history):
+    chat = FakeChat(history)
+    archive = MessageArchive(chat, folder=str(tmp_path))
+
+    assert await archive.sync(SOURCE, JUNE + timedelta(days=2)) == 3
+    assert archive.plan(SOURCE) == [3, 4, 5]
+
+    chat.calls.clear()
+    assert await archive.sync(SOURCE, JUNE) == 2
+    assert chat.calls[0]["max_id"] == 3
+    assert archive.plan(SOURCE) == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_forward_counts_and_forwards_from_the_archive(
+    monkeypatch, tmp_path, history
+):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    chat = FakeChat(history)
+    chat.forward_messages = AsyncMock(
+        side_effect=lambda _dest, payload: MagicMock(id=1, chat_id=-100222)
+    )
+    archive = MessageArchive(chat, folder=str(tmp_path / "archive"))
+    config = SimpleNamespace(
+        destinationID=-100222,
+        start_date="2026-06-01",
+        end_date="2026-06-05",
+        timezone_name="UTC",
+        dry_run=True,
+        media_only=True,
+        keyword=None,
+    )
+
+    forward = Forward(chat, {SOURCE: config}, MessageQueue(delay=0), archive=archive)
+    assert await forward.history_handler() == 3
+
+    # The second pass plans from the archive: one empty incremental fetch,
+    # then only the three planned ids.
+    chat.calls.clear()
+    config.dry_run = False
+    queue = MessageQueue(delay=0)
+    forward = Forward(chat, {SOURCE: config}, queue, archive=archive)
+    assert await forward.history_handler() == 3
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+
+    assert [call["ids"] for call in chat.calls] == [None, [1, 3, 4]]
+    sent = [call.args[1] for call in chat.forward_messages.await_args_list]
+    assert sent[0].id == 1
+    assert [message.id for message in sent[1]] == [3, 4]  # One album call
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_supports_phrase_prefix_and_boolean_queries(
+    tmp_path,
+):
+    chat = FakeChat(
+        [
+            _message(1, 0, "Invoice for June attached"),
+            _message(2, 1, "the june invoices are late"),
+            _message(3, 2, "Receipt, not an invoice"),
+            _message(4, 3, "Über das Wetter"),
+        ]
+    )
+    archive = MessageArchive(chat, folder=str(tmp_path))
+    await archive.sync(SOURCE)
+
+    assert archive.search(SOURCE, "invoice") == [1, 3]
+    assert archive.search(SOURCE, "invoice*") == [1, 2, 3]
+    assert archive.search(SOURCE, '"invoice for june"') == [1]
+    assert archive.search(SOURCE, "invoice* NOT receipt") == [1, 2]
+    assert archive.search(SOURCE, "invoice* OR uber", limit=2) == [3, 4]
+    assert archive.search(SOURCE, "invoice*", after_id=1) == [2, 3]
+    with pytest.raises(ValueError):
+        archive.search(SOURCE, "invoice AND")
+
+
+@pytest.mark.asyncio
+async def test_index_is_rebuilt_for_archives_synced_without_it(tmp_path, history):
+    archive = MessageArchive(FakeChat(history), folder=str(tmp_path))
+    await archive.sync(SOURCE)
+    db = sqlite3.connect(archive.path(SOURCE))
+    db.execute("INSERT INTO messages_fts (messages_fts) VALUES ('delete-all')")
+    db.execute("PRAGMA user_version = 0")
+    db.commit()
+    db.close()
+
+    assert archive.search(SOURCE, "wolken") == [1]
+
+
+@pytest.mark.asyncio
+async def test_full_text_keyword_forward_searches_the_archive(
+    monkeypatch, tmp_path, history
+):
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    chat = FakeChat(history)
+    chat.forward_messages = AsyncMock()
+    chat.iter_messages = MagicMock()
+    archive = MessageArchive(chat, folder=str(tmp_path / "archive"))
+    service = MessageService(chat, MagicMock(), archive=archive)
+    run = {
+        "source_id": SOURCE,
+        "destination_id": -100222,
+        "keyword": "über OR album",
+        "start_date": "2026-06-01",
+        "end_date": "2026-06-30",
+        "full_text": True,
+    }
+
+    assert await service.forward_messages_by_keyword(**run, dry_run=True) == 3
+    assert await service.forward_messages_by_keyword(**run) == 3
+    assert await service.forward_messages_by_keyword(**run, dry_run=True) == 0
+
+    sent = [call.args[1].id for call in chat.forward_messages.await_args_list]
+    assert sent == [1, 3, 5]
+    chat.iter_messages.assert_not_called()  # No Telegram search= scan
@@ -0,0 +1,144 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from telethon import errors
+
+from source.service.MessageQueue import MessageQueue
+from source.service.MessageService import MessageService
+
+
+class _SenderFilterClient:
+    """Fake client that records the iter_messages kwargs it was called with."""
+
+    def __init__(self, messages):
+        self._messages = messages
+        self.iter_calls = []
+        self.delete_messages = AsyncMock()
+
+    async def iter_messages(self, entity, **kwargs):
+        self.iter_calls.append((entity, kwargs))
+        offset_id = kwargs.get("offset_id")
+        for message in self._messages:
+            if not offset_id or message.id < offset_id:
+                yield message
+
+
+@pytest.mark.asyncio
+async def test_delete_messages_filters_sender_server_side_and_batches():
+    client = _SenderFilterClient([MagicMock(id=i) for i in range(1, 251)])
+    service = MessageService(client, MagicMock())
+    dialog = MagicMock(id=-100111, title="Group")
+
+    deleted = await service.delete_messages_from_dialog(dialog)
+
+    assert deleted == 250
+    assert client.iter_calls == [(-100111, {"from_user": "me"})]
+    batch_sizes = [len(call.args[1]) for call in client.delete_messages.await_args_list]
+    assert batch_sizes == [100, 100, 50]
+    assert client.delete_messages.await_args_list[0].args[1][:3] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_delete_messages_queues_one_job_per_batch_and_waits_for_them():
+    client = _SenderFilterClient([MagicMock(id=i) for i in range(1, 102)])
+    queue = MessageQueue(delay=0)
+    queue.put = AsyncMock(wraps=queue.put)
+    service = MessageService(client, MagicMock(), queue=queue)
+
+    deleted = await service.delete_messages_from_dialog(MagicMock(id=-100111))
+    await queue.stop()
+
+    assert deleted == 101
+    assert queue.put.await_count == 2
+    # Returns only once the queued deletes have run.
+    assert client.delete_messages.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_retry_after_a_flood_wait_resumes_where_it_stopped():
+    client = _SenderFilterClient([MagicMock(id=i) for i in range(250, 0, -1)])
+    client.delete_messages = AsyncMock(
+        side_effect=[None, errors.FloodWaitError(request=None, capture=0), None, None]
+    )
+    service = MessageService(client, MagicMock())
+    dialog = MagicMock(id=-100111)
+    state = {}
+
+    with pytest.raises(errors.FloodWaitError):
+        await service.delete_messages_from_dialog(dialog, state)
+
+    assert await service.delete_messages_from_dialog(dialog, state) == 250
+
+    assert client.iter_calls[1] == (-100111, {"from_user": "me", "offset_id": 1})
+    batches = [call.args[1] for call in client.delete_messages.await_args_list]
+    # The failed second batch goes out again; the first is not repeated.
+    assert [b[0] for b in batches] == [250, 150, 50, 150]
+
+
+@pytest.mark.asyncio
+async def test_delete_retry_leaves_batches_still_queued_alone():
+    class FloodingClient(_SenderFilterClient):
+        async def iter_messages(self, entity, **kwargs):
+            async for message in super().iter_messages(entity, **kwargs):
+                yield message
+            if len(self.iter_calls) == 1:
+                raise errors.FloodWaitError(request=None, capture=0)
+
+    client = FloodingClient([MagicMock(id=i) for i in range(200, 0, -1)])
+    queued = []
+    queue = MagicMock(put=AsyncMock(side_effect=queued.append))
+    service = MessageService(client, MagicMock(), queue=queue)
+    dialog = MagicMock(id=-100111)
+    state = {}
+
+    with pytest.raises(errors.FloodWaitError):
+        await service.delete_messages_from_dialog(dialog, state)
+    assert len(queued) == 2  # Neither batch has run yet
+
+    retry = asyncio.create_task(service.delete_messages_from_dialog(dialog, state))
+    await asyncio.sleep(0)
+    for func, args in queued:
+        await func(*args)
+
+    assert await retry == 200
+    assert client.delete_messages.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_process_user_messages_filters_sender_server_side():
+    matches = [MagicMock(id=i) for i in (9, 7, 4)]
+    client = _SenderFilterClient(matches)
+    service = MessageService(client, MagicMock())
+    service._process_message = AsyncMock()
+    user = MagicMock(id=42, access_hash=None)
+
+    count = await service.process_user_messages(MagicMock(id=-100111), user, limit=3)
+
+    # The limit is passed straight to the server-side search, so it counts
+    # matches rather than messages scanned.
+    assert count == 3
+    assert client.iter_calls == [(-100111, {"from_user": 42, "limit": 3})]
+    assert service._process_message.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_process_user_messages_global_caps_matches_per_chat():
+    messages = [
+        MagicMock(id=1, chat_id=-1001, is_private=False),
+        MagicMock(id=2, chat_id=-1001, is_private=False),
+        MagicMock(id=3, chat_id=-1002, is_private=False),
+        MagicMock(id=4, chat_id=555, is_private=True),
+    ]
+    client = _SenderFilterClient(messages)
+    service = MessageService(client, MagicMock())
+    service._process_message = AsyncMock()
+
+    per_chat = await service.process_user_messages_global(
+        MagicMock(id=42, access_hash=None), limit=1
+    )
+
+    assert client.iter_calls[0][0] is None  # global search
+    assert per_chat == {-1001: 1, -1002: 1}
+    processed = [call.args[0].id for call in service._process_message.await_args_list]
+    assert processed == [1, 3]
@@ -0,0 +1,109 @@
+import asyncio
+import gc
+from unittest.mock import AsyncMock
+
+import pytest
+from telethon import errors
+
+from source.service.MessageForwardService import MessageForwardService
+from source.service.MessageQueue import MessageQueue
+from source.service.MetricsServer import MetricsServer
+from source.utils.Metrics import (
+    FLOOD_WAITS,
+    MESSAGES_FAILED,
+    MESSAGES_FORWARDED,
+    QUEUE_DEPTH,
+    SEND_LATENCY,
+    MetricsRegistry,
+)
+
+
+def test_render_uses_prometheus_text_format():
+    registry = MetricsRegistry()
+    sent = registry.counter("sent_total", "Messages sent.", ("path",))
+    depth = registry.gauge("depth", "Queue depth.")
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+    sent.labels("live").inc(3)
+    depth.set_function(lambda: 7)
+    latency.observe(0.1)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE sent_total counter" in lines
+    assert 'sent_total{path="live"} 3' in lines
+    assert "depth 7" in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 5.6" in lines
+    assert "latency_seconds_count 3" in lines
+
+
+def test_queue_depth_sums_every_live_queue():
+    before = QUEUE_DEPTH.value
+    first, second = MessageQueue(), MessageQueue()
+    first.queue.put_nowait((None, ()))
+    first.queue.put_nowait((None, ()))
+    second.queue.put_nowait((None, ()))
+    assert QUEUE_DEPTH.value == before + 3
+
+    del first
+    gc.collect()
+    assert QUEUE_DEPTH.value == before + 1
+
+
+def test_registry_returns_existing_metric_and_rejects_type_clash():
+    registry = MetricsRegistry()
+    counter = registry.counter("things_total", "Things.")
+    assert registry.counter("things_total", "Things.") is counter
+    with pytest.raises(ValueError):
+        registry.gauge("things_total", "Things.")
+    with pytest.raises(ValueError):
+        registry.counter("labelled_total", "Labelled.", ("a",)).labels("x", "y")
+
+
+@pytest.mark.asyncio
+async def test_send_records_forwarded_latency_and_flood_waits():
+    client = AsyncMock()
+    service = MessageForwardService(client)
+    forwarded = MESSAGES_FORWARDED.labels("forward").value
+    observed = SEND_LATENCY.labels("forward").count
+
+    await service._send_album(1, [object(), object(), object()])
+    assert MESSAGES_FORWARDED.labels("forward").value == forwarded + 3
+    assert SEND_LATENCY.labels("forward").count == observed + 1
+
+    failed = MESSAGES_FAILED.labels("forward").value
+    flood_waits = FLOOD_WAITS.labels("forward").value
+    client.forward_messages.side_effect = errors.FloodWaitError(None, capture=5)
+    with pytest.raises(errors.FloodWaitError):
+        await service._send_message(1, object())
+    assert MESSAGES_FAILED.labels("forward").value == failed + 1
+    assert FLOOD_WAITS.labels("forward").value == flood_waits + 1
+    assert MESSAGES_FORWARDED.labels("forward").value == forwarded + 3
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_answers_scrapes():
+    registry = MetricsRegistry()
+    registry.counter("scraped_total", "Scrapes.").inc()
+    server = MetricsServer(0, registry=registry)
+    await server.start()
+    port = server._server.sockets[0].getsockname()[1]
+
+    async def fetch(path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        return response.decode()
+
+    try:
+        response = await fetch("/metrics")
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert "scraped_total 1" in response
+        assert (await fetch("/")).startswith("HTTP/1.1 404")
+    finally:
+        await server.stop()
@@ -0,0 +1,55 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+from rich.console import Console
+
+from source.utils.ProgressDisplay import ProgressDisplay
+
+
+def _terminal():
+    output = io.StringIO()
+    return Console(file=output, force_terminal=True, width=100), output
+
+
+@pytest.mark.asyncio
+async def test_counters_render_only_on_refresh():
+    console, output = _terminal()
+    display = ProgressDisplay(console, refresh_per_second=0.001)
+    queue = SimpleNamespace(qsize=lambda: 3, current_task="message(chat=-1, id=9)")
+
+    first = display.add("-100111", 2000, queue)
+    second = display.add("-100333 files", 10, queue)
+    display.render()
+    drawn = len(output.getvalue())
+
+    for _ in range(1000):
+        first.advance()
+    second.advance(4)
+    assert len(output.getvalue()) == drawn  # Counting writes nothing
+
+    display.render()
+    frame = output.getvalue()[drawn:]
+    assert "-100111" in frame and "1000/2000" in frame
+    assert "-100333 files" in frame and "4/10" in frame
+    assert "Queue: 3 pending | Current: message(chat=-1, id=9)" in frame
+
+    display.remove(first)
+    assert display._render_task is not None
+    display.remove(second)
+    assert display._render_task is None
+
+
+@pytest.mark.asyncio
+async def test_nothing_renders_off_a_terminal_or_in_headless_runs(monkeypatch):
+    plain = Console(file=io.StringIO())
+    bar = ProgressDisplay(plain).add("-100111", 5)
+    bar.advance()
+    assert bar.done == 1
+
+    console, output = _terminal()
+    monkeypatch.setattr("source.utils.Console.Terminal.live_progress", False)
+    display = ProgressDisplay(console)
+    display.add("-100111", 5)
+    assert display._render_task is None
+    assert output.getvalue() == ""
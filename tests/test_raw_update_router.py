@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from telethon import events
+from telethon.tl import types
+
+from source.service.Forward import Forward
+from source.service.MessageQueue import MessageQueue
+from source.service.RawUpdateRouter import MESSAGE_UPDATE_TYPES, RawUpdateRouter
+
+
+def _channel_update(channel_id, message_id, grouped_id=None, text="hi"):
+    message = types.Message(
+        id=message_id,
+        peer_id=types.PeerChannel(channel_id),
+        date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        message=text,
+        grouped_id=grouped_id,
+    )
+    update = types.UpdateNewChannelMessage(message=message, pts=1, pts_count=1)
+    update._entities = {}
+    return update
+
+
+def _client():
+    return SimpleNamespace(_self_id=1, _mb_entity_cache={})
+
+
+def test_chat_id_of_matches_telethon_marked_ids():
+    assert RawUpdateRouter.chat_id_of(_channel_update(1234, 1)) == -1000000001234
+    short = types.UpdateShortChatMessage(
+        id=1, from_id=5, chat_id=77, message="x", pts=1, pts_count=1, date=None
+    )
+    assert RawUpdateRouter.chat_id_of(short) == -77
+
+
+@pytest.mark.asyncio
+async def test_handle_drops_unrouted_chats_and_dispatches_routed_ones():
+    on_message = AsyncMock()
+    router = RawUpdateRouter(
+        _client(), on_message, AsyncMock(), source_ids=frozenset({-1000000000111})
+    )
+
+    await router.handle(_channel_update(222, 1))
+    await router.handle(_channel_update(111, 2))
+
+    on_message.assert_awaited_once()
+    chat_id, message = on_message.await_args.args
+    assert chat_id == -1000000000111
+    assert message.id == 2
+    assert message.chat_id == -1000000000111
+
+
+@pytest.mark.asyncio
+async def test_album_items_are_buffered_and_delivered_together():
+    on_album = AsyncMock()
+    router = RawUpdateRouter(
+        _client(),
+        AsyncMock(),
+        on_album,
+        source_ids=frozenset({-1000000000111}),
+        album_delay=0.01,
+    )
+
+    await router.handle(_channel_update(111, 11, grouped_id=9))
+    await router.handle(_channel_update(111, 10, grouped_id=9))
+    await asyncio.sleep(0.05)
+    await router.flush()
+
+    on_album.assert_awaited_once()
+    chat_id, messages = on_album.await_args.args
+    assert chat_id == -1000000000111
+    assert [m.id for m in messages] == [10, 11]
+
+
+@pytest.mark.asyncio
+async def test_forward_registers_one_raw_handler_over_source_ids(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    client = MagicMock()
+    client._self_id = 1
+    client._mb_entity_cache = {}
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, msg: MagicMock(id=msg.id + 1000, chat_id=dest)
+    )
+    queue = MessageQueue(delay=0)
+    forward = Forward(
+        client,
+        {-1000000000111: SimpleNamespace(destinationID=-1000000000201)},
+        queue,
+    )
+    forward.add_events()
+
+    handler, builder = client.add_event_handler.call_args.args
+    assert client.add_event_handler.call_count == 1
+    assert isinstance(builder, events.Raw)
+    assert builder.types == MESSAGE_UPDATE_TYPES
+    assert forward.raw_router.source_ids == frozenset({-1000000000111})
+
+    await handler(_channel_update(111, 5))
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+
+    assert client.forward_messages.await_count == 1
+    assert forward.history.get_mapping(-1000000000111, 5, -1000000000201) == 1005
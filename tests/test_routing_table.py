@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from telethon.tl import types
+
+from source.service.Forward import Forward
+from source.service.MessageQueue import MessageQueue
+from source.service.RoutingTable import RoutingTable
+
+
+def _config(destination_id, **kwargs):
+    return SimpleNamespace(destinationID=destination_id, **kwargs)
+
+
+def test_compile_fans_out_and_drops_disabled_and_duplicate_routes():
+    table = RoutingTable.compile(
+        {
+            -100111: [
+                _config(-100201),
+                _config(-100202, media_only=True),
+                _config(-100201),
+                _config(-100203, enabled=False),
+            ],
+            -100112: _config(-100204),
+            -100113: [_config(-100205, enabled=False)],
+        }
+    )
+
+    assert table.source_ids == frozenset({-100111, -100112})
+    assert [r.destination_id for r in table.routes_for(-100111)] == [
+        -100201,
+        -100202,
+    ]
+    assert table.routes_for(-100113) == ()
+
+
+def test_route_filters_apply_per_route():
+    table = RoutingTable.compile(
+        {-100111: [_config(-100201, media_only=True), _config(-100202, keyword="Sale")]}
+    )
+    media_route, keyword_route = table.routes_for(-100111)
+    text_message = MagicMock(media=None, text="big SALE today")
+
+    assert media_route.accepts(text_message) is False
+    assert keyword_route.accepts(text_message) is True
+
+
+@pytest.mark.asyncio
+async def test_live_messages_go_to_every_route_and_are_counted(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "source.model.History.HISTORY_FILE_PATH", str(tmp_path / "history.json")
+    )
+    monkeypatch.setattr(
+        "source.service.ForwardProgress.FORWARD_PROGRESS_FILE_PATH",
+        str(tmp_path / "forward_progress.json"),
+    )
+    client = MagicMock()
+    client._self_id = 1
+    client._mb_entity_cache = {}
+    client.forward_messages = AsyncMock(
+        side_effect=lambda dest, msg: MagicMock(id=msg.id + 1000, chat_id=dest)
+    )
+    queue = MessageQueue(delay=0)
+    forward = Forward(
+        client,
+        {-1000000000111: [_config(-100201), _config(-100202, media_only=True)]},
+        queue,
+    )
+    forward.add_events()
+
+    message = types.Message(
+        id=5,
+        peer_id=types.PeerChannel(111),
+        date=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        message="hi",
+    )
+    update = types.UpdateNewChannelMessage(message=message, pts=1, pts_count=1)
+    update._entities = {}
+    await forward.raw_router.handle(update)
+    await asyncio.wait_for(queue.queue.join(), timeout=1)
+    await queue.stop()
+
+    assert [c.args[0] for c in client.forward_messages.await_args_list] == [-100201]
+    stats = {s["destination_id"]: s for s in forward.route_stats()}
+    assert stats[-100201]["delivered"] == 1
+    assert stats[-100202]["skipped"] == 1
+    assert forward.history.get_mapping(-1000000000111, 5, -100201) == 1005
@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from source.service.JobManager import JobManager
+from source.service.StatusStream import StatusStream
+
+
+def _telegram():
+    telegram = MagicMock(status="Idle")
+    telegram.queue.processed = 0
+    telegram.get_queue_status.return_value = {"queue_length": 3, "active_task": None}
+    telegram.live_supervisor.status.return_value = {"state": "running"}
+    return telegram
+
+
+@pytest.mark.asyncio
+async def test_one_snapshot_per_tick_is_shared_by_all_subscribers():
+    telegram = _telegram()
+    stream = StatusStream(lambda: telegram, JobManager(), interval=0.01)
+
+    first, second = stream.subscribe(), stream.subscribe()
+    assert (await first.get())["type"] == "snapshot"
+    await second.get()
+    calls_before = telegram.get_queue_status.call_count
+
+    tick_one = await asyncio.wait_for(first.get(), timeout=1)
+    tick_two = await asyncio.wait_for(second.get(), timeout=1)
+
+    assert tick_one is tick_two  # built once, fanned out
+    assert tick_one["queue_size"] == 3
+    assert tick_one["live"] == {"state": "running"}
+    assert telegram.get_queue_status.call_count - calls_before <= 2
+
+    stream.unsubscribe(first)
+    stream.unsubscribe(second)
+
+
+@pytest.mark.asyncio
+async def test_ticks_carry_only_jobs_whose_progress_changed():
+    jobs = JobManager()
+    release = asyncio.Event()
+
+    async def operation(job):
+        job.report(1, 10)
+        await release.wait()
+
+    idle = jobs.submit("history", operation)
+    await asyncio.sleep(0)
+    stream = StatusStream(lambda: None, jobs)
+
+    assert [j["id"] for j in stream.snapshot(full=True)["jobs"]] == [idle.id]
+    assert [j["id"] for j in stream.snapshot()["jobs"]] == [idle.id]
+    assert stream.snapshot()["jobs"] == []
+
+    idle.report(5)
+    assert stream.snapshot()["jobs"][0]["progress"] == {"done": 5, "total": 10}
+
+    release.set()
+    await idle.task
+
+
+@pytest.mark.asyncio
+async def test_a_failing_snapshot_skips_a_tick_without_ending_the_stream():
+    telegram = _telegram()
+    stream = StatusStream(lambda: telegram, JobManager(), interval=0.01)
+    mailbox = stream.subscribe()
+    await mailbox.get()
+
+    telegram.live_supervisor.status.side_effect = [RuntimeError("gone"), {}]
+    tick = await asyncio.wait_for(mailbox.get(), timeout=1)
+
+    assert tick["type"] == "tick" and tick["live"] == {}
+    assert not stream._task.done()
+    stream.unsubscribe(mailbox)
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from source.service.ForwardConfigRepository import ForwardConfigRepository
+from source.service.MessageQueue import MessageQueue
+from source.service.SyncScheduler import SyncScheduler
+from source.utils.Cron import CronExpression
+
+NOW = datetime(2026, 10, 19, 2, 59, 30, tzinfo=timezone.utc)
+
+
+def test_cron_next_after_respects_fields_and_timezone():
+    berlin = ZoneInfo("Europe/Berlin")
+    moment = datetime(2026, 10, 19, 1, 2, tzinfo=berlin)  # A Monday
+
+    assert CronExpression("*/15 * * * *").next_after(moment) == moment.replace(
+        minute=15
+    )
+    assert CronExpression("0 3 * * *").next_after(moment) == moment.replace(
+        hour=3, minute=0
+    )
+    assert CronExpression("@weekly").next_after(moment) == datetime(
+        2026, 10, 25, tzinfo=berlin
+    )
+    # Both day fields restricted: the 13th or any Friday, whichever is first.
+    assert CronExpression("0 0 13 * 5").next_after(moment) == datetime(
+        2026, 10, 23, tzinfo=berlin
+    )
+
+
+@pytest.mark.parametrize(
+    "expression", ["* * *", "61 * * * *", "*/0 * * * *", "a * * * *"]
+)
+def test_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronExpression(expression)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    path = tmp_path / "forwardConfig.json"
+
+    def write(*configs):
+        path.write_text(json.dumps(list(configs)))
+
+    write(
+        {"sourceID": -1001, "destinationID": -2001, "schedule": "0 3 * * *"},
+        # Second route of the same source: its own cursor and sync.
+        {"sourceID": -1001, "destinationID": -2002, "schedule": "0 4 * * *"},
+        {"sourceID": -1003, "destinationID": -2003},
+    )
+    repo = ForwardConfigRepository(str(path))
+    repo.write = write
+    return repo
+
+
+def _scheduler(repository, run_sync, jitter=0.0):
+    return SyncScheduler(
+        run_sync,
+        console=MagicMock(),
+        repository=repository,
+        jitter=jitter,
+        max_backlog=5,
+        rng=random.Random(7),
+    )
+
+
+@pytest.mark.asyncio
+async def test_due_sync_resumes_the_history_cursor_with_a_backlog_cap(repository):
+    run_sync = AsyncMock(return_value=4)
+    scheduler = _scheduler(repository, run_sync, jitter=30.0)
+
+    scheduler.refresh(NOW)
+    sync = scheduler.syncs[(-1001, -2001)]
+    assert list(scheduler.syncs) == [(-1001, -2001), (-1001, -2002)]
+    fire = datetime(2026, 10, 19, 3, tzinfo=timezone.utc)
+    assert fire <= sync.next_run <= fire + timedelta(seconds=30)
+
+    assert scheduler.tick(NOW) == []
+    started = scheduler.tick(fire + timedelta(seconds=30))
+    assert len(started) == 1  # -2002 fires at 4:00
+    await asyncio.gather(*started)
+
+    config = run_sync.await_args.args[0]
+    assert config["destination_id"] == -2001
+    assert config["start_date"] is None and config["dry_run"] is False
+    assert config["max_backlog"] == 5
+    assert sync.last_result == 4
+    assert sync.next_run > fire + timedelta(days=1) - timedelta(seconds=1)
+
+    await asyncio.gather(*scheduler.tick(fire + timedelta(hours=1, seconds=30)))
+    assert run_sync.await_args.args[0]["destination_id"] == -2002
+
+
+@pytest.mark.asyncio
+async def test_running_sync_skips_the_next_occurrence(repository):
+    release = asyncio.Event()
+
+    async def slow(config):
+        await release.wait()
+        return 0
+
+    run_sync = AsyncMock(side_effect=slow)
+    scheduler = _scheduler(repository, run_sync)
+    scheduler.refresh(NOW)
+
+    day = timedelta(days=1)
+    first = scheduler.tick(NOW + day)
+    await asyncio.sleep(0)
+    assert scheduler.tick(NOW + 2 * day) == []
+
+    sync = scheduler.syncs[(-1001, -2001)]
+    assert sync.skipped == 1 and run_sync.await_count == 2
+    release.set()
+    await asyncio.gather(*first)
+
+
+def test_schedule_edits_replan_and_invalid_ones_are_ignored(repository):
+    scheduler = _scheduler(repository, AsyncMock())
+    scheduler.refresh(NOW)
+
+    repository.write(
+        {"sourceID": -1001, "destinationID": -2001, "schedule": "30 3 * * *"},
+        {"sourceID": -1003, "destinationID": -2003, "schedule": "every night"},
+    )
+    repository._signature = None  # Rewritten within the mtime resolution
+    scheduler.refresh(NOW)
+
+    assert list(scheduler.syncs) == [(-1001, -2001)]
+    assert scheduler.syncs[(-1001, -2001)].next_run == datetime(
+        2026, 10, 19, 3, 30, tzinfo=timezone.utc
+    )
+
+
+@pytest.mark.asyncio
+async def test_wait_below_holds_bulk_producers_until_the_queue_drains():
+    queue = MessageQueue(delay=0)
+    sent = []
+
+    async def send(item):
+        sent.append(item)
+
+    for i in range(3):
+        await queue.queue.put((send, (i,)))
+
+    waiter = asyncio.create_task(queue.wait_below(2))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+
+    await queue.start()
+    await asyncio.wait_for(waiter, timeout=1)
+    await queue.stop()
+    assert sent
@@ -9,19 +9,38 @@ from datetime import datetime
 # Add the parent directory to Python path so we can import from source
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from dotenv import load_dotenv
-from fastapi import Depends, FastAPI, Header, HTTPException
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from pydantic import BaseModel
 from starlette.requests import Request
 
-from source.core.Telegram import Telegram
 from source.model.Credentials import Credentials
 from source.model.ForwardConfig import ForwardConfig
+from source.service.DialogCache import DialogCache
+from source.service.ForwardConfigRepository import ForwardConfigRepository
+from source.service.JobManager import JobManager
+from source.service.MessageArchive import MessageArchive
+from source.service.RoutingTable import RoutingTable
+from source.service.StatusStream import StatusStream
+from source.utils.Cron import CronExpression
+from source.utils.Metrics import REGISTRY, MetricsRegistry
+
+if TYPE_CHECKING:
+    from source.core.Telegram import Telegram
 
 # Docker Compose substitutes .env into the container's real environment, but
 # a plain `python web/app.py` run never reads .env on its own. Load it here
@@ -46,6 +65,17 @@ async def verify_api_key(x_api_key: Optional[str] = Header(default=None)) -> Non
         raise HTTPException(status_code=401, detail="Invalid or missing API key")
 
 
+async def verify_metrics_key(
+    x_api_key: Optional[str] = Header(default=None),
+    authorization: Optional[str] = Header(default=None),
+) -> None:
+    # Prometheus sends credentials as `Authorization: Bearer ...`
+    # (`authorization.credentials` in the scrape config).
+    if not x_api_key and authorization and authorization.startswith("Bearer "):
+        x_api_key = authorization.removeprefix("Bearer ")
+    await verify_api_key(x_api_key)
+
+
 # Pydantic models for API
 class ForwardConfigCreate(BaseModel):
     source_id: int
@@ -53,6 +83,10 @@ class ForwardConfigCreate(BaseModel):
     destination_id: int
     destination_name: str
     enabled: bool = True
+    # Cron expression for recurring incremental history syncs (optional).
+    schedule: Optional[str] = None
+    # Skip content the destination already received from any source.
+    dedup: bool = False
 
 
 class StatusResponse(BaseModel):
@@ -61,6 +95,9 @@ class StatusResponse(BaseModel):
     current_task: Optional[str]
     uptime: str
     active_forwards: int
+    # Live forwarding run by this process: state, uptime, reconnects and
+    # per-route throughput (see LiveSupervisor.status).
+    live: Optional[Dict[str, Any]] = None
 
 
 class ChatInfo(BaseModel):
@@ -70,20 +107,75 @@ class ChatInfo(BaseModel):
     username: Optional[str]
 
 
+class ChatPage(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    items: List[ChatInfo]
+
+
 class KeywordForwardRequest(BaseModel):
+    source_id: Optional[int] = None
+    destination_id: Optional[int] = None
+    # Search every chat at once instead of one source (keyword required).
+    global_search: bool = False
+    # Global search only: route matches by the saved forward configurations.
+    use_saved_routes: bool = False
+    channels_only: bool = False
+    keyword: Optional[str] = None
+    # One source only: treat keyword as an FTS5 query over the local archive.
+    full_text: bool = False
+    limit: int = 500
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    timezone_name: str = "UTC"
+    dry_run: bool = False
+
+
+class HistoryForwardRequest(BaseModel):
     source_id: int
     destination_id: int
     keyword: Optional[str] = None
-    limit: int = 500
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     timezone_name: str = "UTC"
     dry_run: bool = False
+    # Skip content the destination already received from any source.
+    dedup: bool = False
+
+
+class DeadLetterRequest(BaseModel):
+    # None means every entry (in `state`, for a purge).
+    ids: Optional[List[int]] = None
+    state: Optional[str] = None
 
 
 # Global state
-telegram_client: Optional[Telegram] = None
+telegram_client: Optional["Telegram"] = None
 app_start_time = datetime.now()
+job_manager = JobManager()
+
+# Parsed forwardConfig.json, re-read only when the file changes; all edits
+# go through it so concurrent requests can't overwrite each other.
+forward_configs = ForwardConfigRepository()
+
+
+def _active_forward_count() -> int:
+    return forward_configs.snapshot().enabled_count
+
+
+def _uptime() -> str:
+    return str(datetime.now() - app_start_time).split(".")[0]
+
+
+status_stream = StatusStream(
+    lambda: telegram_client,
+    job_manager,
+    extra_fields=lambda: {
+        "uptime": _uptime(),
+        "active_forwards": _active_forward_count(),
+    },
+)
 
 
 @asynccontextmanager
@@ -98,6 +190,10 @@ async def lifespan(app: FastAPI):
     try:
         credentials_list = Credentials.get_all()
         if credentials_list:
+            # Telethon and the forwarding services load here rather than at
+            # import, so importing the app (health probes, tests) stays cheap.
+            from source.core.Telegram import Telegram
+
             telegram_client = await Telegram.create(credentials_list[0])
         else:
             print(
@@ -110,7 +206,8 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    # Shutdown
+    # Shutdown (Telegram.disconnect stops live forwarding first)
+    await job_manager.shutdown()
     if telegram_client:
         await telegram_client.disconnect()
 
@@ -142,13 +239,18 @@ async def home(request: Request):
     return templates.TemplateResponse(request, "index.html")
 
 
+@app.get("/health")
+async def health():
+    """Liveness probe; unauthenticated and reveals nothing about the bot."""
+    return {"status": "ok"}
+
+
 @app.get(
     "/api/status", response_model=StatusResponse, dependencies=[Depends(verify_api_key)]
 )
 async def get_status():
     """Get bot status and queue metrics."""
-    uptime_delta = datetime.now() - app_start_time
-    uptime = str(uptime_delta).split(".")[0]
+    uptime = _uptime()
 
     if not telegram_client:
         return StatusResponse(
@@ -160,41 +262,96 @@ async def get_status():
         )
 
     queue_status = telegram_client.get_queue_status()
-    forwards = (
-        ForwardConfig.read() if os.path.exists("resources/forwardConfig.json") else []
-    )
-    active_forwards = len([f for f in forwards if getattr(f, "enabled", True)])
 
     return StatusResponse(
         status=getattr(telegram_client, "status", "Idle"),
         queue_size=queue_status.get("queue_length", 0),
         current_task=queue_status.get("active_task"),
         uptime=uptime,
-        active_forwards=active_forwards,
+        active_forwards=_active_forward_count(),
+        live=telegram_client.live_supervisor.status(),
     )
 
 
 @app.get(
-    "/api/chats", response_model=List[ChatInfo], dependencies=[Depends(verify_api_key)]
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(verify_metrics_key)],
 )
-async def get_chats():
-    """Get available chats."""
+async def metrics():
+    """Pipeline metrics in the Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type=MetricsRegistry.CONTENT_TYPE)
+
+
+@app.websocket("/api/stream")
+async def stream_status(websocket: WebSocket, api_key: Optional[str] = None):
+    """Push status, queue, throughput, live and job progress every tick.
+
+    Browsers can't set headers on a WebSocket, so the API key comes in the
+    `api_key` query parameter instead of X-API-Key.
+    """
+    if not API_KEY or not api_key or not secrets.compare_digest(api_key, API_KEY):
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    mailbox = status_stream.subscribe()
+    try:
+        while True:
+            await websocket.send_json(await mailbox.get())
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        status_stream.unsubscribe(mailbox)
+
+
+@app.get("/api/chats", response_model=ChatPage, dependencies=[Depends(verify_api_key)])
+async def get_chats(
+    request: Request,
+    response: Response,
+    type: Optional[str] = None,
+    q: Optional[str] = None,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    refresh: bool = False,
+):
+    """Get available chats, a page at a time, from the dialog cache.
+
+    Filters by chat type (Channel/Group/User) and a title/username substring.
+    Pass `refresh=true` to refetch from Telegram instead of waiting for the
+    cache to expire. Responds 304 when `If-None-Match` matches the ETag."""
     try:
         if not telegram_client:
             raise HTTPException(
                 status_code=503, detail="Telegram client not initialized"
             )
 
-        chats = await telegram_client.list_chats()
-        return [
-            ChatInfo(
-                id=chat.id,
-                title=chat.title or f"Chat {chat.id}",
-                type=chat.type or "Unknown",
-                username=getattr(chat, "username", None),
-            )
-            for chat in chats
-        ]
+        cache = telegram_client.dialog_cache
+        chats = await cache.get(refresh=refresh)
+        # The URL carries the filters, so the content digest alone identifies
+        # this representation.
+        headers = {"ETag": cache.etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == cache.etag:
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+        selected = DialogCache.select(chats, type, q)
+        return ChatPage(
+            total=len(selected),
+            offset=offset,
+            limit=limit,
+            items=[
+                ChatInfo(
+                    id=chat.id,
+                    title=chat.title or f"Chat {chat.id}",
+                    type=chat.type or "Unknown",
+                    username=chat.username,
+                )
+                for chat in selected[offset : offset + limit]
+            ],
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -205,18 +362,16 @@ async def get_chats():
 async def get_forwards():
     """Get forwarding configurations."""
     try:
-        forwards = (
-            ForwardConfig.read()
-            if os.path.exists("resources/forwardConfig.json")
-            else []
-        )
+        forwards = forward_configs.snapshot().configs
         return [
             {
                 "source_id": f.sourceID,
                 "source_name": f.sourceName,
                 "destination_id": f.destinationID,
                 "destination_name": f.destinationName,
-                "enabled": getattr(f, "enabled", True),
+                "enabled": f.enabled,
+                "schedule": f.schedule,
+                "dedup": f.dedup,
             }
             for f in forwards
         ]
@@ -224,30 +379,42 @@ async def get_forwards():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _notify_config_changed() -> None:
+    """Apply a config edit to live forwarding running in this process right
+    away; live forwarding in another process picks it up by polling."""
+    if telegram_client:
+        telegram_client.reload_forward_config()
+
+
 @app.post("/api/forwards", dependencies=[Depends(verify_api_key)])
 async def create_forward(config: ForwardConfigCreate):
     """Create a new forwarding configuration."""
     try:
-        # Read existing configs
-        existing = (
-            ForwardConfig.read()
-            if os.path.exists("resources/forwardConfig.json")
-            else []
-        )
-
-        # Create new config
+        if config.schedule:
+            try:
+                CronExpression(config.schedule)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
         new_config = ForwardConfig(
             sourceID=config.source_id,
             sourceName=config.source_name,
             destinationID=config.destination_id,
             destinationName=config.destination_name,
+            enabled=config.enabled,
+            schedule=config.schedule,
+            dedup=config.dedup,
         )
+        snapshot = await forward_configs.update(
+            lambda existing: existing.append(new_config)
+        )
+        _notify_config_changed()
 
-        # Add to existing and save
-        existing.append(new_config)
-        ForwardConfig.write(existing)
-
-        return {"message": "Forward configuration created successfully"}
+        return {
+            "message": "Forward configuration created successfully",
+            "version": snapshot.version,
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -256,16 +423,21 @@ async def create_forward(config: ForwardConfigCreate):
 async def delete_forward(source_id: int):
     """Delete a forwarding configuration."""
     try:
-        existing = ForwardConfig.read()
-        filtered = [f for f in existing if f.sourceID != source_id]
 
-        if len(filtered) == len(existing):
-            raise HTTPException(
-                status_code=404, detail="Forward configuration not found"
-            )
+        def delete(existing):
+            remaining = [f for f in existing if f.sourceID != source_id]
+            if len(remaining) == len(existing):
+                raise HTTPException(
+                    status_code=404, detail="Forward configuration not found"
+                )
+            existing[:] = remaining
 
-        ForwardConfig.write(filtered)
-        return {"message": "Forward configuration deleted successfully"}
+        snapshot = await forward_configs.update(delete)
+        _notify_config_changed()
+        return {
+            "message": "Forward configuration deleted successfully",
+            "version": snapshot.version,
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -276,18 +448,24 @@ async def delete_forward(source_id: int):
 async def toggle_forward(source_id: int):
     """Toggle forwarding on/off."""
     try:
-        existing = ForwardConfig.read()
-        for config in existing:
-            if config.sourceID == source_id:
-                config.enabled = not getattr(config, "enabled", True)
-                break
-        else:
-            raise HTTPException(
-                status_code=404, detail="Forward configuration not found"
-            )
 
-        ForwardConfig.write(existing)
-        return {"message": "Forward configuration updated successfully"}
+        def toggle(existing):
+            matching = [config for config in existing if config.sourceID == source_id]
+            if not matching:
+                raise HTTPException(
+                    status_code=404, detail="Forward configuration not found"
+                )
+            # Every route from this source flips together.
+            enabled = not matching[0].enabled
+            for config in matching:
+                config.enabled = enabled
+
+        snapshot = await forward_configs.update(toggle)
+        _notify_config_changed()
+        return {
+            "message": "Forward configuration updated successfully",
+            "version": snapshot.version,
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -296,62 +474,122 @@ async def toggle_forward(source_id: int):
 
 @app.post("/api/start-forwarding", dependencies=[Depends(verify_api_key)])
 async def start_forwarding():
-    """Start live message forwarding."""
+    """Start live message forwarding in this process."""
     try:
         if not telegram_client:
             raise HTTPException(
                 status_code=503, detail="Telegram client not initialized"
             )
 
-        # This would need to be implemented based on your forwarding logic
+        snapshot = forward_configs.snapshot()
+        if not snapshot.configs:
+            raise HTTPException(
+                status_code=400, detail="No forward configurations to run"
+            )
+
+        started = await telegram_client.live_supervisor.start(
+            snapshot.group_by_source()
+        )
+        if not started:
+            raise HTTPException(
+                status_code=409, detail="Live forwarding is already running"
+            )
         return {"message": "Live forwarding started"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/stop-forwarding", dependencies=[Depends(verify_api_key)])
 async def stop_forwarding():
-    """Stop live message forwarding."""
+    """Stop live message forwarding; the Telegram session stays connected."""
     try:
         if not telegram_client:
             raise HTTPException(
                 status_code=503, detail="Telegram client not initialized"
             )
 
-        # This would need to be implemented based on your forwarding logic
+        if not await telegram_client.live_supervisor.stop():
+            raise HTTPException(
+                status_code=409, detail="Live forwarding is not running"
+            )
         return {"message": "Live forwarding stopped"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/keyword-forward", dependencies=[Depends(verify_api_key)])
+@app.post(
+    "/api/keyword-forward", status_code=202, dependencies=[Depends(verify_api_key)]
+)
 async def keyword_forward(request: KeywordForwardRequest):
-    """Search by keyword and forward matching messages."""
+    """Search by keyword and forward matching messages in the background."""
     try:
         if not telegram_client:
             raise HTTPException(
                 status_code=503, detail="Telegram client not initialized"
             )
 
-        sent_count = await telegram_client.forward_by_keyword(
-            {
-                "source_id": request.source_id,
-                "destination_id": request.destination_id,
-                "keyword": request.keyword,
-                "limit": request.limit,
-                "start_date": request.start_date,
-                "end_date": request.end_date,
-                "timezone_name": request.timezone_name,
-                "dry_run": request.dry_run,
+        if request.global_search:
+            if not (request.keyword or "").strip():
+                raise HTTPException(
+                    status_code=400, detail="Global search requires a keyword"
+                )
+            if request.destination_id is None and not request.use_saved_routes:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Set destination_id or use_saved_routes for global search",
+                )
+        elif request.source_id is None or request.destination_id is None:
+            raise HTTPException(
+                status_code=400, detail="source_id and destination_id are required"
+            )
+        if request.full_text:
+            if request.global_search or not (request.keyword or "").strip():
+                raise HTTPException(
+                    status_code=400,
+                    detail="Full-text search needs a keyword and one source chat",
+                )
+            try:
+                MessageArchive.validate_query(request.keyword)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        routes = None
+        if request.global_search and request.use_saved_routes:
+            # Every enabled route of a source, as live forwarding uses them.
+            table = RoutingTable.compile(forward_configs.snapshot().group_by_source())
+            routes = {
+                source: [route.destination_id for route in table.routes_for(source)]
+                for source in table.source_ids
             }
-        )
 
-        mode = "previewed" if request.dry_run else "forwarded"
-        keyword_label = f" for keyword '{request.keyword}'" if request.keyword else ""
-        return {
-            "message": (
-                f"Keyword run completed: {sent_count} messages {mode}{keyword_label}."
+        config = {
+            "global_search": request.global_search,
+            "routes": routes,
+            "channels_only": request.channels_only,
+            "source_id": request.source_id,
+            "destination_id": request.destination_id,
+            "keyword": request.keyword,
+            "full_text": request.full_text,
+            "limit": request.limit,
+            "start_date": request.start_date,
+            "end_date": request.end_date,
+            "timezone_name": request.timezone_name,
+            "dry_run": request.dry_run,
+        }
+
+        async def run(job):
+            return await telegram_client.forward_by_keyword(
+                dict(config, on_progress=job.report)
             )
+
+        job = job_manager.submit("keyword", run, request.model_dump())
+        return {
+            "message": f"Keyword run submitted as job {job.id}",
+            "job": job.to_dict(),
         }
     except HTTPException:
         raise
@@ -359,6 +597,99 @@ async def keyword_forward(request: KeywordForwardRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _submit_history_job(kind: str, request: HistoryForwardRequest, media_only: bool):
+    if not telegram_client:
+        raise HTTPException(status_code=503, detail="Telegram client not initialized")
+
+    async def run(job):
+        return await telegram_client.forward_history(
+            dict(request.model_dump(), media_only=media_only, on_progress=job.report)
+        )
+
+    job = job_manager.submit(kind, run, request.model_dump())
+    return {
+        "message": f"{kind.capitalize()} forward submitted as job {job.id}",
+        "job": job.to_dict(),
+    }
+
+
+@app.post(
+    "/api/history-forward", status_code=202, dependencies=[Depends(verify_api_key)]
+)
+async def history_forward(request: HistoryForwardRequest):
+    """Forward a source chat's history in the background."""
+    return _submit_history_job("history", request, media_only=False)
+
+
+@app.post("/api/media-forward", status_code=202, dependencies=[Depends(verify_api_key)])
+async def media_forward(request: HistoryForwardRequest):
+    """Forward a source chat's files/images in the background."""
+    return _submit_history_job("media", request, media_only=True)
+
+
+@app.get("/api/jobs", dependencies=[Depends(verify_api_key)])
+async def list_jobs():
+    """Running and queued jobs, then recently finished ones."""
+    return [job.to_dict() for job in job_manager.list()]
+
+
+@app.get("/api/jobs/{job_id}", dependencies=[Depends(verify_api_key)])
+async def get_job(job_id: str):
+    """State, progress and result of one job."""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.post("/api/jobs/{job_id}/cancel", dependencies=[Depends(verify_api_key)])
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    if not await job_manager.cancel(job_id):
+        raise HTTPException(status_code=404, detail="No active job with that id")
+    return job_manager.get(job_id).to_dict()
+
+
+def _dead_letters():
+    if not telegram_client:
+        raise HTTPException(status_code=503, detail="Telegram client not initialized")
+    return telegram_client.dead_letters
+
+
+@app.get("/api/dead-letters", dependencies=[Depends(verify_api_key)])
+async def list_dead_letters(state: Optional[str] = None):
+    """Failed forwards kept for retry, oldest failure first."""
+    dead_letters = _dead_letters()
+    if state is not None and state not in dead_letters.STATES:
+        raise HTTPException(
+            status_code=400, detail=f"state must be one of {dead_letters.STATES}"
+        )
+    return {"counts": dead_letters.stats(), "items": dead_letters.entries(state)}
+
+
+@app.post("/api/dead-letters/retry", dependencies=[Depends(verify_api_key)])
+async def retry_dead_letters(request: DeadLetterRequest):
+    """Queue failed forwards (all, or `ids`) for another send now."""
+    _dead_letters()
+    try:
+        requeued = await telegram_client.retry_dead_letters(request.ids)
+        return {"message": f"Queued {requeued} failed forwards", "requeued": requeued}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/dead-letters/purge", dependencies=[Depends(verify_api_key)])
+async def purge_dead_letters(request: DeadLetterRequest):
+    """Delete failed forwards: all, `ids`, and/or those in `state`."""
+    dead_letters = _dead_letters()
+    if request.state is not None and request.state not in dead_letters.STATES:
+        raise HTTPException(
+            status_code=400, detail=f"state must be one of {dead_letters.STATES}"
+        )
+    removed = dead_letters.purge(request.ids, request.state)
+    return {"message": f"Purged {removed} failed forwards", "removed": removed}
+
+
 if __name__ == "__main__":
     import uvicorn
 